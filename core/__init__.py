@@ -1,6 +1,7 @@
 from .functions import calc_ticks_x, crop_x, linear_approximation_complex, linear_approximation_real, r_to_xy_real, \
-    make_paths, create_dir, create_multidir, make_animation, make_video, compile_to_pdf, xlsx_to_df, \
-    calculate_p_gauss, calculate_p_vortex, parse_args, load_dirnames
+    make_paths, create_dir, create_multidir, iterate_frames, encode_frames, make_animation, make_video, \
+    compile_to_pdf, load_track, track_to_df, xlsx_to_df, calculate_p_gauss, calculate_p_vortex, parse_args, \
+    load_dirnames, create_cache_dir
 from .beam import BeamX, BeamR, BeamXY
 from .spectrum import SpectrumR, SpectrumXY
 from .diffraction import FourierDiffractionExecutorXY, SweepDiffractionExecutorX, SweepDiffractionExecutorR
@@ -10,5 +11,17 @@ from .m_constants import MathConstants
 from .manager import Manager
 from .medium import Medium
 from .noise import GaussianNoise
+from .noise_cache import NoiseCache
+from .field_store import FieldStore, load_fields
+from .background import BackgroundWorker
 from .propagation import Propagator
-from .visualization import BeamVisualizer, SpectrumVisualizer, plot_track, plot_noise
\ No newline at end of file
+from .batch import BatchPropagatorR
+from .sweep import SweepRunner
+from .ensemble import EnsembleRunner, RunningStatistics
+from .critical_power import PropagationTrial, CriticalPowerSearch
+from .stop_conditions import StopCondition, MaxIntensityStopCondition, MinIntensityStopCondition, \
+    IntensityDecayStopCondition, WidthStopCondition, BoundaryEnergyStopCondition
+from .splitting import LieSplitting, StrangSplitting, ForestRuthSplitting
+from .stepper import AdaptiveStepper
+from .wisdom import FFTWWisdom
+from .visualization import RasterRenderer, BeamVisualizer, SpectrumVisualizer, plot_track, plot_noise
\ No newline at end of file
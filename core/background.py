@@ -0,0 +1,132 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from threading import BoundedSemaphore
+
+
+def _execute(payload):
+    """Unpickles function with its arguments and calls it in worker"""
+
+    function, args = pickle.loads(payload)
+
+    return function(*args)
+
+
+class BackgroundWorker:
+    """
+    Сlass for execution of plotting and saving functions off the main cycle of propagation.
+
+    Function and its arguments (for example, bound method plot_beam_data of visualizer together with the plot data of
+    the beam) are pickled at the moment of submission, so the worker gets the snapshot of the data and the main cycle
+    can change the field immediately. Only small arrays needed for the task should be submitted, not the beam itself.
+    Tasks are executed in the pool of n_workers processes (matplotlib is not thread-safe) or threads.
+    Not more than queue_size tasks can wait for execution: if the queue is full, submission waits for the oldest task
+    to finish, so the memory used by snapshots is bounded. Method flush waits for all submitted tasks and re-raises
+    the first exception raised in them.
+
+    Worker processes are spawned, not forked, as in class SweepRunner, so the script using the class must be protected
+    with if __name__ == '__main__'.
+    """
+
+    MODES = ('process', 'thread')  # allowed types of workers
+
+    def __init__(self, **kwargs):
+        self.__mode = kwargs.get('mode', 'process')  # type of workers
+        if self.__mode not in self.MODES:
+            raise Exception('Wrong mode!')
+        self.__n_workers = kwargs.get('n_workers', 1)  # number of workers
+        self.__queue_size = kwargs.get('queue_size', 4)  # maximum number of tasks waiting for execution
+
+        self.__executor = None
+        self.__slots = BoundedSemaphore(self.__queue_size)  # free places in the queue
+        self.__futures = []  # submitted and not yet checked tasks
+
+    @property
+    def info(self):
+        return 'background_worker'
+
+    @property
+    def mode(self):
+        return self.__mode
+
+    @property
+    def n_workers(self):
+        return self.__n_workers
+
+    @property
+    def queue_size(self):
+        return self.__queue_size
+
+    @property
+    def n_pending(self):
+        return sum(not future.done() for future in self.__futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __create_executor(self):
+        if self.__mode == 'process':
+            self.__executor = ProcessPoolExecutor(max_workers=self.__n_workers, mp_context=get_context('spawn'))
+        else:
+            self.__executor = ThreadPoolExecutor(max_workers=self.__n_workers)
+
+    def __check_done(self):
+        """Removes finished tasks and re-raises the first exception raised in them"""
+
+        futures, self.__futures = self.__futures, []
+        error = None
+        for future in futures:
+            if not future.done():
+                self.__futures.append(future)
+            elif error is None and future.exception() is not None:
+                error = future.exception()
+
+        if error is not None:
+            raise error
+
+    def submit(self, function, args):
+        """
+        Submits function with arguments for execution in background
+
+        :param function: picklable function (module-level function or bound method of picklable object)
+        :param args: list of arguments
+
+        :return: None
+        """
+        if self.__executor is None:
+            self.__create_executor()
+
+        payload = pickle.dumps((function, args), protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.__slots.acquire()
+        future = self.__executor.submit(_execute, payload)
+        future.add_done_callback(lambda _: self.__slots.release())
+        self.__futures.append(future)
+
+        self.__check_done()
+
+    def flush(self):
+        """
+        Waits for all submitted tasks
+
+        :return: None
+        """
+        for future in self.__futures:
+            future.exception()
+        self.__check_done()
+
+    def close(self):
+        """
+        Waits for all submitted tasks and stops workers
+
+        :return: None
+        """
+        try:
+            self.flush()
+        finally:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+                self.__executor = None
@@ -0,0 +1,275 @@
+from numpy import array, zeros, ones, full, flatnonzero, exp
+from numba import jit, prange
+import pandas as pd
+
+from .diffraction import SweepDiffractionExecutorR
+from .logger import Logger
+from .manager import Manager
+from .stop_conditions import MaxIntensityStopCondition
+from .visualization import plot_track
+
+
+class BatchPropagatorR:
+    """
+    Class describes the simultaneous propagation of a batch of 3-dimensional beams in axisymmetric approximation, which
+    differ only in their power (for example, in the search of the critical power of self-focusing).
+
+    The fields of all beams are kept in one array of shape (n_beams, n_r), and the field array of every beam object
+    becomes a view of its row. Diffraction of all beams is made by one diffraction executor with the same coefficients,
+    boundary condition, data type and cache of factorizations as for a single beam, its solver processes the rows of
+    the batch array in parallel. Kerr effect with the update of intensities and their maxima is made for all active
+    beams by one compiled kernel parallel over the batch, as by class KerrExecutorR for a single beam; intensity arrays
+    of beam objects are views of rows of the batch intensity array. Each beam has its own step along z and its own stop
+    condition: beams, which reached their maximum intensity, are masked out and are not processed further.
+
+    The splitting scheme corresponds to the default Lie splitting of class Propagator, the evolution of peak intensity
+    of every beam is recorded in its own states array with the same columns as the track of class Propagator. If
+    command line arguments are given for every beam, the results directory of every beam with initial parameters,
+    propagation file and its plot is created in the same way as by class Propagator.
+    """
+
+    def __init__(self, **kwargs):
+        self.__beams = kwargs['beams']  # list of beam objects with the same grid, medium and topological charge
+        self.__n_beams = len(self.__beams)
+        self.__check_beams()
+
+        beam = self.__beams[0]
+        self.__n_r = beam.n_r
+
+        # diffraction executor for all beams, cache of factorizations holds the steps of all beams
+        self.__diffraction = SweepDiffractionExecutorR(beam=beam,
+                                                       dtype=kwargs.get('dtype', beam.field.dtype),
+                                                       boundary_condition=kwargs.get('boundary_condition', 'zero'),
+                                                       factorization_cache_size=kwargs.get('factorization_cache_size',
+                                                                                           max(4, self.__n_beams)))
+
+        self.__n_z = kwargs['n_z']  # maximum number of grid steps along evolutionary coordinate z
+        self.__const_dz = kwargs['const_dz']  # use constant step along z or not
+
+        self.__z = zeros(shape=(self.__n_beams,))  # current values of z
+        self.__dz = self.__to_array(kwargs['dz_0'])  # current steps along z
+
+        # peak intensities in beams at which the calculations stop
+        self.__max_intensity_to_stop = self.__to_array(kwargs.get('max_intensity_to_stop', 10**17))
+        self.__stop_conditions = [MaxIntensityStopCondition(max_intensity=e) for e in self.__max_intensity_to_stop]
+        self.__stop_reasons = ['n_z steps are made'] * self.__n_beams  # reasons of the stop of calculations
+
+        # fields and intensities of all beams in arrays, fields and intensities of beam objects become views of rows
+        self.__field = zeros(shape=(self.__n_beams, self.__n_r), dtype=self.__diffraction.dtype)
+        self.__intensity = zeros(shape=(self.__n_beams, self.__n_r), dtype=self.__field.real.dtype)
+        for b in range(self.__n_beams):
+            self.__field[b] = self.__beams[b].field
+            self.__beams[b]._field = self.__field[b]
+            self.__beams[b]._intensity = self.__intensity[b]
+            self.__beams[b].update_intensity()
+
+        # nonlinear Kerr phase shift consts
+        self.__nonlin_phase_const = array([-0.5j * e.r_kerr / e.z_diff for e in self.__beams])
+
+        self.__i_max = array([e.i_max for e in self.__beams])
+        self.__i_0 = array([e.i_0 for e in self.__beams])
+        self.__k_0 = array([e.medium.k_0 for e in self.__beams])
+        self.__n_0 = array([e.medium.n_0 for e in self.__beams])
+        self.__n_2 = array([e.medium.n_2 for e in self.__beams])
+
+        self.__active = ones(shape=(self.__n_beams,), dtype=bool)  # mask of beams, which are still propagated
+        self.__n_steps = zeros(shape=(self.__n_beams,), dtype=int)  # numbers of made steps
+
+        self.__states_columns = ['z, m', 'dz, m', 'i_max / i_0', 'i_max, W / m^2']  # columns for propagation file
+        self.__states_arr = zeros(shape=(self.__n_beams, self.__n_z + 1, 4))  # array for states data of all beams
+
+        # results directories of beams (None not to create them)
+        self.__args = kwargs.get('args', None)  # list of command line arguments for every beam
+        self.__track_format = kwargs.get('track_format', 'xlsx')  # format of propagation files
+        self.__flag_print_track = kwargs.get('print_track', True)  # print track function or not
+        self.__managers, self.__loggers = None, None
+        if self.__args is not None:
+            if len(self.__args) != self.__n_beams:
+                raise Exception('Wrong number of command line arguments for batch!')
+            self.__managers = [Manager(args=e) for e in self.__args]
+            # Kerr effect is made by the batch propagator itself
+            self.__loggers = [Logger(diffraction=self.__diffraction,
+                                     kerr_effect=self,
+                                     path=self.__managers[b].results_dir,
+                                     track_format=self.__track_format) for b in range(self.__n_beams)]
+
+    @property
+    def info(self):
+        return 'batch_propagator_r'
+
+    @property
+    def beams(self):
+        return self.__beams
+
+    @property
+    def n_beams(self):
+        return self.__n_beams
+
+    @property
+    def diffraction(self):
+        return self.__diffraction
+
+    @property
+    def z(self):
+        return self.__z
+
+    @property
+    def stop_reasons(self):
+        return self.__stop_reasons
+
+    @property
+    def loggers(self):
+        return self.__loggers
+
+    @property
+    def states_columns(self):
+        return self.__states_columns
+
+    @property
+    def states_arrs(self):
+        """List of states arrays of beams cropped to the number of made steps"""
+        return [self.__states_arr[b, :self.__n_steps[b] + 1, :] for b in range(self.__n_beams)]
+
+    def __check_beams(self):
+        """Checks that all beams can be propagated in one batch"""
+
+        if not self.__n_beams:
+            raise Exception('Empty batch of beams!')
+
+        beam = self.__beams[0]
+        for e in self.__beams:
+            if e.info != 'beam_r':
+                raise Exception('Wrong beam type!')
+            if e.rs != beam.rs or e.m != beam.m or e.medium.k_0 != beam.medium.k_0:
+                raise Exception('Beams in batch must have the same grid, topological charge and wavenumber!')
+
+    def __to_array(self, value):
+        """Converts scalar or sequence of values for all beams to array"""
+
+        arr = array(value, dtype=float)
+        if not arr.ndim:
+            arr = full(shape=(self.__n_beams,), fill_value=value, dtype=float)
+        if arr.shape != (self.__n_beams,):
+            raise Exception('Wrong number of values for batch!')
+
+        return arr
+
+    @staticmethod
+    @jit(nopython=True, parallel=True)
+    def __fast_process_kerr_effect(fields, intensities, active, nonlin_phase_const, dz, i_0, i_max):
+        """
+        Applies Kerr phase shift in-place to the fields of active beams in parallel over the batch, fills their
+        intensities and peak intensities i_max
+        """
+        for b in prange(fields.shape[0]):
+            if active[b]:
+                current_nonlin_phase = nonlin_phase_const[b] * dz[b]
+                i_max_b = 0.0
+                for k in range(fields.shape[1]):
+                    i = fields[b, k].real ** 2 + fields[b, k].imag ** 2
+                    fields[b, k] *= exp(current_nonlin_phase * i)
+                    intensities[b, k] = i
+                    i_max_b = max(i_max_b, i)
+                i_max[b] = i_max_b * i_0[b]
+
+    @staticmethod
+    @jit(nopython=True)
+    def __update_dz(active, k_0, n_0, n_2, i_max, dz, nonlin_phase_max=0.05):
+        """
+        Reduces the steps along the evolutionary coordinate z of active beams by calculating the maximum Kerr phase
+        incursion
+        """
+        for b in range(dz.shape[0]):
+            if active[b]:
+                nonlin_phase = k_0[b] * n_2[b] * i_max[b] * dz[b] / n_0[b]
+                if nonlin_phase > nonlin_phase_max:
+                    dz[b] *= 0.8 * nonlin_phase_max / nonlin_phase
+
+    def __flush_current_state(self, n_step):
+        """Flush current state data of active beams to states_arr"""
+
+        active = self.__active
+        self.__states_arr[active, n_step, 0] = self.__z[active]
+        self.__states_arr[active, n_step, 1] = self.__dz[active]
+        self.__states_arr[active, n_step, 2] = self.__i_max[active] / self.__i_0[active]
+        self.__states_arr[active, n_step, 3] = self.__i_max[active]
+        self.__n_steps[active] = n_step
+
+    def __check_stop_conditions(self):
+        """Masks beams, for which calculations must be stopped, and saves the reasons of the stop"""
+
+        for b in flatnonzero(self.__active):
+            self.__beams[b]._i_max = self.__i_max[b]
+            if self.__stop_conditions[b].check(self.__beams[b], self.__z[b]):
+                self.__active[b] = False
+                self.__stop_reasons[b] = self.__stop_conditions[b].reason
+
+    def propagate(self):
+        """
+        The main function of class BatchPropagatorR. Realizes the propagation process of all beams.
+
+        :return: None
+        """
+        # initial preparations
+        if self.__args is not None:
+            for b in range(self.__n_beams):
+                self.__managers[b].create_dirs()
+                self.__loggers[b].save_initial_parameters(self.__beams[b], self.__n_z, self.__dz[b],
+                                                          self.__max_intensity_to_stop[b])
+
+        for stop_condition, beam in zip(self.__stop_conditions, self.__beams):
+            stop_condition.initialize(beam)
+
+        for n_step in range(int(self.__n_z) + 1):
+            if n_step:
+
+                # diffraction for all active beams in parallel
+                self.__diffraction.process_diffraction_batch(self.__field, self.__dz, self.__active)
+
+                # kerr effect with update of intensities for all active beams in parallel
+                self.__fast_process_kerr_effect(self.__field, self.__intensity, self.__active,
+                                                self.__nonlin_phase_const, self.__dz, self.__i_0, self.__i_max)
+
+                # increase evolutionary coordinate z by current steps
+                self.__z[self.__active] += self.__dz[self.__active]
+
+                # update steps along z (if needed)
+                if not self.__const_dz:
+                    self.__update_dz(self.__active, self.__k_0, self.__n_0, self.__n_2, self.__i_max, self.__dz)
+
+            # flush current state
+            self.__flush_current_state(n_step)
+
+            # mask beams, for which calculations must be stopped
+            self.__check_stop_conditions()
+            if not self.__active.any():
+                break
+
+        # log and print tracks
+        if self.__args is not None:
+            parameter_index = self.__states_columns.index('i_max / i_0')
+            for b, states_arr in enumerate(self.states_arrs):
+                self.__loggers[b].log_track(states_arr, self.__states_columns, self.__stop_reasons[b])
+                if self.__flag_print_track:
+                    plot_track(states_arr, parameter_index, self.__managers[b].track_dir)
+
+    def tracks_to_dfs(self, normalize_z_to=10**2, normalize_i_to=10**17):
+        """
+        Converts states arrays of beams to pandas dataframes with the same columns and normalization as in function
+        track_to_df
+
+        :return: list of dataframes
+        """
+        dfs = []
+        for b, states_arr in enumerate(self.states_arrs):
+            df = pd.DataFrame(states_arr.copy(), columns=self.__states_columns)
+
+            df['z, m'] *= normalize_z_to
+            df['dz, m'] *= normalize_z_to
+            df['i_max, W / m^2'] /= normalize_i_to[b] if hasattr(normalize_i_to, '__len__') else normalize_i_to
+
+            df = df.rename(index=str, columns={'z, m': 'z_normalized', 'dz, m': 'dz_normalized',
+                                               'i_max, W / m^2': 'i_max_normalized'})
+            dfs.append(df)
+
+        return dfs
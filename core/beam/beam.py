@@ -1,6 +1,6 @@
 from abc import ABCMeta, abstractmethod
-from numba import jit
-from numpy import max as maximum
+from numba import jit, prange
+from numpy import empty, sqrt, save, ascontiguousarray, may_share_memory
 
 from core.medium import Medium
 from core.m_constants import MathConstants
@@ -42,17 +42,139 @@ class Beam(metaclass=ABCMeta):
         self._r_kerr = None             # nonlinearity parameter for Kerr effect, [rad]
                                         # r_kerr = 2 k_0 n_2 I_0 z_diff / n_0
 
+        self._geometry = None           # arrays of squared distance to the axis, normalized distance to the grid
+                                        # boundary and integration weights for nodes of the grid
+
     @abstractmethod
     def info(self):
         """Beam type"""
 
     @abstractmethod
+    def field_to_save(self, only_center=True):
+        """Returns the field array in the form, in which it is saved"""
+
     def save_field(self, path, only_center=True):
-        """"""
+        save(path, self.field_to_save(only_center))
+
+    @abstractmethod
+    def _calculate_geometry(self):
+        """
+        Calculates arrays of the same shape as the field: squared distance to the beam axis, [m^2], distance to the
+        grid boundary normalized so that it is 0 on the axis and 1 on the boundary, and integration weights, [m^k]
+        """
+
+    @property
+    def grid_half_size(self):
+        """Distance from the beam axis to the grid boundary, [m]"""
+        raise Exception('Grid of %s is not defined!' % self.info)
+
+    def rescale(self, factor):
+        """
+        Shrinks the spatial grid by factor keeping the number of nodes and interpolates the field to the new grid
+        (adaptive zoom of the grid on the collapsing beam)
+
+        :param factor: zoom factor
+
+        :return: None
+        """
+        raise Exception('Rescaling of grid is not implemented for %s!' % self.info)
+
+    def _get_geometry(self):
+        """Returns cached arrays of grid geometry"""
+        if self._geometry is None or self._geometry[0].shape != self._field.shape:
+            self._geometry = self._calculate_geometry()
+
+        return self._geometry
+
+    def calculate_energy(self):
+        """
+        Calculates beam power in units of I_0 as integral of dimensionless intensity over the transverse plane
+
+        :return: energy
+        """
+        _, _, weights = self._get_geometry()
+
+        return (self._intensity * weights).sum()
+
+    def calculate_width(self):
+        """
+        Calculates root mean square radius of the beam, [m]
+
+        :return: width
+        """
+        rho_2, _, weights = self._get_geometry()
+
+        return sqrt((self._intensity * rho_2 * weights).sum() / self.calculate_energy())
+
+    def calculate_core_width(self):
+        """
+        Calculates root mean square radius of the beam weighted with squared intensity, [m]. Unlike calculate_width it
+        follows the collapsing core of the beam and is not affected by the diffracting background
+
+        :return: width of the core
+        """
+        rho_2, _, weights = self._get_geometry()
+        intensity_2 = self._intensity ** 2
+
+        return sqrt((intensity_2 * rho_2 * weights).sum() / (intensity_2 * weights).sum())
+
+    def calculate_boundary_energy_fraction(self, layer=0.1):
+        """
+        Calculates the fraction of beam power in the layer near the grid boundary
+
+        :param layer: width of layer in units of distance from the axis to the boundary
+
+        :return: fraction of energy
+        """
+        _, boundary, weights = self._get_geometry()
+
+        return (self._intensity * weights)[boundary > 1.0 - layer].sum() / self.calculate_energy()
 
     def update_intensity(self):
-        self._intensity = self._field_to_intensity(self._field)
-        self._i_max = maximum(self._intensity) * self._i_0
+        intensity = self._allocate_intensity()
+        self._i_max = self._fast_update_intensity(self._flat_field(), intensity.reshape(-1)) * self._i_0
+
+    def _flat_field(self):
+        """
+        Returns flattened view of the field array for compiled kernels changing it in-place. Reshaping of
+        non-contiguous array returns a copy, so such field array is replaced by its contiguous copy first
+        """
+        if not self._field.flags.c_contiguous:
+            self._field = ascontiguousarray(self._field)
+
+        field = self._field.reshape(-1)
+        assert may_share_memory(field, self._field)
+
+        return field
+
+    def _allocate_intensity(self):
+        """
+        Returns preallocated array for intensity, the array is reallocated only if the field array changed its shape
+        or data type
+        """
+        dtype = self._field.real.dtype
+        if self._intensity is None or self._intensity.shape != self._field.shape or self._intensity.dtype != dtype:
+            self._intensity = empty(shape=self._field.shape, dtype=dtype)
+
+        return self._intensity
+
+    @staticmethod
+    @jit(nopython=True, parallel=True)
+    def _fast_update_intensity(field, intensity):
+        """
+        Intensity calculation as a squared field norm in preallocated array with simultaneous search of its maximum
+
+        :param field: flattened array for complex light field
+        :param intensity: flattened array for float intensity of the field
+
+        :return: maximum of intensity
+        """
+        i_max = 0.0
+        for k in prange(field.shape[0]):
+            intensity[k] = field[k].real ** 2 + field[k].imag ** 2
+            i_max = max(i_max, intensity[k])
+
+        return i_max
 
     @staticmethod
     @jit(nopython=True)
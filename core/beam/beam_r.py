@@ -1,5 +1,7 @@
-from numpy import pi, exp, zeros, complex64, save
+from numpy import pi, exp, sinh, zeros, complex64, array, arange, interp, gradient, diff
 from scipy.special import gamma
+from scipy.optimize import brentq
+from scipy.interpolate import CubicSpline
 from numba import jit
 
 from .beam_3d import Beam3D
@@ -17,11 +19,16 @@ class BeamR(Beam3D):
         self.__r_0 = kwargs['r_0']  # characteristic spatial size, [m]
         self.__r_max = self._radii_in_grid * self.__r_0  # spatial grid size, [m]
         self.__n_r = kwargs['n_r']  # number of points in spatial grid
-        self.__dr = self.__r_max / self.__n_r  # spatial grid step, [m]
-        self.__rs = [i * self.__dr for i in range(self.__n_r)]  # spatial grid nodes, [m]
+
+        # type of spatial grid: 'uniform' or 'stretched' (fine near r = r_fine and coarse at the boundary)
+        self.__grid = kwargs.get('grid', 'uniform')
+        self.__stretching = kwargs.get('stretching', 3.0)  # stretching parameter of the grid, [a.u.]
+        self.__r_fine = kwargs.get('r_fine', 0.0)  # radius, near which the stretched grid is fine, [m]
+
+        self.__initialize_grid()
 
         # field initialization
-        self._field = self.__initialize_field(self._M, self.__r_0, self.__dr, self.__n_r)
+        self._field = self.__initialize_field(self._M, self.__r_0, array(self.__rs))
 
         # other parameters initialization
         self._i_0 = self.__calculate_i0()
@@ -54,6 +61,104 @@ class BeamR(Beam3D):
     def dr(self):
         return self.__dr
 
+    @property
+    def grid(self):
+        return self.__grid
+
+    @property
+    def uniform_rs(self):
+        return self.__uniform_rs
+
+    @property
+    def uniform_dr(self):
+        """Step of the uniform grid uniform_rs, to which arrays are interpolated for plotting and spectrum"""
+        return self.__dr
+
+    @property
+    def dr_min(self):
+        """Minimum local step of the grid rs"""
+        return float(diff(self.__rs).min())
+
+    @property
+    def dr_max(self):
+        """Maximum local step of the grid rs"""
+        return float(diff(self.__rs).max())
+
+    @property
+    def grid_half_size(self):
+        return self.__r_max
+
+    def __initialize_grid(self):
+        """Initializes spatial grid nodes from grid size r_max"""
+
+        self.__dr = self.__r_max / self.__n_r  # spatial grid step of uniform grid, [m]
+        self.__uniform_rs = [i * self.__dr for i in range(self.__n_r)]  # uniform spatial grid nodes, [m]
+
+        if self.__grid == 'uniform':
+            self.__rs = self.__uniform_rs  # spatial grid nodes, [m]
+        elif self.__grid == 'stretched':
+            self.__rs = self.__calculate_stretched_grid()
+        else:
+            raise Exception('Wrong grid!')
+
+    def __calculate_stretched_grid(self):
+        """
+        Calculates nodes of stretched grid r(s) = r_fine + a sinh(b (s - s_0)) for uniform s_i = i / n_r, where b is
+        the stretching parameter, and a, s_0 are found from conditions r(0) = 0 and r(1) = r_max. The local grid step
+        is minimal near r = r_fine and grows exponentially to the boundary.
+
+        :return: list of grid nodes
+        """
+        b, r_max, r_fine = self.__stretching, self.__r_max, self.__r_fine
+        s = arange(self.__n_r) / self.__n_r
+
+        if r_fine == 0.0:
+            rs = r_max * sinh(b * s) / sinh(b)
+        else:
+            if not 0.0 < r_fine < r_max:
+                raise Exception('Wrong r_fine!')
+            s_0 = brentq(lambda e: r_fine * (1.0 + sinh(b * (1.0 - e)) / sinh(b * e)) - r_max, 10**-12, 1.0)
+            rs = r_fine + r_fine / sinh(b * s_0) * sinh(b * (s - s_0))
+            rs[0] = 0.0
+
+        return list(rs)
+
+    def interpolate_to_uniform_grid(self, arr):
+        """
+        Interpolates array given on the grid nodes rs to the uniform grid nodes uniform_rs
+
+        :param arr: array on the grid nodes
+
+        :return: array on the uniform grid nodes
+        """
+        if self.__grid == 'uniform':
+            return arr
+
+        return interp(self.__uniform_rs, self.__rs, arr).astype(arr.dtype)
+
+    def rescale(self, factor):
+        """
+        Shrinks the spatial grid by factor keeping the number of nodes. The field is interpolated to the finer grid by
+        cubic spline, the field beyond the new grid size is discarded.
+
+        :param factor: zoom factor
+
+        :return: None
+        """
+        if factor <= 1.0:
+            raise Exception('Wrong zoom factor!')
+
+        spline = CubicSpline(self.__rs, self._field)
+
+        self.__r_max /= factor
+        self.__r_fine /= factor
+        self.__initialize_grid()
+
+        self._field = spline(self.__rs).astype(self._field.dtype)
+
+        self._geometry = None
+        self.update_intensity()
+
     def __calculate_i0(self):
         """
         LATEX SYNTAX:
@@ -67,22 +172,25 @@ class BeamR(Beam3D):
 
     @staticmethod
     @jit(nopython=True)
-    def __initialize_field(M, r_0, dr, n_r):
+    def __initialize_field(M, r_0, rs):
         """
         :param M: power of polynomial before exponent in initial condition
         :param r_0: characteristic spatial size
-        :param dr: spatial grid step
-        :param n_r: number of points in spatial grid
+        :param rs: spatial grid nodes
 
         :return: initialized field array
         """
-        arr = zeros(shape=(n_r,), dtype=complex64)
-        for i in range(n_r):
-            r = i * dr
+        arr = zeros(shape=rs.shape, dtype=complex64)
+        for i in range(rs.shape[0]):
+            r = rs[i]
             arr[i] = (r / r_0)**M * exp(-0.5 * (r / r_0)**2)
 
         return arr
 
-    def save_field(self, path, only_center=True):
-        field_xy = r_to_xy_complex(self._field)
-        save(path, field_xy)
+    def _calculate_geometry(self):
+        rs = array(self.__rs)
+
+        return rs ** 2, rs / self.__r_max, 2.0 * pi * rs * gradient(rs)
+
+    def field_to_save(self, only_center=True):
+        return r_to_xy_complex(self.interpolate_to_uniform_grid(self._field))
@@ -1,4 +1,5 @@
-from numpy import exp, zeros, complex64, heaviside, save
+from numpy import exp, zeros, complex64, heaviside, array, full
+from scipy.interpolate import CubicSpline
 
 from .beam_2d import Beam2D
 
@@ -14,8 +15,7 @@ class BeamX(Beam2D):
         self.__x_0 = kwargs['x_0']  # characteristic spatial size
         self.__x_max = self._radii_in_grid * self.__x_0  # spatial grid size
         self.__n_x = kwargs['n_x']  # number of points in spatial grid
-        self.__dx = self.__x_max / self.__n_x  # spatial grid step
-        self.__xs = [i * self.__dx - 0.5 * self.__x_max for i in range(self.__n_x)]  # spatial grid nodes
+        self.__initialize_grid()
 
         # field initialization
         self._field = self.__initialize_field(self._half, self._M, self.__x_0, self.__x_max, self.__dx, self.__n_x)
@@ -53,6 +53,38 @@ class BeamX(Beam2D):
     def dx(self):
         return self.__dx
 
+    @property
+    def grid_half_size(self):
+        return 0.5 * self.__x_max
+
+    def __initialize_grid(self):
+        """Initializes spatial grid nodes from grid size x_max"""
+
+        self.__dx = self.__x_max / self.__n_x  # spatial grid step
+        self.__xs = [i * self.__dx - 0.5 * self.__x_max for i in range(self.__n_x)]  # spatial grid nodes
+
+    def rescale(self, factor):
+        """
+        Shrinks the spatial grid by factor keeping the number of nodes. The field is interpolated to the finer grid by
+        cubic spline, the field beyond the new grid size is discarded.
+
+        :param factor: zoom factor
+
+        :return: None
+        """
+        if factor <= 1.0:
+            raise Exception('Wrong zoom factor!')
+
+        spline = CubicSpline(self.__xs, self._field)
+
+        self.__x_max /= factor
+        self.__initialize_grid()
+
+        self._field = spline(self.__xs).astype(self._field.dtype)
+
+        self._geometry = None
+        self.update_intensity()
+
     @staticmethod
     def __initialize_field(half, M, x_0, x_max, dx, n_x):
         """
@@ -73,6 +105,11 @@ class BeamX(Beam2D):
 
         return arr
 
-    def save_field(self, path, only_center=True):
-        save(path, self._field)
+    def _calculate_geometry(self):
+        xs = array(self.__xs)
+
+        return xs ** 2, abs(xs) / (0.5 * self.__x_max), full(shape=xs.shape, fill_value=self.__dx)
+
+    def field_to_save(self, only_center=True):
+        return self._field
 
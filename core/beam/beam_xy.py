@@ -1,4 +1,5 @@
-from numpy import pi, arctan2, exp, sqrt, zeros, complex64, mean, sum as summ, array, save
+from numpy import pi, arctan2, exp, sqrt, zeros, complex64, mean, sum as summ, array, maximum, full, newaxis
+from numpy.fft import fft2, ifft2, fftshift, ifftshift
 from scipy.special import gamma
 from numba import jit
 
@@ -22,20 +23,7 @@ class BeamXY(Beam3D):
         self.__n_x = kwargs['n_x']  # number of points in spatial grid along x
         self.__n_y = kwargs['n_y']  # number of points in spatial grid along y
 
-        self.__dx = self.__x_max / self.__n_x  # spatial grid step along x
-        self.__dy = self.__y_max / self.__n_y  # spatial grid step along y
-
-        self.__xs = [i * self.__dx - 0.5 * self.__x_max for i in range(self.__n_x)]  # spatial grid nodes along x
-        self.__ys = [i * self.__dy - 0.5 * self.__y_max for i in range(self.__n_y)]  # spatial grid nodes along y
-
-        self.__dk_x = 2.0 * pi / self.__x_max  # wave vector step along x
-        self.__dk_y = 2.0 * pi / self.__y_max  # wave vector step along y
-
-        self.__k_xs = array([i * self.__dk_x if i < self.__n_x / 2 else (i - self.__n_x) * self.__dk_x  # wave vector grid
-                       for i in range(self.__n_x)])                                                     # nodes along x
-
-        self.__k_ys = array([i * self.__dk_y if i < self.__n_y / 2 else (i - self.__n_y) * self.__dk_y  # wave vector grid
-                       for i in range(self.__n_y)])                                                     # nodes along y
+        self.__initialize_grid()
 
         self.__noise_percent = kwargs.get('noise_percent', 0.0)  # multiplicative noise percent
         self.__noise_field = zeros(shape=(self.__n_x, self.__n_y))  # array for complex noise field
@@ -114,6 +102,10 @@ class BeamXY(Beam3D):
     def k_ys(self):
         return self.__k_ys
 
+    @property
+    def grid_half_size(self):
+        return 0.5 * min(self.__x_max, self.__y_max)
+
     @property
     def noise_percent(self):
         return self.__noise_percent
@@ -211,6 +203,9 @@ class BeamXY(Beam3D):
                 else:
                     arr[i, j] *= exp(1j * 1 * (arctan2(x, y) + 1 * pi))
 
+                # multiplicative noise as in the initial condition of the log: (1 + C xi(x, y)) A(x, y, 0)
+                arr[i, j] *= 1.0 + 0.01 * noise_percent * noise[i, j]
+
                 # #
                 # # ring width
                 # #
@@ -229,7 +224,62 @@ class BeamXY(Beam3D):
 
         return arr
 
-    def save_field(self, path, only_center=True):
+    def __initialize_grid(self):
+        """Initializes spatial and wave vector grids from grid sizes x_max, y_max"""
+
+        self.__dx = self.__x_max / self.__n_x  # spatial grid step along x
+        self.__dy = self.__y_max / self.__n_y  # spatial grid step along y
+
+        self.__xs = [i * self.__dx - 0.5 * self.__x_max for i in range(self.__n_x)]  # spatial grid nodes along x
+        self.__ys = [i * self.__dy - 0.5 * self.__y_max for i in range(self.__n_y)]  # spatial grid nodes along y
+
+        self.__dk_x = 2.0 * pi / self.__x_max  # wave vector step along x
+        self.__dk_y = 2.0 * pi / self.__y_max  # wave vector step along y
+
+        self.__k_xs = array([i * self.__dk_x if i < self.__n_x / 2 else (i - self.__n_x) * self.__dk_x  # wave vector grid
+                       for i in range(self.__n_x)])                                                     # nodes along x
+
+        self.__k_ys = array([i * self.__dk_y if i < self.__n_y / 2 else (i - self.__n_y) * self.__dk_y  # wave vector grid
+                       for i in range(self.__n_y)])                                                     # nodes along y
+
+    def rescale(self, factor):
+        """
+        Shrinks the spatial grid by integer factor keeping the number of nodes. The field is interpolated to the finer
+        grid spectrally: its spectrum is padded with zeros to factor times more nodes, and the central part of
+        the field on the padded grid is taken.
+
+        :param factor: integer zoom factor
+
+        :return: None
+        """
+        if factor != int(factor) or factor < 1:
+            raise Exception('Wrong zoom factor!')
+        factor = int(factor)
+
+        n_x, n_y = self.__n_x, self.__n_y
+        spectrum = fftshift(fft2(self._field))
+        spectrum_padded = zeros(shape=(factor * n_x, factor * n_y), dtype=spectrum.dtype)
+        i_0, j_0 = factor * n_x // 2 - n_x // 2, factor * n_y // 2 - n_y // 2
+        spectrum_padded[i_0:i_0 + n_x, j_0:j_0 + n_y] = spectrum
+        field_padded = ifft2(ifftshift(spectrum_padded)) * factor ** 2
+
+        self._field = field_padded[i_0:i_0 + n_x, j_0:j_0 + n_y].astype(self._field.dtype)
+
+        self.__x_max /= factor
+        self.__y_max /= factor
+        self.__initialize_grid()
+
+        self._geometry = None
+        self.update_intensity()
+
+    def _calculate_geometry(self):
+        xs, ys = array(self.__xs)[:, newaxis], array(self.__ys)[newaxis, :]
+        rho_2 = xs ** 2 + ys ** 2
+        boundary = maximum(abs(xs) / (0.5 * self.__x_max), abs(ys) / (0.5 * self.__y_max))
+
+        return rho_2, boundary, full(shape=rho_2.shape, fill_value=self.__dx * self.__dy)
+
+    def field_to_save(self, only_center=True):
         if only_center:
             percent = 3
             center = self.__n_x // 2
@@ -237,4 +287,4 @@ class BeamXY(Beam3D):
             field = self._field[center-ambit:center+ambit, center-ambit:center+ambit]
         else:
             field = self._field
-        save(path, field)
+        return field
@@ -0,0 +1,166 @@
+from argparse import Namespace
+
+from .propagation import Propagator
+from .stop_conditions import MinIntensityStopCondition
+
+
+class PropagationTrial:
+    """
+    Class for one trial of the search of critical power of self-focusing: the beam with the given ratio of its power
+    to the reference critical power propagates until its peak intensity exceeds n_i_max_to_stop initial peak
+    intensities (collapse) or falls below n_i_max_to_abort initial peak intensities (clear diffraction).
+
+    The diffraction criterion is reliable only if peak intensity of the beam, which collapses later, does not fall
+    below n_i_max_to_abort initial peak intensities before the collapse. The default value 0.5 assumes that it does
+    not fall twice. If peak intensity of near-critical beams falls at first and grows slowly later (for example, for
+    beams with noise), the beam above critical power can be classified as diffracting, which shifts the bracket. For
+    such beams the criterion is checked only after the beam has propagated z_diff_to_abort diffraction lengths, or
+    n_i_max_to_abort is lowered. If the trial is stopped by the limit n_z of steps, the beam is considered diffracting
+    too, so n_z must be sufficient for the collapse of near-critical beams.
+
+    Values of propagator parameters can be functions of the beam object, as in class SweepRunner.
+    """
+
+    def __init__(self, **kwargs):
+        self.__args = kwargs['args']  # command line arguments
+        self.__beam_class = kwargs['beam_class']  # class of beam, for example BeamR
+        self.__diffraction_class = kwargs['diffraction_class']  # class of diffraction executor
+        self.__kerr_effect_class = kwargs['kerr_effect_class']  # class of kerr effect executor
+        self.__beam_params = kwargs['beam_params']  # fixed parameters of beam
+        self.__propagator_params = kwargs['propagator_params']  # fixed parameters of propagator
+        self.__power_param = kwargs.get('power_param', 'p_0_to_p_vortex')  # name of power parameter of beam
+
+        self.__n_i_max_to_stop = kwargs.get('n_i_max_to_stop', 30)  # collapse criterion
+        self.__n_i_max_to_abort = kwargs.get('n_i_max_to_abort', 0.5)  # diffraction criterion
+        self.__z_diff_to_abort = kwargs.get('z_diff_to_abort', 0.0)  # distance before diffraction criterion, [z_diff]
+
+    def __call__(self, p_rel):
+        """
+        :param p_rel: ratio of beam power to the reference critical power
+
+        :return: True if the beam collapses, else False
+        """
+        beam_params = dict(self.__beam_params)
+        beam_params[self.__power_param] = p_rel
+        beam = self.__beam_class(**beam_params)
+
+        propagator_params = dict(self.__propagator_params)
+        for name, value in propagator_params.items():
+            if callable(value):
+                propagator_params[name] = value(beam)
+
+        args = Namespace(global_root_dir=self.__args.global_root_dir,
+                         global_results_dir_name=self.__args.global_results_dir_name,
+                         prefix='%s=%.6f' % (self.__power_param, p_rel),
+                         insert_datetime=False)
+
+        i_max_to_stop = self.__n_i_max_to_stop * beam.i_max
+        abort_condition = MinIntensityStopCondition(min_intensity=self.__n_i_max_to_abort * beam.i_max,
+                                                    z_min=self.__z_diff_to_abort * beam.z_diff)
+        propagator_params.update(max_intensity_to_stop=i_max_to_stop,
+                                 stop_conditions=[abort_condition] + list(propagator_params.get('stop_conditions', [])))
+        propagator = Propagator(args=args,
+                                beam=beam,
+                                diffraction=self.__diffraction_class(beam=beam),
+                                kerr_effect=self.__kerr_effect_class(beam=beam),
+                                **propagator_params)
+        propagator.propagate()
+
+        return beam.i_max > i_max_to_stop
+
+
+class CriticalPowerSearch:
+    """
+    Class for the search of critical power of self-focusing by bisection.
+
+    The class takes on the input in the constructor a trial function, which returns True if the beam with the given
+    ratio of its power to the reference critical power collapses. Starting from the warm-start guess p_0 (for example,
+    1.0 for the power given in units of calculate_p_vortex), the bracket [p_low, p_high] with diffracting beam at p_low
+    and collapsing beam at p_high is found by steps of increasing length, and then it is reduced by bisection until its
+    width becomes less than tolerance. With good guess the critical power is found in about log2(step / tolerance) + 2
+    trials.
+    """
+
+    def __init__(self, **kwargs):
+        self.__trial = kwargs['trial']  # function of p_rel returning True if the beam collapses
+        self.__p_0 = kwargs.get('p_0', 1.0)  # warm-start guess of critical power
+        self.__step = kwargs.get('step', 0.1)  # initial step for bracketing
+        self.__tolerance = kwargs.get('tolerance', 0.01)  # maximum width of the final bracket
+        self.__max_trials = kwargs.get('max_trials', 30)  # maximum number of trials
+        self.__p_min = kwargs.get('p_min', 0.0)  # lower limit of power
+
+        self.__trials = []  # list of (p_rel, collapsed) for all made trials
+        self.__p_low, self.__p_high = None, None
+
+    @property
+    def trials(self):
+        return self.__trials
+
+    @property
+    def n_trials(self):
+        return len(self.__trials)
+
+    @property
+    def bracket(self):
+        return self.__p_low, self.__p_high
+
+    @property
+    def p_cr(self):
+        """Estimation of critical power as the middle of the bracket"""
+        if self.__p_low is None or self.__p_high is None:
+            return None
+        return 0.5 * (self.__p_low + self.__p_high)
+
+    def __make_trial(self, p_rel):
+        if len(self.__trials) >= self.__max_trials:
+            raise Exception('Maximum number of trials is exceeded!')
+
+        collapsed = bool(self.__trial(p_rel))
+        self.__trials.append((p_rel, collapsed))
+
+        return collapsed
+
+    def __find_bracket(self):
+        """Finds the bracket of critical power starting from warm-start guess"""
+
+        p, step = self.__p_0, self.__step
+        if self.__make_trial(p):
+            self.__p_high = p
+            while self.__p_low is None:
+                p = max(p - step, self.__p_min)
+                if self.__make_trial(p):
+                    self.__p_high = p
+                    if p == self.__p_min:
+                        raise Exception('Beam collapses at minimum power!')
+                else:
+                    self.__p_low = p
+                step *= 2
+        else:
+            self.__p_low = p
+            while self.__p_high is None:
+                p += step
+                if self.__make_trial(p):
+                    self.__p_high = p
+                else:
+                    self.__p_low = p
+                step *= 2
+
+    def search(self):
+        """
+        Finds critical power of self-focusing
+
+        :return: estimation of critical power
+        """
+        self.__trials = []
+        self.__p_low, self.__p_high = None, None
+
+        self.__find_bracket()
+
+        while self.__p_high - self.__p_low > self.__tolerance:
+            p = 0.5 * (self.__p_low + self.__p_high)
+            if self.__make_trial(p):
+                self.__p_high = p
+            else:
+                self.__p_low = p
+
+        return self.p_cr
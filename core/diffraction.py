@@ -1,8 +1,10 @@
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 from multiprocessing import cpu_count
-from numpy import exp, conj, zeros, complex64
-from numba import jit
-from pyfftw.builders import fft2, ifft2
+from numpy import exp, zeros, full, array, multiply, newaxis
+from pyfftw import FFTW, empty_aligned
+
+from .tridiagonal import CrankNicolsonSolver
 
 
 class DiffractionExecutor(metaclass=ABCMeta):
@@ -28,61 +30,94 @@ class DiffractionExecutor(metaclass=ABCMeta):
     def process_diffraction(self, dz):
         """Process_diffraction"""
 
+    def update_grid(self):
+        """
+        Updates all the quantities depending on the spatial grid of the beam after its rescaling
+
+        :return: None
+        """
 
-class SweepDiffractionExecutorX(DiffractionExecutor):
+
+class SweepDiffractionExecutor(DiffractionExecutor):
     """
-    Class for modeling the diffraction of a 2-dimensional beam using sweep.
+    Abstract class for modeling the diffraction along one transverse coordinate using sweep.
+
+    Crank-Nicolson systems are solved by CrankNicolsonSolver object, which caches factorization of the system for
+    every dz and makes the step by one compiled substitution in preallocated buffer. The calculations are made in data
+    type dtype of the field (complex64 by default, complex128 for higher accuracy), the field of the beam is converted
+    to this data type in the constructor.
+
+    Boundary condition at the grid boundary is 'zero' (the field vanishes, the radiation is reflected back) or
+    'transparent' (Hadley's transparent boundary condition: the field near the boundary is assumed to be the outgoing
+    plane wave f_{n-1} = kappa f_{n-2}, where kappa is found from the field on the previous step, and the incoming waves
+    are forbidden). The transparent condition changes only kappa_right, so the cached factorizations remain valid,
+    except for the grid with two boundaries (along x), where the factorization with changing kappa_left is calculated
+    on every step.
     """
 
+    TWO_BOUNDARIES = False  # left node of the grid is the grid boundary, not the axis
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        # sweep coefficients and arrays
+        self._dtype = kwargs.get('dtype', self._beam.field.dtype)  # data type of field for calculations
+        self._factorization_cache_size = kwargs.get('factorization_cache_size', 4)  # maximum number of
+                                                                                     # factorizations in cache
+        self._solver = None  # solver of Crank-Nicolson systems
 
-        self.__c1 = 1.0 / (2.0 * self._beam.dx ** 2)
-        self.__c2 = 2j * self._beam.medium.k_0
+        self._boundary_condition = kwargs.get('boundary_condition', 'zero')  # 'zero' or 'transparent'
+        if self._boundary_condition not in ('zero', 'transparent'):
+            raise Exception('Wrong boundary condition!')
+
+        self._kappa_right, self._mu_right = 0.0, 0.0  # right boundary condition
 
-        self.__alpha = self.__c1
-        self.__gamma = self.__c1
+        if self._beam.field.dtype != self._dtype:
+            self._beam._field = self._beam.field.astype(self._dtype)
+            self._beam.update_intensity()
 
-        self.__kappa_left, self.__mu_left, self.__kappa_right, self.__mu_right = \
-            0.0, 0.0, 0.0, 0.0
+    @abstractmethod
+    def info(self):
+        """DiffractionExecutor type"""
 
-        self.__delta = zeros(shape=(self._beam.n_x,), dtype=complex64)
-        self.__xi = zeros(shape=(self._beam.n_x,), dtype=complex64)
-        self.__eta = zeros(shape=(self._beam.n_x,), dtype=complex64)
+    @property
+    def dtype(self):
+        return self._dtype
 
     @property
-    def info(self):
-        return 'sweep_diffraction_executor_x'
+    def factorization_cache_size(self):
+        return self._factorization_cache_size
+
+    @property
+    def boundary_condition(self):
+        return self._boundary_condition
 
     @staticmethod
-    @jit(nopython=True)
-    def __fast_process(field, n_x, dz, c1, c2, alpha, gamma, delta, xi, eta,
-                       kappa_left, mu_left, kappa_right, mu_right):
+    def _calculate_transparent_kappa(field):
+        """
+        Calculates coefficient kappa of transparent boundary condition f_{n-1} = kappa f_{n-2} from the field in two
+        inner nodes near the boundary. For the field exp(i k x) near the boundary kappa = exp(i k h), where h is the
+        grid step. The wave leaves the grid if Re(k) <= 0, because diffraction operator is -i / (2 k_0) laplacian here,
+        otherwise Re(k) is set to zero and only the decay of the field is kept.
+
+        :param field: array for complex light field
 
-        # left boundary condition
-        xi[1], eta[1] = kappa_left, mu_left
+        :return: kappa
+        """
+        if field[-3] == 0.0:
+            return 0.0
 
-        # forward
-        for i in range(1, n_x - 1):
-            beta = 2.0 * c1 + c2 / dz
-            delta[i] = alpha * field[i + 1] - \
-                       conj(beta) * field[i] + \
-                       gamma * field[i - 1]
-            xi[i + 1] = alpha / (beta - gamma * xi[i])
-            eta[i + 1] = (delta[i] + gamma * eta[i]) / \
-                         (beta - gamma * xi[i])
+        kappa = complex(field[-2] / field[-3])
+        if kappa.imag > 0.0:
+            kappa = abs(kappa)
 
-        # right boundary condition
-        field[n_x - 1] = (mu_right + kappa_right * eta[n_x - 1]) / \
-                         (1.0 - kappa_right * xi[n_x - 1])
+        return kappa
 
-        # backward
-        for j in range(n_x - 1, 0, -1):
-            field[j - 1] = xi[j] * field[j] + eta[j]
+    def _create_solver(self, alpha, gamma, sigma, rho, c, kappa_left, mu_left):
+        """Creates solver of Crank-Nicolson systems with given coefficients"""
 
-        return field
+        self._solver = CrankNicolsonSolver(alpha=alpha, gamma=gamma, sigma=sigma, rho=rho, c=c,
+                                           kappa_left=kappa_left, mu_left=mu_left, dtype=self._dtype,
+                                           cache_size=self._factorization_cache_size)
 
     def process_diffraction(self, dz):
         """
@@ -90,143 +125,338 @@ class SweepDiffractionExecutorX(DiffractionExecutor):
 
         :return: None
         """
-        self._beam._field = self.__fast_process(self._beam._field, self._beam.n_x, dz, self.__c1,
-                                                self.__c2, self.__alpha, self.__gamma, self.__delta, self.__xi,
-                                                self.__eta, self.__kappa_left, self.__mu_left, self.__kappa_right,
-                                                self.__mu_right)
+        if self._beam._field.dtype != self._dtype:
+            self._beam._field = self._beam._field.astype(self._dtype)
+
+        kappa_left = None
+        if self._boundary_condition == 'transparent':
+            self._kappa_right = self._calculate_transparent_kappa(self._beam._field)
+            if self.TWO_BOUNDARIES:
+                kappa_left = self._calculate_transparent_kappa(self._beam._field[::-1])
+
+        self._solver.solve(self._beam._field, dz, self._kappa_right, self._mu_right, kappa_left)
+
+    def process_diffraction_batch(self, fields, dzs, active):
+        """
+        Makes diffraction step for the batch of beams with the same grid, topological charge and wavenumber as the beam
+        of the executor, the beams are processed in parallel
+
+        :param fields: array of shape (n_beams, n) for complex light fields of data type dtype
+        :param dzs: current steps along evolutionary coordinate z for every beam
+        :param active: mask of beams, which are processed
+
+        :return: None
+        """
+        if fields.dtype != self._dtype:
+            raise Exception('Wrong data type of batch!')
+
+        n_beams = fields.shape[0]
+        kappa_right = full(shape=(n_beams,), fill_value=self._kappa_right, dtype=complex)
+        mu_right = full(shape=(n_beams,), fill_value=self._mu_right, dtype=complex)
+        if self._boundary_condition == 'transparent':
+            if self.TWO_BOUNDARIES:
+                raise Exception('Transparent boundary condition with two boundaries is not supported for batch!')
+            for b in range(n_beams):
+                if active[b]:
+                    kappa_right[b] = self._calculate_transparent_kappa(fields[b])
 
+        self._solver.solve_batch(fields, dzs, active, kappa_right, mu_right)
 
-class SweepDiffractionExecutorR(DiffractionExecutor):
+
+class SweepDiffractionExecutorX(SweepDiffractionExecutor):
     """
-    Class for modeling the diffraction of a 3-dimensional beam in axisymmetric approximation.
+    Class for modeling the diffraction of a 2-dimensional beam using sweep.
     """
 
+    TWO_BOUNDARIES = True
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        # sweep coefficients and arrays
+        self.update_grid()
 
-        self.__c1 = 1.0 / (2.0 * self._beam.dr ** 2)
-        self.__c2 = 1.0 / (4.0 * self._beam.dr)
-        self.__c3 = 2j * self._beam.medium.k_0
+    @property
+    def info(self):
+        return 'sweep_diffraction_executor_x'
+
+    def update_grid(self):
+        """
+        Recalculates sweep coefficients for current grid step and creates new solver
+
+        :return: None
+        """
+
+        # sweep coefficients
+
+        self.__c1 = 1.0 / (2.0 * self._beam.dx ** 2)
+        self.__c2 = 2j * self._beam.medium.k_0
+
+        n_x = self._beam.n_x
+        self.__alpha = full(shape=(n_x,), fill_value=self.__c1)
+        self.__gamma = full(shape=(n_x,), fill_value=self.__c1)
+        self.__sigma = full(shape=(n_x,), fill_value=2.0 * self.__c1)
 
-        self.__alpha = zeros(shape=(self._beam.n_r,), dtype=complex64)
-        self.__beta = zeros(shape=(self._beam.n_r,), dtype=complex64)
-        self.__gamma = zeros(shape=(self._beam.n_r,), dtype=complex64)
-        self.__vx = zeros(shape=(self._beam.n_r,), dtype=complex64)  # array responsible for accounting topological
-                                                                     # charge
+        self._create_solver(self.__alpha, self.__gamma, self.__sigma, self.__sigma, self.__c2, 0.0, 0.0)
 
-        for i in range(1, self._beam.n_r - 1):
-            self.__alpha[i] = self.__c1 + self.__c2 / self._beam.rs[i]
-            self.__gamma[i] = self.__c1 - self.__c2 / self._beam.rs[i]
-            self.__vx[i] = (self._beam.m / self._beam.rs[i]) ** 2  # topological charge accounting
 
-        self.__kappa_left, self.__mu_left, self.__kappa_right, self.__mu_right = \
-            1.0, 0.0, 0.0, 0.0
+class SweepDiffractionExecutorR(SweepDiffractionExecutor):
+    """
+    Class for modeling the diffraction of a 3-dimensional beam in axisymmetric approximation.
+    The grid along r can be non-uniform, the coefficients of the scheme are calculated from local grid steps.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
 
-        self.__delta = zeros(shape=(self._beam.n_r,), dtype=complex64)
-        self.__xi = zeros(shape=(self._beam.n_r,), dtype=complex64)
-        self.__eta = zeros(shape=(self._beam.n_r,), dtype=complex64)
+        self.update_grid()
 
     @property
     def info(self):
         return 'sweep_diffraction_executor_r'
 
-    @staticmethod
-    @jit(nopython=True)
-    def __fast_process(field, n_r, dz, c1, c3, alpha, beta, gamma, delta, xi, eta, vx,
-                     kappa_left, mu_left, kappa_right, mu_right):
+    def update_grid(self):
+        """
+        Recalculates sweep coefficients for current grid nodes and creates new solver
 
-        # left boundary condition
-        xi[1], eta[1] = kappa_left, mu_left
+        :return: None
+        """
 
-        # forward
-        for i in range(1, n_r - 1):
-            beta[i] = 2.0 * c1 + c3 / dz + vx[i]
-            delta[i] = alpha[i] * field[i + 1] - \
-                       (conj(beta[i]) - vx[i]) * field[i] + \
-                       gamma[i] * field[i - 1]
-            xi[i + 1] = alpha[i] / (beta[i] - gamma[i] * xi[i])
-            eta[i + 1] = (delta[i] + gamma[i] * eta[i]) / \
-                         (beta[i] - gamma[i] * xi[i])
+        # sweep coefficients
 
-        # right boundary condition
-        field[n_r - 1] = (mu_right + kappa_right * eta[n_r - 1]) / \
-                         (1.0 - kappa_right * xi[n_r - 1])
+        self.__c3 = 2j * self._beam.medium.k_0
 
-        # backward
-        for j in range(n_r - 1, 0, -1):
-            field[j - 1] = xi[j] * field[j] + eta[j]
+        self.__alpha, self.__gamma, self.__sigma, self.__rho = self.calculate_coefficients(self._beam.rs, self._beam.m)
 
-        return field
+        self._create_solver(self.__alpha, self.__gamma, self.__sigma, self.__rho, self.__c3, 1.0, 0.0)
 
-    def process_diffraction(self, dz):
+    @staticmethod
+    def calculate_coefficients(rs, m):
         """
-        :param dz: current step along evolutionary coordinate z
+        Calculates coefficients of the half of the operator d^2/dr^2 + 1/r d/dr - m^2/r^2 on the grid with local steps
+        h_-, h_+ at inner nodes:
 
-        :return: None
+            alpha = 1 / ((h_- + h_+) h_+) + 1 / (2 r (h_- + h_+)),
+            gamma = 1 / ((h_- + h_+) h_-) - 1 / (2 r (h_- + h_+)),
+            rho = 1 / (h_- h_+),
+
+        the term with topological charge m^2/r^2 is implicit and is added to the diagonal sigma of the implicit part.
+        On the uniform grid alpha = 1 / (2 dr^2) + 1 / (4 r dr), gamma = 1 / (2 dr^2) - 1 / (4 r dr), rho = 1 / dr^2.
+
+        :param rs: spatial grid nodes
+        :param m: topological charge
+
+        :return: arrays alpha, gamma, sigma, rho
         """
-        self._beam._field = self.__fast_process(self._beam._field, self._beam.n_r, dz, self.__c1,
-                                                self.__c3, self.__alpha, self.__beta, self.__gamma, self.__delta,
-                                                self.__xi, self.__eta, self.__vx, self.__kappa_left, self.__mu_left,
-                                                self.__kappa_right, self.__mu_right)
+        rs = array(rs)
+        n_r = rs.shape[0]
+
+        alpha, gamma, rho, vx = zeros(shape=(n_r,)), zeros(shape=(n_r,)), zeros(shape=(n_r,)), zeros(shape=(n_r,))
+
+        r, h_minus, h_plus = rs[1:-1], rs[1:-1] - rs[:-2], rs[2:] - rs[1:-1]
+        h_sum = h_minus + h_plus
+        alpha[1:-1] = 1.0 / (h_sum * h_plus) + 1.0 / (2.0 * r * h_sum)
+        gamma[1:-1] = 1.0 / (h_sum * h_minus) - 1.0 / (2.0 * r * h_sum)
+        rho[1:-1] = 1.0 / (h_minus * h_plus)
+        vx[1:-1] = (m / r) ** 2  # topological charge accounting
+
+        return alpha, gamma, rho + vx, rho
 
 
 class FourierDiffractionExecutorXY(DiffractionExecutor):
     """
     Class for modeling the diffraction of a 3-dimensional beam using fast Fourier transform in pyfftw.
+
+    Forward and backward FFTW plans are built once in the constructor for an aligned array owned by the executor.
+    The transforms are made in-place in this array, which also becomes the field array of the beam, so that no
+    planning and no allocation is made on each step along z.
+
+    If the on-disk storage of FFTW wisdom is given, wisdom is imported from it before planning and exported after it,
+    so the planning is expensive only for the first calculation with the given grid on the machine.
+
+    The linear phase shift multiplier in spectral space depends only on dz, so it is calculated once for every dz and
+    kept in the cache of bounded size with the least recently used eviction.
+
+    The grid is periodic, so the radiation leaving the grid through one boundary comes back through the opposite one.
+    To avoid it, absorbing layer of width absorbing_layer (in units of distance from the axis to the grid boundary) can
+    be used: the field in the layer is damped on every step by complex absorbing potential growing quadratically from
+    zero at the inner edge of the layer to absorption / z_diff at the boundary. The damping depends on |dz|, so it is
+    made also on negative substeps of fourth-order splitting schemes. The damping multiplier is also cached for every
+    |dz|.
     """
 
     MAX_NUMBER_OF_CPUS = cpu_count()  # number of threads for parallelization
+    PLANNER_EFFORTS = ('FFTW_ESTIMATE', 'FFTW_MEASURE', 'FFTW_PATIENT', 'FFTW_EXHAUSTIVE')  # allowed planner efforts
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+        self.__n_jobs = kwargs.get('n_jobs', self.MAX_NUMBER_OF_CPUS)  # number of threads for parallelization
+        self.__planner_effort = kwargs.get('planner_effort', 'FFTW_MEASURE')  # effort of FFTW planner
+        if self.__planner_effort not in self.PLANNER_EFFORTS:
+            raise Exception('Wrong planner effort!')
+
+        # on-disk storage of FFTW wisdom (for example, FFTWWisdom()), wisdom is not stored by default
+        self.__wisdom = kwargs.get('wisdom', None)
+
+        # cache of linear phase shift multipliers in spectral space for different steps along z
+        self.__kernel_cache_size = kwargs.get('kernel_cache_size', 4)  # maximum number of multipliers in cache
+        self.__kernels = OrderedDict()
+
+        # absorbing layer near the grid boundary
+        self.__absorbing_layer = kwargs.get('absorbing_layer', 0.0)  # width of layer (0 to disable)
+        self.__absorption = kwargs.get('absorption', 10.0)  # maximum absorption coefficient in units of 1 / z_diff
+        self.__masks = OrderedDict()  # cache of damping multipliers for different steps along z
+
+        # aligned array for in-place transforms, it is filled with the field only after planning, because
+        # planning with FFTW_MEASURE and more patient efforts overwrites the array
+        self.__field = empty_aligned(self._beam.field.shape, dtype=self._beam.field.dtype)
+
+        if self.__wisdom is not None:
+            self.__wisdom.load(self.__field.shape, self.__field.dtype, self.__n_jobs)
+
+        # forward and backward parallel fast Fourier transform plans
+        self.__fft = FFTW(self.__field, self.__field, axes=(0, 1), direction='FFTW_FORWARD',
+                          flags=(self.__planner_effort,), threads=self.__n_jobs)
+        self.__ifft = FFTW(self.__field, self.__field, axes=(0, 1), direction='FFTW_BACKWARD',
+                           flags=(self.__planner_effort,), threads=self.__n_jobs)
+
+        if self.__wisdom is not None:
+            self.__wisdom.save(self.__field.shape, self.__field.dtype, self.__n_jobs)
+
+        self.__field[:] = self._beam.field
+        self._beam._field = self.__field
+
     @property
     def info(self):
         return 'fourier_diffraction_executor_xy'
 
-    @staticmethod
-    @jit(nopython=True)
-    def __phase_increment(field_fft, n_x, n_y, k_xs, k_ys, current_lin_phase):
+    @property
+    def planner_effort(self):
+        return self.__planner_effort
+
+    @property
+    def n_jobs(self):
+        return self.__n_jobs
+
+    @property
+    def kernel_cache_size(self):
+        return self.__kernel_cache_size
+
+    @property
+    def absorbing_layer(self):
+        return self.__absorbing_layer
+
+    @property
+    def absorption(self):
+        return self.__absorption
+
+    def update_grid(self):
+        """
+        Clears the caches of linear phase shift and damping multipliers, which depend on the grid of the beam.
+        The shape of the grid is not changed by rescaling, so FFTW plans remain valid.
+
+        :return: None
         """
-        :param field_fft: spatial spectrum of the field array
-        :param n_x: number of points in spatial grid along x
-        :param n_y: number of points in spatial grid along y
-        :param k_xs: wave vector grid nosed along x
-        :param k_ys: wave vector grid nosed along y
-        :param current_lin_phase: linear phase shift in spectral space
+        self.__kernels.clear()
+        self.__masks.clear()
 
-        :return: spatial spectrum of the field array with linear phase shift along both axes
+    def __calculate_kernel(self, dz):
         """
-        for i in range(n_x):
-            field_fft[i, :] *= exp(current_lin_phase * k_xs[i] ** 2)
+        Calculates linear phase shift multiplier K(k_x, k_y) = exp(i dz (k_x^2 + k_y^2) / (2 k_0))
 
-        for j in range(n_y):
-            field_fft[:, j] *= exp(current_lin_phase * k_ys[j] ** 2)
+        :param dz: step along evolutionary coordinate z
 
-        return field_fft
+        :return: array with linear phase shift multiplier in spectral space
+        """
+
+        # calculation of current linear phase shift
+        current_lin_phase = 0.5j * dz / self._beam.medium.k_0
+
+        kernel = exp(current_lin_phase * self._beam.k_xs ** 2)[:, newaxis] * \
+                 exp(current_lin_phase * self._beam.k_ys ** 2)[newaxis, :]
+
+        return kernel.astype(self.__field.dtype)
+
+    def __calculate_mask(self, dz):
+        """
+        Calculates damping multiplier M(x, y) = exp(-|dz| absorption / z_diff ((d - 1 + layer) / layer)^2) in
+        the absorbing layer, where d is distance to the axis normalized to distance from the axis to the grid boundary.
+        The field is damped for negative substeps of fourth-order splitting schemes too, otherwise it would be amplified
+
+        :param dz: step along evolutionary coordinate z
+
+        :return: array with damping multiplier
+        """
+        _, boundary, _ = self._beam._get_geometry()
+        depth = (boundary - 1.0 + self.__absorbing_layer) / self.__absorbing_layer
+        depth[depth < 0.0] = 0.0
+
+        mask = exp(-abs(dz) * self.__absorption / self._beam.z_diff * depth ** 2)
+
+        return mask.astype(self.__field.real.dtype)
+
+    def __get_cached(self, cache, calculate, dz):
+        """
+        Returns multiplier for dz from the cache, calculating it if necessary.
+        The least recently used multiplier is removed if the cache is full.
+
+        :param cache: cache of multipliers
+        :param calculate: function calculating multiplier for dz
+        :param dz: step along evolutionary coordinate z
 
-    def process_diffraction(self, dz, n_jobs=MAX_NUMBER_OF_CPUS):
+        :return: array with multiplier
+        """
+        if dz in cache:
+            cache.move_to_end(dz)
+        else:
+            cache[dz] = calculate(dz)
+            if len(cache) > self.__kernel_cache_size:
+                cache.popitem(last=False)
+
+        return cache[dz]
+
+    def __get_kernel(self, dz):
+        """
+        Returns linear phase shift multiplier for dz from the cache, calculating it if necessary.
+        The least recently used multiplier is removed if the cache is full.
+
+        :param dz: step along evolutionary coordinate z
+
+        :return: array with linear phase shift multiplier in spectral space
+        """
+        return self.__get_cached(self.__kernels, self.__calculate_kernel, dz)
+
+    def __get_mask(self, dz):
+        """
+        :param dz: step along evolutionary coordinate z
+
+        :return: array with damping multiplier in absorbing layer
+        """
+        return self.__get_cached(self.__masks, self.__calculate_mask, abs(dz))
+
+    def process_diffraction(self, dz):
         """
         :param dz: current step along evolutionary coordinate z
-        :param n_jobs: number of threads for parallelization
 
         :return: None
         """
 
-        # calculation of current linear phase shift
-        current_lin_phase = 0.5j * dz / self._beam.medium.k_0
+        # the field array of the beam could be replaced by another object (e.g. by Kerr effect executor)
+        if self._beam._field is not self.__field:
+            self.__field[:] = self._beam._field
 
         # forward parallel fast Fourier transform
-        fft_obj = fft2(self._beam._field, threads=n_jobs)
+        self.__fft()
 
         # linear phase increment
-        field_fft = self.__phase_increment(fft_obj(), self._beam.n_x, self._beam.n_y, self._beam.k_xs,
-                                           self._beam.k_ys, current_lin_phase)
+        multiply(self.__field, self.__get_kernel(dz), out=self.__field)
+
+        # backward parallel fast Fourier transform (normalized)
+        self.__ifft()
 
-        # backward parallel fast Fourier transform
-        ifft_obj = ifft2(field_fft, threads=n_jobs)
+        # damping in absorbing layer
+        if self.__absorbing_layer:
+            multiply(self.__field, self.__get_mask(dz), out=self.__field)
 
         # field initialization with updated values
-        self._beam._field = ifft_obj()
+        self._beam._field = self.__field
@@ -0,0 +1,210 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count, get_context
+
+from numpy import zeros, full, nan, isnan, interp, array, asarray, where
+import pandas as pd
+from scipy.ndimage import label
+
+from .beam import BeamXY
+from .diffraction import FourierDiffractionExecutorXY
+from .kerr_effect import KerrExecutorXY
+from .propagation import Propagator
+from .stop_conditions import MaxIntensityStopCondition
+from .sweep import _initialize_worker, _limit_threads, _run_job
+
+
+class RunningStatistics:
+    """
+    Class for calculation of mean and variance of arrays on-the-fly by Welford's algorithm, so the arrays of all
+    realizations are not stored. NaN values (for example, at z not reached by the realization) are skipped.
+    """
+
+    def __init__(self, **kwargs):
+        shape = kwargs['shape']  # shape of accumulated arrays
+
+        self.__count = zeros(shape=shape, dtype=int)  # number of accumulated values
+        self.__mean = zeros(shape=shape)  # running mean
+        self.__m2 = zeros(shape=shape)  # running sum of squared deviations from mean
+
+    @property
+    def count(self):
+        return self.__count
+
+    @property
+    def mean(self):
+        return where(self.__count > 0, self.__mean, nan)
+
+    @property
+    def variance(self):
+        """Unbiased estimation of variance"""
+        return where(self.__count > 1, self.__m2 / (self.__count - 1).clip(min=1), nan)
+
+    def update(self, values):
+        """
+        Adds array of the next realization
+
+        :param values: array with the shape of accumulated arrays
+
+        :return: None
+        """
+        values = asarray(values, dtype=float)
+        mask = ~isnan(values)
+
+        self.__count[mask] += 1
+        delta = values[mask] - self.__mean[mask]
+        self.__mean[mask] += delta / self.__count[mask]
+        self.__m2[mask] += delta * (values[mask] - self.__mean[mask])
+
+
+class EnsembleRunner:
+    """
+    Class for Monte Carlo study of the propagation of BeamXY with multiplicative noise: the same configuration of
+    the beam is propagated for n_realizations realizations of the noise in a pool of processes.
+
+    The noise object (for example, GaussianNoise with fixed seed) is passed to the workers once at their start together
+    with the configuration, realization k of the noise is generated from its own random stream, so the ensemble is
+    reproducible. Every job creates its own BeamXY, diffraction and Kerr effect executors and propagator. Only the noise
+    object with the Gaussian envelope of its spectrum is shared by the jobs of one worker, and FFTW plans of the new
+    diffraction executor are built quickly with the wisdom from the on-disk storage, if it is given in diffraction
+    parameters (wisdom=FFTWWisdom()). Propagators of realizations do not write results (no results directories,
+    pictures of noise, logs and tracks), workers send back only small arrays: peak intensity on the grid zs, distance
+    of collapse and the number of filaments, which are accumulated on-the-fly, the fields are not stored.
+
+    Statistics of i_max / i_0 are calculated on the grid zs of evolutionary coordinate z (the tracks are interpolated,
+    z after the stop of the realization is skipped). If zs is None, the statistics are calculated for the steps along z,
+    which is correct for const_dz=True. Distance of collapse is z, at which the propagator stopped by the reason of
+    MaxIntensityStopCondition with max_intensity_to_stop (NaN if the propagation stopped by other reason). The number
+    of filaments is the number of connected regions with intensity higher than filament_threshold of the peak
+    intensity at the end of the propagation.
+
+    Worker processes are spawned, as in class SweepRunner, so the script using the class must be protected with
+    if __name__ == '__main__'.
+    """
+
+    def __init__(self, **kwargs):
+        self.__beam_params = kwargs['beam_params']  # parameters of BeamXY except noise
+        self.__noise = kwargs['noise']  # noise object
+        self.__n_realizations = kwargs['n_realizations']  # number of realizations of noise
+        self.__first_realization = kwargs.get('first_realization', 0)  # number of the first realization of noise
+        self.__propagator_params = kwargs.get('propagator_params', {})  # parameters of propagator
+        self.__diffraction_class = kwargs.get('diffraction_class', FourierDiffractionExecutorXY)
+        self.__kerr_effect_class = kwargs.get('kerr_effect_class', KerrExecutorXY)
+
+        self.__zs = kwargs.get('zs', None)  # grid of evolutionary coordinate z for statistics
+        self.__filament_threshold = kwargs.get('filament_threshold', 0.5)  # level of filaments relative to i_max
+
+        self.__n_workers = kwargs.get('n_workers', cpu_count())  # number of worker processes
+        self.__n_threads = kwargs.get('n_threads', max(1, cpu_count() // self.__n_workers))  # threads per worker
+
+        self.__collapse_distances = None
+        self.__n_filaments = None
+        self.__df = None
+
+    @property
+    def info(self):
+        return 'ensemble_runner'
+
+    @property
+    def realizations(self):
+        return list(range(self.__first_realization, self.__first_realization + self.__n_realizations))
+
+    @property
+    def n_workers(self):
+        return self.__n_workers
+
+    @property
+    def n_threads(self):
+        return self.__n_threads
+
+    @property
+    def collapse_distances(self):
+        return self.__collapse_distances
+
+    @property
+    def n_filaments(self):
+        return self.__n_filaments
+
+    @property
+    def df(self):
+        return self.__df
+
+    def __count_filaments(self, beam):
+        """Counts connected regions with intensity higher than filament_threshold of the peak intensity"""
+
+        intensity = beam.intensity
+        _, n_filaments = label(intensity > self.__filament_threshold * intensity.max())
+
+        return n_filaments
+
+    def __n_points(self):
+        return len(self.__zs) if self.__zs is not None else int(self.__propagator_params['n_z']) + 1
+
+    def run_job(self, job_idx):
+        """
+        Runs the propagation for one realization of noise
+
+        :param job_idx: index of job
+
+        :return: number of realization, arrays of z and i_max / i_0 for statistics, distance of collapse and
+        the number of filaments
+        """
+        realization = self.realizations[job_idx]
+        self.__noise.realization = realization
+        _limit_threads(self.__n_threads, noise=self.__noise)
+        beam = BeamXY(noise=self.__noise, **self.__beam_params)
+
+        propagator_params = dict(self.__propagator_params)
+        for name, value in propagator_params.items():
+            if callable(value):
+                propagator_params[name] = value(beam)
+        _limit_threads(self.__n_threads, spectrum=propagator_params.get('spectrum', None))
+        propagator_params['diffraction'] = self.__diffraction_class(beam=beam, n_jobs=self.__n_threads)
+        propagator_params['kerr_effect'] = self.__kerr_effect_class(beam=beam)
+
+        propagator = Propagator(beam=beam, write_results=False, **propagator_params)
+        propagator.propagate()
+
+        states_arr = propagator.states_arr
+        zs, i_max = states_arr[:, 0], states_arr[:, propagator.states_columns.index('i_max / i_0')]
+        if self.__zs is not None:
+            i_max = interp(self.__zs, zs, i_max, right=nan)
+        else:
+            n = min(len(zs), self.__n_points())
+            zs_padded, i_max_padded = full(self.__n_points(), nan), full(self.__n_points(), nan)
+            zs_padded[:n], i_max_padded[:n] = zs[:n], i_max[:n]
+            zs, i_max = zs_padded, i_max_padded
+
+        collapse = MaxIntensityStopCondition(max_intensity=propagator_params.get('max_intensity_to_stop', 10**17))
+        collapse_distance = propagator.z if propagator.stop_reason == collapse.reason else nan
+
+        return realization, zs, i_max, collapse_distance, self.__count_filaments(beam)
+
+    def run(self):
+        """
+        Runs all realizations in the pool of processes and accumulates statistics
+
+        :return: dataframe with mean and variance of i_max / i_0 and the number of realizations for every z
+        """
+        z_statistics = RunningStatistics(shape=self.__n_points())
+        i_max_statistics = RunningStatistics(shape=self.__n_points())
+        collapse_distances, n_filaments = {}, {}
+
+        with ProcessPoolExecutor(max_workers=self.__n_workers,
+                                 mp_context=get_context('spawn'),
+                                 initializer=_initialize_worker,
+                                 initargs=(self, self.__n_threads)) as executor:
+            for realization, zs, i_max, collapse_distance, n in executor.map(_run_job, range(self.__n_realizations)):
+                if self.__zs is None:
+                    z_statistics.update(zs)
+                i_max_statistics.update(i_max)
+                collapse_distances[realization], n_filaments[realization] = collapse_distance, n
+
+        self.__collapse_distances = array([collapse_distances[k] for k in self.realizations])
+        self.__n_filaments = array([n_filaments[k] for k in self.realizations])
+
+        self.__df = pd.DataFrame({'z, m': self.__zs if self.__zs is not None else z_statistics.mean,
+                                  'realizations': i_max_statistics.count,
+                                  'i_max / i_0 mean': i_max_statistics.mean,
+                                  'i_max / i_0 variance': i_max_statistics.variance})
+
+        return self.__df
@@ -0,0 +1,160 @@
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from threading import Thread
+from numpy import array, ascontiguousarray
+import h5py
+
+
+class FieldStore:
+    """
+    Сlass for streaming of the field along evolutionary coordinate z into one HDF5 file.
+
+    The fields are appended to the dataset 'field' with z as the first growing axis, every field is one chunk
+    compressed by the standard HDF5 deflate filter, so the file can be read by any HDF5 tool. Values of z, dz and
+    numbers of steps are appended to the datasets 'z', 'dz' and 'n_step', the attributes of the file contain
+    the parameters of calculations.
+
+    The method append only copies the field and returns: the chunks are compressed by zlib in the pool of n_threads
+    threads (zlib releases GIL, so the compression does not slow down the main cycle of propagation) and are written
+    in order of appending by the background thread directly, without filter pipeline of HDF5. The main cycle waits
+    only if queue_size fields are not yet written.
+    """
+
+    def __init__(self, **kwargs):
+        self.__path = kwargs['path']  # path to HDF5 file
+        self.__compression_level = kwargs.get('compression_level', 1)  # level of deflate compression (0 to disable)
+        self.__n_threads = kwargs.get('n_threads', 2)  # number of threads for compression
+        self.__queue_size = kwargs.get('queue_size', 8)  # maximum number of fields waiting for writing
+        self.__attrs = kwargs.get('attrs', {})  # parameters of calculations saved as attributes
+
+        self.__file = None
+        self.__pool = None
+        self.__queue = None
+        self.__writer = None
+        self.__error = None  # exception raised in writer thread
+        self.__n_fields = 0  # number of appended fields
+        self.__n_written = 0  # number of written fields
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def n_fields(self):
+        return self.__n_fields
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __open(self, shape, dtype):
+        """Creates HDF5 file with resizable datasets and starts compression and writer threads"""
+
+        self.__file = h5py.File(self.__path, 'w')
+        self.__file.create_dataset('field', shape=(0,) + shape, maxshape=(None,) + shape, chunks=(1,) + shape,
+                                   dtype=dtype, compression='gzip' if self.__compression_level else None)
+        for name, dtype_ in (('z', float), ('dz', float), ('n_step', int)):
+            self.__file.create_dataset(name, shape=(0,), maxshape=(None,), chunks=(1024,), dtype=dtype_)
+        for name, value in self.__attrs.items():
+            self.__file.attrs[name] = value
+
+        self.__pool = ThreadPoolExecutor(max_workers=self.__n_threads)
+        self.__queue = Queue(maxsize=self.__queue_size)
+        self.__writer = Thread(target=self.__write, daemon=True)
+        self.__writer.start()
+
+    def __compress(self, field):
+        """Makes chunk of the dataset from the field"""
+
+        chunk = ascontiguousarray(field).tobytes()
+        if self.__compression_level:
+            chunk = zlib.compress(chunk, self.__compression_level)
+
+        return chunk
+
+    def __write(self):
+        """Writes chunks from the queue to the file until None is received"""
+
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                break
+            if self.__error is not None:
+                continue
+            try:
+                future, z, dz, n_step = item
+                n = self.__n_written
+                for name in ('field', 'z', 'dz', 'n_step'):
+                    dataset = self.__file[name]
+                    if dataset.shape[0] == n:
+                        dataset.resize(2 * n + 1, axis=0)  # datasets grow by doubling to avoid resizing on every step
+                self.__file['field'].id.write_direct_chunk((n,) + (0,) * (self.__file['field'].ndim - 1),
+                                                          future.result())
+                self.__file['z'][n], self.__file['dz'][n], self.__file['n_step'][n] = z, dz, n_step
+                self.__n_written += 1
+            except Exception as e:
+                self.__error = e
+
+    def __check_error(self):
+        if self.__error is not None:
+            raise self.__error
+
+    def append(self, field, z, dz=0.0, n_step=None):
+        """
+        Appends the copy of the field to the store
+
+        :param field: array for complex light field
+        :param z: current value of evolutionary coordinate z
+        :param dz: current step along z
+        :param n_step: number of step
+
+        :return: None
+        """
+        if self.__file is None:
+            self.__open(field.shape, field.dtype)
+        self.__check_error()
+
+        future = self.__pool.submit(self.__compress, array(field))
+        self.__queue.put((future, z, dz, self.__n_fields if n_step is None else n_step))
+        self.__n_fields += 1
+
+    def close(self):
+        """
+        Waits until all the fields are written and closes the file
+
+        :return: None
+        """
+        if self.__file is None:
+            return
+
+        try:
+            self.__queue.put(None)
+            self.__writer.join()
+            self.__pool.shutdown()
+            for name in ('field', 'z', 'dz', 'n_step'):
+                self.__file[name].resize(self.__n_written, axis=0)
+        finally:
+            self.__file.close()
+            self.__file = None
+
+        self.__check_error()
+
+
+def load_fields(path, n_steps=None):
+    """
+    Loads fields from the store
+
+    :param path: path to HDF5 file
+    :param n_steps: indices of fields to load (all fields if None)
+
+    :return: dictionary with arrays of fields, z, dz, numbers of steps and attributes of the store
+    """
+    with h5py.File(path, 'r') as f:
+        idx = slice(None) if n_steps is None else n_steps
+        data = {name: f[name][idx] for name in ('field', 'z', 'dz', 'n_step')}
+        data['attrs'] = dict(f.attrs)
+
+    return data
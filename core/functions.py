@@ -1,4 +1,4 @@
-from numpy import sqrt, transpose, zeros, float64, complex64, pi
+from numpy import sqrt, transpose, zeros, float64, complex64, pi, load
 from scipy.special import gamma
 from numba import jit
 from glob import glob
@@ -44,10 +44,49 @@ def parse_args():
     return parser.parse_args()
 
 
-def xlsx_to_df(path_to_xlsx, normalize_z_to=10**2, normalize_i_to=10**17):
-    """Converts xlsx propagation file to pandas dataframe with some normalized columns"""
+def load_track(path_to_track):
+    """
+    Loads propagation file saved by Logger in any format (npz, csv, parquet or xlsx)
+
+    :param path_to_track: path to propagation file
+
+    :return: pandas dataframe with columns of states array, the stop reason and the number of steps are saved in
+    attributes 'stop reason' and 'number of steps' of the dataframe
+    """
+    ext = os.path.splitext(path_to_track)[1]
+    stop_reason = None
+    if ext == '.npz':
+        with load(path_to_track) as data:
+            df = pd.DataFrame(data['states_arr'], columns=[str(e) for e in data['states_columns']])
+            stop_reason = str(data['stop_reason']) or None
+    elif ext == '.csv':
+        with open(path_to_track) as f:
+            first_line = f.readline()
+        prefix = '# stop reason: '
+        if first_line.startswith(prefix):
+            stop_reason = first_line[len(prefix):].rstrip('\n')
+        df = pd.read_csv(path_to_track, skiprows=1 if stop_reason is not None else 0, float_precision='round_trip')
+    elif ext == '.parquet':
+        df = pd.read_parquet(path_to_track)
+        stop_reason = df.attrs.get('stop reason')
+    elif ext == '.xlsx':
+        sheets = pd.read_excel(path_to_track, sheet_name=None, header=None)
+        states = next(iter(sheets.values())).values
+        df = pd.DataFrame(states[1:].astype(float), columns=[str(e) for e in states[0]])
+        if 'summary' in sheets:
+            stop_reason = sheets['summary'].iloc[0, 1]
+    else:
+        raise Exception('Wrong track format!')
+
+    df.attrs = {'stop reason': stop_reason, 'number of steps': df.shape[0] - 1}
+
+    return df
+
+
+def track_to_df(path_to_track, normalize_z_to=10**2, normalize_i_to=10**17):
+    """Converts propagation file to pandas dataframe with some normalized columns"""
 
-    df = pd.read_excel(path_to_xlsx)
+    df = load_track(path_to_track)
 
     df['z, m'] *= normalize_z_to
     df['dz, m'] *= normalize_z_to
@@ -58,6 +97,12 @@ def xlsx_to_df(path_to_xlsx, normalize_z_to=10**2, normalize_i_to=10**17):
     return df
 
 
+def xlsx_to_df(path_to_xlsx, normalize_z_to=10**2, normalize_i_to=10**17):
+    """Converts xlsx propagation file to pandas dataframe with some normalized columns"""
+
+    return track_to_df(path_to_xlsx, normalize_z_to, normalize_i_to)
+
+
 def calc_ticks_x(labels, xs):
     """Calculates grid points corresponding to labels along axis"""
 
@@ -178,6 +223,17 @@ def create_dir(**kwargs):
     return res_path
 
 
+def create_cache_dir(name):
+    """Creates (if needed) directory for cached data, which is shared by all calculations on the machine"""
+
+    root_dir = os.environ.get('SELF_FOCUSING_CACHE_DIR',
+                              os.path.join(os.path.expanduser('~'), '.cache', 'self-focusing'))
+    cache_dir = os.path.join(root_dir, name)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    return cache_dir
+
+
 def create_multidir(global_root_dir, global_results_dir_name, prefix):
     """Creates directory for multidir mode"""
 
@@ -187,32 +243,88 @@ def create_multidir(global_root_dir, global_results_dir_name, prefix):
     return results_dir, results_dir_name
 
 
-def make_animation(root_dir, name, images_dir_name='images', fps=10):
-    """Makes gif-animation from series of pictures"""
+def iterate_frames(root_dir, images_dir_name='images'):
+    """Yields pictures from directory as RGB arrays one by one in order of their names"""
+
+    for file in sorted(glob(root_dir + '/' + images_dir_name + '/*.png')):
+        yield cv2.imread(file)[:, :, ::-1]
+
+
+def _fit_frames(frames):
+    """Yields frames resized to the size of the first frame"""
+
+    height, width = None, None
+    for frame in frames:
+        if height is None:
+            height, width = frame.shape[:2]
+        elif frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, (width, height))
+        yield frame
+
+
+def encode_frames(root_dir, name, frames, fps=10, animation=True, video=True):
+    """
+    Encodes series of frames to gif-animation and (or) video in one pass. Frames are encoded one by one, so the memory
+    does not depend on their number.
+
+    :param root_dir: directory for gif-animation and video
+    :param name: name of gif-animation and video
+    :param frames: iterable of RGB frames
+    :param fps: frames per second
+    :param animation: make gif-animation
+    :param video: make video
+
+    :return: None
+    """
+    gif, avi = None, None
+    try:
+        for frame in _fit_frames(frames):
+            if animation and gif is None:
+                gif = imageio.get_writer(root_dir + '/' + name + '.gif', mode='I', fps=fps)
+            if video and avi is None:
+                height, width = frame.shape[:2]
+                fourcc = cv2.VideoWriter_fourcc(*'MJPG')
+                avi = cv2.VideoWriter(root_dir + '/' + name + '.avi', fourcc, fps, (width, height))
+
+            if gif is not None:
+                gif.append_data(frame)
+            if avi is not None:
+                avi.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+    finally:
+        if gif is not None:
+            gif.close()
+        if avi is not None:
+            avi.release()
+
+
+def make_animation(root_dir, name, images_dir_name='images', fps=10, frames=None):
+    """
+    Makes gif-animation from series of pictures
 
-    images_for_animation = []
-    for file in glob(root_dir + '/' + images_dir_name + '/*.png'):
-        images_for_animation.append(imageio.imread(file))
-    imageio.mimsave(root_dir + '/' + name + '.gif', images_for_animation, fps=fps)
+    :param frames: iterable of RGB frames (for example, produced by RasterRenderer), if None the pictures are read
+    from directory images_dir_name
 
+    :return: None
+    """
+    if frames is None:
+        frames = iterate_frames(root_dir, images_dir_name)
 
-def make_video(root_dir, name, images_dir_name='images', fps=10):
-    """Makes video from series of pictures"""
+    encode_frames(root_dir, name, frames, fps=fps, video=False)
 
-    images_for_video = []
-    for file in glob(root_dir + '/' + images_dir_name + '/*.png'):
-        images_for_video.append(cv2.imread(file))
 
-    height, width, leyers = images_for_video[0].shape
+def make_video(root_dir, name, images_dir_name='images', fps=10, frames=None):
+    """
+    Makes video from series of pictures
 
-    fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-    video = cv2.VideoWriter(root_dir + '/' + name + '.avi', fourcc, fps, (width, height))
+    :param frames: iterable of RGB frames (for example, produced by RasterRenderer), if None the pictures are read
+    from directory images_dir_name
 
-    for img in images_for_video:
-        video.write(cv2.resize(img, (width, height)))
+    :return: None
+    """
+    if frames is None:
+        frames = iterate_frames(root_dir, images_dir_name)
 
-    cv2.destroyAllWindows()
-    video.release()
+    encode_frames(root_dir, name, frames, fps=fps, animation=False)
 
 
 def compile_to_pdf(tex_file_path, delete_tmp_files=True, delete_tex_file=False):
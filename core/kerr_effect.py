@@ -1,6 +1,6 @@
 from abc import ABCMeta, abstractmethod
-from numba import jit
-from numpy import exp, multiply
+from numba import jit, prange
+from numpy import exp
 
 
 class KerrExecutor(metaclass=ABCMeta):
@@ -8,6 +8,9 @@ class KerrExecutor(metaclass=ABCMeta):
     Abstract class for Kerr effect object.
     The class takes on the input in the constructor a beam object, which contains all the necessary beam parameters
     for further calculations.
+
+    The Kerr phase shift is applied in-place in one parallel pass over the field, in which the intensity of the beam
+    and its maximum are also updated, so the beam intensity need not be updated after the Kerr effect.
     """
 
     def __init__(self, **kwargs):
@@ -19,16 +22,23 @@ class KerrExecutor(metaclass=ABCMeta):
         """KerrExecutor type"""
 
     @staticmethod
-    @jit(nopython=True)
-    def phase_increment(field, intensity, current_nonlin_phase):
+    @jit(nopython=True, parallel=True)
+    def __fast_process(field, intensity, current_nonlin_phase):
         """
-        :param field: array for complex light field
-        :param intensity: array for float intensity of the field
+        :param field: flattened array for complex light field, nonlinear phase shift is incremented in-place
+        :param intensity: flattened array for float intensity of the field, it is filled in-place
         :param current_nonlin_phase: current nonlinear phase shift
 
-        :return: field with nonlinear incremented phase shift
+        :return: maximum of intensity
         """
-        return multiply(field, exp(current_nonlin_phase * intensity))
+        i_max = 0.0
+        for k in prange(field.shape[0]):
+            i = field[k].real ** 2 + field[k].imag ** 2
+            field[k] *= exp(current_nonlin_phase * i)
+            intensity[k] = i
+            i_max = max(i_max, i)
+
+        return i_max
 
     def process_kerr_effect(self, dz):
         """
@@ -36,8 +46,9 @@ class KerrExecutor(metaclass=ABCMeta):
 
         :return: None
         """
-        self.__beam._field = self.phase_increment(self.__beam._field, self.__beam.intensity,
-                                                  self.__nonlin_phase_const * dz)
+        intensity = self.__beam._allocate_intensity()
+        self.__beam._i_max = self.__fast_process(self.__beam._flat_field(), intensity.reshape(-1),
+                                                 self.__nonlin_phase_const * dz) * self.__beam.i_0
 
 
 class KerrExecutorX(KerrExecutor):
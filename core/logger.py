@@ -1,6 +1,9 @@
 from collections import OrderedDict
+from importlib.util import find_spec
 from time import time
 from datetime import timedelta
+from numpy import savez, array
+import pandas as pd
 from xlsxwriter import Workbook
 
 from .functions import compile_to_pdf
@@ -11,15 +14,27 @@ class Logger:
     Сlass intended for logging information on the propagation of a laser beam
     """
 
+    TRACK_FORMATS = ('npz', 'csv', 'parquet', 'xlsx')  # allowed formats of propagation file
+
     def __init__(self, **kwargs):
-        self.__path = kwargs['path']  # results directory
+        self.__path = kwargs['path']  # results directory (None if nothing is written)
         self.__diffraction = kwargs['diffraction']  # diffraction object
         self.__kerr_effect = kwargs['kerr_effect']  # kerr effect object
 
-        self.__track_filename = self.__path + '/propagation.xlsx'  # full path of propagation file
+        self.__track_format = kwargs.get('track_format', 'xlsx')  # format of propagation file
+        if self.__track_format not in self.TRACK_FORMATS:
+            raise Exception('Wrong track format!')
+        if self.__track_format == 'parquet' and find_spec('pyarrow') is None and find_spec('fastparquet') is None:
+            raise Exception('Wrong track format! Parquet propagation file needs pyarrow or fastparquet installed')
+        self.__track_filename = self.__path + '/propagation.' + self.__track_format \
+            if self.__path is not None else None  # full path of propagation file
 
         self.__functions = OrderedDict()  # dict for calculations of functions operation time
 
+    @property
+    def track_format(self):
+        return self.__track_format
+
     @property
     def track_filename(self):
         return self.__track_filename
@@ -320,9 +335,19 @@ $h_x$ & %.2f & $\mu$m \\tabularnewline
 '''$r_{max}$ & % d & $\mu$m \\tabularnewline
 \hline
 $n_r$ & %d & -- \\tabularnewline
-\hline
+''' % (round(beam.r_max * 10**6), beam.n_r)
+            if beam.grid == 'uniform':
+                tex_file_data += \
+'''\hline
 $h_r$ & %.2f & $\mu$m \\tabularnewline
-''' % (round(beam.r_max * 10**6), beam.n_r, round(beam.dr * 10**6))
+''' % round(beam.dr * 10**6)
+            else:
+                tex_file_data += \
+'''\hline
+$h_{r, min}$ & %.2f & $\mu$m \\tabularnewline
+\hline
+$h_{r, max}$ & %.2f & $\mu$m \\tabularnewline
+''' % (round(beam.dr_min * 10**6, 2), round(beam.dr_max * 10**6, 2))
         elif beam.info == 'beam_xy':
             tex_file_data += \
 '''$x_{max}$ & %d & $\mu$m \\tabularnewline
@@ -399,15 +424,36 @@ $I_{stop}$ & %.2f & TW/cm$^2$ \\tabularnewline
                                                                         states_arr[n_step, 3])
         print(output_string)
 
-    def log_track(self, states_arr, states_columns):
+    def log_track(self, states_arr, states_columns, stop_reason=None):
         """
-        Saves to the xlsx-document the information from states_arr with columns from states_columns
+        Saves the information from states_arr with columns from states_columns to the propagation file. The whole
+        array is written at once in the format track_format: 'npz', 'csv', 'parquet' (requires pyarrow or fastparquet)
+        or 'xlsx'. The file can be read by function load_track.
 
         :param states_arr: array with data about propagation
         :param states_columns: columns for states array
+        :param stop_reason: reason of the stop of calculations, it is saved with the number of steps as metadata
 
         :return: None
         """
+        if self.__track_format == 'npz':
+            savez(self.__track_filename, states_arr=states_arr, states_columns=array(states_columns),
+                  stop_reason=array('' if stop_reason is None else stop_reason))
+        elif self.__track_format == 'csv':
+            with open(self.__track_filename, 'w') as f:
+                if stop_reason is not None:
+                    f.write('# stop reason: %s\n' % stop_reason)
+                pd.DataFrame(states_arr, columns=states_columns).to_csv(f, index=False)
+        elif self.__track_format == 'parquet':
+            df = pd.DataFrame(states_arr, columns=states_columns)
+            if stop_reason is not None:
+                df.attrs['stop reason'] = stop_reason
+            df.to_parquet(self.__track_filename, index=False)
+        else:
+            self.__log_track_xlsx(states_arr, states_columns, stop_reason)
+
+    def __log_track_xlsx(self, states_arr, states_columns, stop_reason):
+        """Saves to the xlsx-document the information from states_arr, stop_reason is saved in the second worksheet"""
 
         workbook = Workbook(self.__track_filename)
 
@@ -416,15 +462,19 @@ $I_{stop}$ & %.2f & TW/cm$^2$ \\tabularnewline
         format_precise_general = workbook.add_format({'num_format': '###0.0000000', 'align': 'center'})
         format_precise_intensity = workbook.add_format({'num_format': '0.00000E+00', 'align': 'center'})
 
-        for col in range(len(states_columns)):
-            worksheet.set_column(0, col, 30)
-            worksheet.write(0, col, states_columns[col], bold)
+        worksheet.set_column(0, len(states_columns) - 1, 30)
+        worksheet.write_row(0, 0, states_columns, bold)
+
+        for col in range(states_arr.shape[1]):
+            worksheet.write_column(1, col, states_arr[:, col].tolist(),
+                                   format_precise_intensity if col == 3 else format_precise_general)
 
-        for row in range(states_arr.shape[0]):
-            for col in range(states_arr.shape[1]):
-                if col != 3:
-                    worksheet.write(row + 1, col, states_arr[row, col], format_precise_general)
-                else:
-                    worksheet.write(row + 1, col, states_arr[row, col], format_precise_intensity)
+        if stop_reason is not None:
+            worksheet_summary = workbook.add_worksheet('summary')
+            worksheet_summary.set_column(0, 1, 30)
+            worksheet_summary.write(0, 0, 'stop reason', bold)
+            worksheet_summary.write(0, 1, stop_reason)
+            worksheet_summary.write(1, 0, 'number of steps', bold)
+            worksheet_summary.write(1, 1, states_arr.shape[0] - 1)
 
         workbook.close()
@@ -1,9 +1,12 @@
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import cpu_count
 from pyfftw.builders import ifft2
-from numpy import sqrt, pi, exp, zeros, float64, complex64, correlate, var
-from numpy import random, mean
-from numpy.fft import fftshift
-from numba import jit
+from numpy import sqrt, pi, exp, empty, float64, complex64, var, arange, newaxis, sum as summ
+from numpy import mean
+from numpy.fft import ifftshift, rfft, irfft
+from numpy.random import SeedSequence, default_rng
+from scipy.fftpack import next_fast_len
 
 
 class ComplexNoise(metaclass=ABCMeta):
@@ -13,11 +16,14 @@ class ComplexNoise(metaclass=ABCMeta):
     a complex multiplicative noise can be introduced with a certain percentage contribution.
 
     In general, such characteristics as the variance and correlation radius should be calculated.
-    Аrrays are created for storing the most complex noise, as well as for its real and imaginary parts. In addition,
+    An array is created for storing the most complex noise, its real and imaginary parts are views of it. In addition,
     autocorrelation functions are calculated along the coordinates of x and y for the real and imaginary parts
-    of the noise.
+    of the noise. The characteristics are needed only for diagnostics, so they are calculated on the first access and
+    are kept until the next noise field is generated.
     """
 
+    __autocorr_names = ('autocorr_real_x', 'autocorr_real_y', 'autocorr_imag_x', 'autocorr_imag_y')
+
     def __init__(self, **kwargs):
         self._variance_expected = kwargs.get('variance', 1)  # variance
 
@@ -25,28 +31,33 @@ class ComplexNoise(metaclass=ABCMeta):
         self._r_corr_in_points = None
 
         self._noise_field = None  # array for complex noise
-        self._noise_field_real = None  # array for the real part of complex noise
-        self._noise_field_imag = None  # array for the imaginary part of complex noise
 
-        self._autocorr_real_x = None  # autocorr function of real part of complex noise when averaged along x (len=n_y)
-        self._autocorr_real_y = None  # autocorr function of real part of complex noise when averaged along y (len=n_x)
-        self._autocorr_imag_x = None  # autocorr function of real part of complex noise when averaged along x (len=n_y)
-        self._autocorr_imag_y = None  # autocorr function of real part of complex noise when averaged along y (len=n_x)
+        self._variance_real = None  # variance of real part of complex noise
+        self._variance_imag = None  # variance of imaginary part of complex noise
+        self._autocorrs = None  # autocorr functions of real and imaginary parts of complex noise when averaged
+                                # along x (len=n_y) and y (len=n_x): real_x, real_y, imag_x, imag_y
+        self._r_corr = None  # correlation radius calculated by autocorr functions
 
         # spatial grid parameters
         self._n_x, self._n_y, self._dx, self._dy = None, None, None, None
 
+        self._cache = kwargs.get('cache', None)  # on-disk storage of noise (None to disable)
+
     @property
     def variance_expected(self):
         return self._variance_expected
 
     @property
     def variance_real(self):
-        return var(self._noise_field_real)
+        if self._variance_real is None:
+            self._variance_real = var(self.noise_field_real, dtype=float64)
+        return self._variance_real
 
     @property
     def variance_imag(self):
-        return var(self._noise_field_imag)
+        if self._variance_imag is None:
+            self._variance_imag = var(self.noise_field_imag, dtype=float64)
+        return self._variance_imag
 
     @property
     def r_corr_in_meters(self):
@@ -56,9 +67,32 @@ class ComplexNoise(metaclass=ABCMeta):
     def noise_field(self):
         return self._noise_field
 
+    @property
+    def noise_field_real(self):
+        return self._noise_field.real
+
+    @property
+    def noise_field_imag(self):
+        return self._noise_field.imag
+
     @property
     def autocorrs(self):
-        return self._autocorr_real_x, self._autocorr_real_y, self._autocorr_imag_x, self._autocorr_imag_y
+        if self._autocorrs is None:
+            self._load_autocorrelations()
+        return self._autocorrs
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def cache_key(self):
+        """Hash of all parameters determining the noise for on-disk storage (None if the noise is not cached)"""
+        return None
+
+    @property
+    def statistics(self):
+        return dict(zip(self.__autocorr_names, self.autocorrs))
 
     def initialize(self, **params):
         """Initialization of grid parameters and correlation radius in points"""
@@ -70,60 +104,69 @@ class ComplexNoise(metaclass=ABCMeta):
 
         self._r_corr_in_points = self._r_corr_in_meters // max(self._dx, self._dy)
 
-    @staticmethod
-    @jit(nopython=True)
-    def _initialize_noise_arrays(noise_field, n_x, n_y):
-        """
-        Initialization of real and imaginary parts of complex noise in corresponding arrays
-        """
-
-        real_part = zeros(shape=(n_x, n_y), dtype=float64)
-        imag_part = zeros(shape=(n_x, n_y), dtype=float64)
+    def _set_noise_field(self, noise_field):
+        """Sets new noise field and resets its characteristics"""
 
-        for i in range(n_x):
-            for j in range(n_y):
-                real_part[i, j] = noise_field[i, j].real
-                imag_part[i, j] = noise_field[i, j].imag
-
-        return real_part, imag_part
+        self._noise_field = noise_field
+        self._variance_real, self._variance_imag = None, None
+        self._autocorrs = None
+        self._r_corr = None
 
     @abstractmethod
     def process(self):
-        """Noise and autocorr functions generation"""
+        """Noise generation"""
 
     @staticmethod
-    def __calculate_autocorr(noise, n_iter, n, autocorr_type):
-        """
-        Calculation of autocorrelation function
+    def __calculate_autocorr(noise, autocorr_type):
+        r"""
+        Calculation of autocorrelation function by Wiener-Khinchin theorem: power spectra of all spatial layers
+        zero-padded to avoid circular correlation are summed up and transformed back by one inverse FFT.
+        The result is the same as averaged numpy.correlate(layer, layer, mode='same').
+
+        LATEX SYNTAX:
+        R(l) = \frac{1}{N_{iter}} \sum\limits_{i} \sum\limits_{j} \xi_{i, j+l} \xi_{i, j}
+             = \frac{1}{N_{iter}} \mathcal{F}^{-1} \left[ \sum\limits_{i} |\mathcal{F}[\xi_i]|^2 \right] (l)
 
         :param noise: noise array (real or imaginary part of complex noise)
-        :param n_iter: the number of spatial layers over which the autocorr function is averaged
-                       for x-functions it is n_x, for y-functions it is n_y
-        :param n: size of autocorr array
         :param autocorr_type: axis, along which autocorrelation function is averaged
+                              for x-functions layers are rows, for y-functions layers are columns
 
         :return: averaged along one axis autocorrelation function
         """
+        if autocorr_type == 'x':
+            layers = noise
+        elif autocorr_type == 'y':
+            layers = noise.T
+        else:
+            raise Exception('Wrong type!')
 
-        autocorr = zeros(shape=(n,), dtype=float64)
-        for i in range(n_iter):
-            if autocorr_type == 'x':
-                autocorr += correlate(noise[i, :], noise[i, :], mode='same')
-            elif autocorr_type == 'y':
-                autocorr += correlate(noise[:, i], noise[:, i], mode='same')
-            else:
-                raise Exception('Wrong type!')
-            autocorr /= n_iter
+        n_iter, n = layers.shape  # the number of spatial layers and size of autocorr array
+        n_fft = next_fast_len(2 * n - 1)
+        power = summ(abs(rfft(layers, n=n_fft, axis=1)) ** 2, axis=0)
+        autocorr = irfft(power, n=n_fft)
 
-        return autocorr
+        # lags from -n // 2 to n - n // 2 - 1 as in mode 'same'
+        return autocorr[(arange(n) - n // 2) % n_fft] / n_iter
 
     def _calculate_autocorrelations(self):
         """Calculation of all 4 autocorrelation functions"""
 
-        self._autocorr_real_x = self.__calculate_autocorr(self._noise_field_real, self._n_x, self._n_y, 'x')
-        self._autocorr_real_y = self.__calculate_autocorr(self._noise_field_real, self._n_y, self._n_x, 'y')
-        self._autocorr_imag_x = self.__calculate_autocorr(self._noise_field_imag, self._n_x, self._n_y, 'x')
-        self._autocorr_imag_y = self.__calculate_autocorr(self._noise_field_imag, self._n_y, self._n_x, 'y')
+        self._autocorrs = (self.__calculate_autocorr(self.noise_field_real, 'x'),
+                           self.__calculate_autocorr(self.noise_field_real, 'y'),
+                           self.__calculate_autocorr(self.noise_field_imag, 'x'),
+                           self.__calculate_autocorr(self.noise_field_imag, 'y'))
+
+    def _load_autocorrelations(self):
+        """Loads all 4 autocorrelation functions from on-disk storage or calculates and saves them there"""
+
+        key = self.cache_key
+        statistics = self._cache.load_statistics(key) if key is not None else None
+        if statistics is None:
+            self._calculate_autocorrelations()
+            if key is not None:
+                self._cache.save_statistics(key, self.statistics)
+        else:
+            self._autocorrs = tuple(statistics[name] for name in self.__autocorr_names)
 
     @staticmethod
     def __find_r_corr_in_points(arr):
@@ -144,13 +187,18 @@ class ComplexNoise(metaclass=ABCMeta):
     def calculate_r_corr(self):
         """Calculates correlation radius for all 4 autocorrelation functions"""
 
-        r_corr_real_x = self._dx * self.__find_r_corr_in_points(self._autocorr_real_x)
-        r_corr_real_y = self._dy * self.__find_r_corr_in_points(self._autocorr_real_y)
-        r_corr_imag_x = self._dx * self.__find_r_corr_in_points(self._autocorr_imag_x)
-        r_corr_imag_y = self._dy * self.__find_r_corr_in_points(self._autocorr_imag_y)
+        if self._r_corr is None:
+            autocorr_real_x, autocorr_real_y, autocorr_imag_x, autocorr_imag_y = self.autocorrs
 
-        # Returns mean of calculated correlation radii
-        return mean([r_corr_real_x, r_corr_real_y, r_corr_imag_x, r_corr_imag_y])
+            r_corr_real_x = self._dx * self.__find_r_corr_in_points(autocorr_real_x)
+            r_corr_real_y = self._dy * self.__find_r_corr_in_points(autocorr_real_y)
+            r_corr_imag_x = self._dx * self.__find_r_corr_in_points(autocorr_imag_x)
+            r_corr_imag_y = self._dy * self.__find_r_corr_in_points(autocorr_imag_y)
+
+            # mean of calculated correlation radii
+            self._r_corr = mean([r_corr_real_x, r_corr_real_y, r_corr_imag_x, r_corr_imag_y])
+
+        return self._r_corr
 
 
 class GaussianNoise(ComplexNoise):
@@ -162,56 +210,128 @@ class GaussianNoise(ComplexNoise):
     2. generated distributions are multiplied by a Gaussian envelope with a pre-calculated radius depending on
        the variance and correlation radius
     3. an inverse Fourier transform is done
+
+    Random numbers are generated by numpy.random.Generator. Every realization of the noise has its own independent
+    random stream determined only by seed and number of realization (SeedSequence with spawn key), so any realization
+    can be reproduced separately, and realizations can be generated in batches, in any order and in different
+    processes.
+
+    If cache is given (cache=NoiseCache(), it makes sense only with fixed seed), generated noise fields and their
+    autocorrelation functions are stored on disk, so calculations with the same noise (for example, the sweep over
+    power) generate it only once. The noise is not cached by default, because the storage is not limited in size.
     """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-    @staticmethod
-    @jit(nopython=True)
-    def __generate_protoarray(n_x, n_y, variance, r_corr_in_points):
-        """Generation of proto array with uniform distribution multiplied by Gaussian envelope"""
+        # seed of random streams (if None it is taken from OS, property seed allows to reproduce the noise)
+        self.__seed = SeedSequence(kwargs.get('seed', None)).entropy
+        self.__realization = kwargs.get('realization', 0)  # number of realization generated in method process
+        self.__n_jobs = kwargs.get('n_jobs', cpu_count())  # number of threads for parallelization
 
-        proto = zeros(shape=(n_x, n_y), dtype=complex64)
+        self.__envelope = None  # Gaussian envelope of the spectrum in FFT order
 
-        scale = r_corr_in_points / max(n_x, n_y)
-        cf = scale * sqrt(pi * variance)
+    @property
+    def seed(self):
+        return self.__seed
+
+    @property
+    def realization(self):
+        return self.__realization
+
+    @realization.setter
+    def realization(self, realization):
+        self.__realization = realization
+
+    @property
+    def n_jobs(self):
+        return self.__n_jobs
+
+    @n_jobs.setter
+    def n_jobs(self, n_jobs):
+        self.__n_jobs = n_jobs
+
+    @property
+    def cache_key(self):
+        if self._cache is None:
+            return None
+
+        return self._cache.key(noise=self.__class__.__name__, n_x=self._n_x, n_y=self._n_y, dx=self._dx, dy=self._dy,
+                               r_corr_in_meters=self._r_corr_in_meters, variance=self._variance_expected,
+                               seed=self.__seed, realization=self.__realization)
+
+    def initialize(self, **params):
+        grid = (self._n_x, self._n_y, self._dx, self._dy)
+        super().initialize(**params)
+
+        # the envelope is kept for the same grid (for example, for the next realization)
+        if grid != (self._n_x, self._n_y, self._dx, self._dy):
+            self.__envelope = None
+
+    def __calculate_envelope(self):
+        """Calculation of Gaussian envelope multiplied by amplitude of uniform distribution"""
+
+        scale = self._r_corr_in_points / max(self._n_x, self._n_y)
+        cf = scale * sqrt(pi * self._variance_expected)
         d = 0.5 * (pi * scale) ** 2
         amplitude = sqrt(12)
 
-        for i in range(n_x):
-            for j in range(n_y):
-                a, b = amplitude * (random.random()-0.5), amplitude * (random.random()-0.5)
-                gauss = cf * exp(-d * ((i-n_x//2) ** 2 + (j-n_y//2) ** 2))
-                proto[i, j] = a * gauss + 1j * b * gauss
+        i = arange(self._n_x)[:, newaxis] - self._n_x // 2
+        j = arange(self._n_y)[newaxis, :] - self._n_y // 2
+        envelope = amplitude * cf * exp(-d * (i ** 2 + j ** 2))
 
-        return proto
+        # the center of the envelope is moved to zero frequency
+        return ifftshift(envelope)
 
-    @staticmethod
-    @jit(nopython=True)
-    def __normalize_after_fft(arr):
-        """Normalization of array after inverse Fourier transform"""
+    def random_generator(self, realization):
+        """
+        :param realization: number of realization
 
-        n1, n2 = arr.shape[0], arr.shape[1]
-        for i in range(n1):
-            for j in range(n2):
-                arr[i, j] *= n1 * n2
+        :return: generator of independent random stream for the realization
+        """
+        return default_rng(SeedSequence(self.__seed, spawn_key=(realization,)))
 
-        return arr
+    def generate(self, n_realizations=1, first_realization=0):
+        """
+        Generates noise fields for realizations with numbers from first_realization to
+        first_realization + n_realizations - 1 in one batch. The random numbers for different realizations are
+        generated in n_jobs threads, all inverse Fourier transforms are made by one FFTW plan.
 
-    def process(self):
-        """Noise and autocorr functions generation"""
+        :param n_realizations: number of realizations
+        :param first_realization: number of the first realization
 
-        # noise field generation
-        proto = self.__generate_protoarray(self._n_x, self._n_y, self._variance_expected, self._r_corr_in_points)
-        proto_shifted = fftshift(proto, axes=(0, 1))
-        proto_fft_obj = ifft2(proto_shifted)
-        proto_fft_normalized = self.__normalize_after_fft(proto_fft_obj())
-        self._noise_field = proto_fft_normalized
+        :return: array of complex noise fields with shape (n_realizations, n_x, n_y)
+        """
+        if self.__envelope is None:
+            self.__envelope = self.__calculate_envelope()
 
-        # initialization of arrays for real and imaginary parts
-        self._noise_field_real, self._noise_field_imag = \
-            self._initialize_noise_arrays(self._noise_field, self._n_x, self._n_y)
+        proto = empty(shape=(n_realizations, self._n_x, self._n_y), dtype=complex64)
 
-        # autocorrelation functions calculation
-        self._calculate_autocorrelations()
+        def generate_protoarray(k):
+            """Generation of proto array with uniform distribution multiplied by Gaussian envelope"""
+
+            uniform = self.random_generator(first_realization + k).random(size=(2, self._n_x, self._n_y))
+            proto[k].real = (uniform[0] - 0.5) * self.__envelope
+            proto[k].imag = (uniform[1] - 0.5) * self.__envelope
+
+        with ThreadPoolExecutor(max_workers=min(self.__n_jobs, n_realizations)) as executor:
+            list(executor.map(generate_protoarray, range(n_realizations)))
+
+        # inverse transform without normalization, which is the same as multiplication by n_x * n_y after it
+        proto_fft_obj = ifft2(proto, axes=(-2, -1), threads=self.__n_jobs)
+
+        return proto_fft_obj(normalise_idft=False)
+
+    def process(self):
+        """Noise generation"""
+
+        # noise field generation or loading from on-disk storage
+        key = self.cache_key
+        noise_field = self._cache.load_field(key) if key is not None else None
+        if noise_field is None:
+            noise_field = self.generate(1, self.__realization)[0]
+            if key is not None:
+                self._cache.save_field(key, noise_field)
+
+        # characteristics of the noise are calculated on the first access
+        self._set_noise_field(noise_field)
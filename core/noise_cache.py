@@ -0,0 +1,113 @@
+import os
+import shutil
+from hashlib import sha1
+import numpy as np
+from numpy import load, save, savez
+
+from .functions import create_cache_dir
+
+
+class NoiseCache:
+    """
+    Class for content-addressed on-disk storage of generated noise.
+    The noise field, its statistics and picture are saved to the files, which names are formed from the hash of all
+    parameters determining the noise (grid, correlation radius, variance, seed and number of realization) and of
+    the version of numpy, the random streams of which can differ between versions. Thus the noise with given parameters
+    is generated only once per machine, and all subsequent calculations (for example, the sweep over power with the same
+    noise) load it. The field is memory-mapped on load.
+
+    The storage is not limited in size and is not cleaned, so it is used only if it is given to the noise explicitly.
+    """
+
+    version = 1  # version of the format of cached data, it is changed if the generation of noise is changed
+
+    def __init__(self, **kwargs):
+        self.__path = kwargs.get('path', None)  # directory with cached noise
+        if self.__path is None:
+            self.__path = create_cache_dir('noise')
+        else:
+            os.makedirs(self.__path, exist_ok=True)
+
+    @property
+    def path(self):
+        return self.__path
+
+    def key(self, **params):
+        """
+        :param params: all parameters determining the noise
+
+        :return: hash of parameters
+        """
+        description = '|'.join('%s=%r' % (name, params[name]) for name in sorted(params))
+
+        return sha1(('version=%d|numpy=%s|' % (self.version, np.__version__) + description).encode()).hexdigest()
+
+    def filename(self, key, name):
+        """
+        :param key: hash of parameters of the noise
+        :param name: name of the file
+
+        :return: full path of the cached file
+        """
+        return os.path.join(self.__path, '%s_%s' % (key, name))
+
+    def __save(self, key, name, write):
+        """Writes the file atomically, because several processes could save the same noise simultaneously"""
+
+        filename = self.filename(key, name)
+        tmp_filename = '%s.%d.tmp' % (filename, os.getpid())
+        with open(tmp_filename, 'wb') as f:
+            write(f)
+        os.replace(tmp_filename, filename)
+
+    def load_field(self, key):
+        """
+        :return: read-only memory-mapped noise field if it was saved before for the same key, None otherwise
+        """
+        filename = self.filename(key, 'field.npy')
+        if not os.path.exists(filename):
+            return None
+
+        try:
+            return load(filename, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+    def save_field(self, key, field):
+        self.__save(key, 'field.npy', lambda f: save(f, field))
+
+    def load_statistics(self, key):
+        """
+        :return: dictionary with statistics of the noise if they were saved before for the same key, None otherwise
+        """
+        filename = self.filename(key, 'statistics.npz')
+        if not os.path.exists(filename):
+            return None
+
+        try:
+            with load(filename) as statistics:
+                return dict(statistics)
+        except (OSError, ValueError):
+            return None
+
+    def save_statistics(self, key, statistics):
+        self.__save(key, 'statistics.npz', lambda f: savez(f, **statistics))
+
+    def load_figure(self, key, name, filename):
+        """
+        Copies the picture to filename if it was saved before for the same key
+
+        :return: True if the picture was copied, False otherwise
+        """
+        cached_filename = self.filename(key, name)
+        if not os.path.exists(cached_filename):
+            return False
+
+        shutil.copyfile(cached_filename, filename)
+
+        return True
+
+    def save_figure(self, key, name, filename):
+        with open(filename, 'rb') as src:
+            self.__save(key, name, lambda f: shutil.copyfileobj(src, f))
+
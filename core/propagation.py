@@ -5,6 +5,9 @@ from numpy import save
 from .visualization import BeamVisualizer, plot_track, plot_noise
 from .logger import Logger
 from .manager import Manager
+from .splitting import LieSplitting, StrangSplitting, ForestRuthSplitting
+from .stop_conditions import MaxIntensityStopCondition, MinIntensityStopCondition
+from .field_store import FieldStore
 
 
 class Propagator:
@@ -18,20 +21,48 @@ class Propagator:
         self.__diffraction = kwargs.get('diffraction', None)  # diffraction object
         self.__kerr_effect = kwargs.get('kerr_effect', None)  # kerr effect object
 
-        self.__args = kwargs['args']  # command line arguments
+        self.__args = kwargs.get('args', None)  # command line arguments (not needed if results are not written)
         self.__multidir_name = kwargs.get('multidir_name', None)  # multidir name if used
+
+        # create results directory with initial parameters, pictures, fields, propagation file and its plot or not,
+        # without results directory only states_arr is filled (for example, for realizations of ensemble)
+        self.__write_results = kwargs.get('write_results', True)
+        if not self.__write_results and any(kwargs.get(e, False) for e in ('save_field', 'save_spectrum',
+                                                                           'plot_beam_every', 'plot_spectrum_every')):
+            raise Exception('Wrong write_results: pictures and fields need results directory!')
+
         self.__save_field = kwargs.get('save_field', False)
+        self.__field_format = kwargs.get('field_format', 'hdf5')  # 'hdf5' (one chunked file) or 'npy' (file per step)
+        if self.__field_format not in ('hdf5', 'npy'):
+            raise Exception('Wrong field format!')
+        self.__field_store = None  # store for streaming of the field to HDF5 file
         self.__save_spectrum = kwargs.get('save_spectrum', False)
-        self.__manager = Manager(args=self.__args,                            #
-                                 multidir_name=self.__multidir_name,          # manager object
-                                 save_field=self.__save_field,
-                                 save_spectrum=self.__save_spectrum)  #
-        self.__logger = Logger(diffraction=self.__diffraction,   #
-                               kerr_effect=self.__kerr_effect,   # logger object
-                               path=self.__manager.results_dir)  #
+        self.__manager = None  # manager object (None if results are not written)
+        if self.__write_results:
+            self.__manager = Manager(args=self.__args,
+                                     multidir_name=self.__multidir_name,
+                                     save_field=self.__save_field,
+                                     save_spectrum=self.__save_spectrum)
+        self.__logger = Logger(diffraction=self.__diffraction,                                      #
+                               kerr_effect=self.__kerr_effect,                                      # logger object
+                               path=self.__manager.results_dir if self.__manager is not None else None,  #
+                               track_format=kwargs.get('track_format', 'xlsx'))                      #
+
+        # splitting scheme of diffraction and kerr effect: 'lie', 'strang' or 'forest_ruth'
+        self.__splitting = self.__create_splitting(kwargs.get('splitting', 'lie'))
+
+        # frequency of synchronization of the field with z for symmetric splitting schemes. Between synchronizations
+        # the postponed diffraction substep is merged with the next step, and peak intensity in the track and for the
+        # update of dz is taken from the last Kerr effect substep (half of the step before recorded z for Strang
+        # splitting). The field is synchronized also at steps with plotting, saving and checks of zoom and at the last
+        # step, stop conditions are checked only at synchronized steps
+        self.__synchronize_every = kwargs.get('synchronize_every', 1)
+        if self.__synchronize_every < 1:
+            raise Exception('Wrong synchronize_every!')
 
         self.__n_z = kwargs['n_z']  # maximum number of grid steps along evolutionary coordinate z
         self.__const_dz = kwargs['const_dz']  # use constant step along z or not
+        self.__stepper = kwargs.get('stepper', None)  # adaptive stepper object, if used const_dz is ignored
 
         self.__print_current_state_every = kwargs.get('print_current_state_every', None)  # frequency of current state print
 
@@ -39,6 +70,9 @@ class Propagator:
         self.__plot_spectrum_every = kwargs.get('plot_spectrum_every', None)  # frequency of plotting spectrum
         self.__flag_print_track = kwargs.get('print_track', True)  # print track function or not
 
+        # worker for plotting and saving off the main cycle (None to make them in the main cycle)
+        self.__background_worker = kwargs.get('background_worker', None)
+
         # settings for function which plots beam
         if self.__plot_beam_every:
             self.__visualizer = kwargs['visualizer']
@@ -52,14 +86,40 @@ class Propagator:
             self.__spectrum_visualizer.get_path_to_save(self.__manager.beam_dir)
             self.__spectrum_visualizer.get_path_to_save_spectrum(self.__manager.spectrum_dir)
 
+        # adaptive zoom of the grid: when the width of the beam core falls below zoom_threshold of the distance from
+        # the axis to the grid boundary, the grid is shrunk by zoom_factor keeping the number of nodes, if the fraction
+        # of beam power beyond the new grid boundary does not exceed zoom_max_energy_loss. The conditions are checked
+        # every zoom_check_every steps, because they need passes over the whole field. The step along z is reduced
+        # by zoom_factor^2 with the diffraction length of the grid step, the lost fraction of power is recorded
+        self.__zoom_threshold = kwargs.get('zoom_threshold', None)  # ratio of core width to grid size for zoom
+        self.__zoom_factor = kwargs.get('zoom_factor', 2)  # ratio of grid sizes before and after zoom
+        self.__zoom_max_energy_loss = kwargs.get('zoom_max_energy_loss', 10**-3)  # maximum lost fraction of power
+        self.__zoom_check_every = kwargs.get('zoom_check_every', 10)  # frequency of checks of zoom conditions
+        self.__max_zooms = kwargs.get('max_zooms', None)  # maximum number of zooms (None for unlimited)
+        self.__n_zooms = 0  # number of made zooms
+        self.__zoom_energy_loss = 0.0  # fraction of initial power lost in all zooms
+
         self.__z = 0.0  # initial value of z
         self.__dz = kwargs['dz_0']  # initial step along z
 
         self.__max_intensity_to_stop = kwargs.get('max_intensity_to_stop', 10**17)  # peak intensity in beam
                                                                                     # at which the calculations stop
+        self.__min_intensity_to_stop = kwargs.get('min_intensity_to_stop', None)  # peak intensity in diffracting beam
+                                                                                  # at which the calculations stop
+
+        # conditions of early stop of calculations, conditions on peak intensity are checked first
+        self.__stop_conditions = [MaxIntensityStopCondition(max_intensity=self.__max_intensity_to_stop)]
+        if self.__min_intensity_to_stop is not None:
+            self.__stop_conditions.append(MinIntensityStopCondition(min_intensity=self.__min_intensity_to_stop))
+        self.__stop_conditions += kwargs.get('stop_conditions', [])
+        self.__stop_reason = None  # reason of the stop of calculations
 
         self.__states_columns = ['z, m', 'dz, m', 'i_max / i_0', 'i_max, W / m^2']  # columns for propagation file
-        self.__states_arr = zeros(shape=(self.__n_z + 1, 4))  # array for states data
+        if self.__stepper is not None:
+            self.__states_columns.append('rejected steps')
+        if self.__zoom_threshold is not None:
+            self.__states_columns += ['grid zoom', 'zoom energy loss']
+        self.__states_arr = zeros(shape=(self.__n_z + 1, len(self.__states_columns)))  # array for states data
 
     @property
     def beam(self):
@@ -77,6 +137,46 @@ class Propagator:
     def z(self):
         return self.__z
 
+    @property
+    def splitting(self):
+        return self.__splitting
+
+    @property
+    def stepper(self):
+        return self.__stepper
+
+    @property
+    def n_zooms(self):
+        return self.__n_zooms
+
+    @property
+    def zoom_energy_loss(self):
+        return self.__zoom_energy_loss
+
+    @property
+    def stop_reason(self):
+        return self.__stop_reason
+
+    @property
+    def states_arr(self):
+        return self.__states_arr
+
+    @property
+    def states_columns(self):
+        return self.__states_columns
+
+    def __create_splitting(self, name):
+        """Creates splitting scheme object by its name"""
+
+        splittings = {'lie': LieSplitting, 'strang': StrangSplitting, 'forest_ruth': ForestRuthSplitting}
+        if name not in splittings:
+            raise Exception('Wrong splitting!')
+
+        return splittings[name](beam=self.__beam,
+                                diffraction=self.__diffraction,
+                                kerr_effect=self.__kerr_effect,
+                                logger=self.__logger)
+
     @staticmethod
     @jit(nopython=True)
     def __flush_current_state(states_arr, n_step, z, dz, i_max, i_0):
@@ -102,6 +202,55 @@ class Propagator:
 
         return dz
 
+    def __zoom_grid(self):
+        """
+        Shrinks the grid if the beam becomes narrow: the postponed diffraction substep is made, the field is
+        interpolated to the finer grid, the diffraction executor updates its grid-dependent quantities and the step
+        along z is reduced
+
+        :return: fraction of beam power lost in zoom (0 if the grid is not zoomed)
+        """
+        if self.__max_zooms is not None and self.__n_zooms >= self.__max_zooms:
+            return 0.0
+
+        if self.__beam.calculate_core_width() < self.__zoom_threshold * self.__beam.grid_half_size and \
+                self.__beam.calculate_boundary_energy_fraction(1.0 - 1.0 / self.__zoom_factor) <= \
+                self.__zoom_max_energy_loss:
+            self.__splitting.synchronize()
+            energy = self.__beam.calculate_energy()
+            self.__beam.rescale(self.__zoom_factor)
+            if self.__diffraction is not None:
+                self.__diffraction.update_grid()
+            self.__dz /= self.__zoom_factor ** 2
+            self.__n_zooms += 1
+
+            energy_loss = 1.0 - self.__beam.calculate_energy() / energy
+            self.__zoom_energy_loss = 1.0 - (1.0 - self.__zoom_energy_loss) * (1.0 - energy_loss)
+
+            return energy_loss
+
+        return 0.0
+
+    def __execute_io(self, function, args):
+        """Executes plotting or saving function in background worker if it is used, otherwise in the main cycle"""
+
+        if self.__background_worker is not None:
+            self.__logger.measure_time(self.__background_worker.submit, [function, args])
+        else:
+            self.__logger.measure_time(function, args)
+
+    def __check_stop_conditions(self):
+        """
+        Checks all stop conditions
+
+        :return: the first fulfilled stop condition or None
+        """
+        for stop_condition in self.__stop_conditions:
+            if stop_condition.check(self.__beam, self.__z):
+                return stop_condition
+
+        return None
+
     def __crop_states_arr(self):
         """
         If the calculations end before reaching the value n_z, crops the remainder of the states_arr
@@ -120,39 +269,52 @@ class Propagator:
 
         self.__states_arr = self.__states_arr[:row_max, :]
 
-    def propagate(self):
+    def __field_needed(self, n_step):
         """
-        The main function of class Propagator. Realizes the propagation process of the beam.
+        Checks if the field at current value of z is needed at the step: for check of stop conditions, plotting,
+        saving, check of zoom conditions or at the last step
+
+        :return: True or False
+        """
+        def every(n):
+            return bool(n) and not n_step % n
+
+        return every(self.__synchronize_every) or every(self.__plot_beam_every) or \
+            every(self.__plot_spectrum_every) or self.__save_field or self.__save_spectrum or \
+            (self.__zoom_threshold is not None and every(self.__zoom_check_every)) or n_step == int(self.__n_z)
+
+    def __main_cycle(self):
+        """
+        Makes steps along z with plotting, saving and check of stop conditions until n_z steps are made or
+        the calculations must be stopped
 
         :return: None
         """
-        # initial preparations
-        self.__manager.create_dirs()
-        self.__logger.save_initial_parameters(self.__beam, self.__n_z, self.__dz, self.__max_intensity_to_stop)
-        if self.__beam.info == 'beam_xy' and self.__beam.noise_percent:
-            plot_noise(self.__beam, self.__manager.results_dir)
-            if self.__save_field:
-                print(type(self.__beam.noise.noise_field))
-                print(self.__beam.noise.noise_field.shape)
-                save('{}/noise.npy'.format(self.__manager.results_dir), self.__beam.noise.noise_field)
-
-        # main cycle
         for n_step in range(int(self.__n_z) + 1):
-            if n_step:
+            if n_step and self.__stepper is not None:
+
+                # error-controlled step with diffraction and kerr effect and prediction of the next step
+                dz, self.__dz, n_rejected = self.__logger.measure_time(self.__stepper.step, [self.__beam,
+                                                                                             self.__splitting,
+                                                                                             self.__dz])
+
+                # increase evolutionary coordinate z by accepted step
+                self.__z += dz
+                self.__states_arr[n_step][4] = n_rejected
 
-                # diffraction
-                if self.__diffraction:
-                    self.__logger.measure_time(self.__diffraction.process_diffraction, [self.__dz])
+            elif n_step:
 
-                # kerr effect
-                if self.__kerr_effect:
-                    self.__logger.measure_time(self.__kerr_effect.process_kerr_effect, [self.__dz])
+                # diffraction and kerr effect with intensity update, the postponed diffraction substep of symmetric
+                # splitting schemes is made only if the field at new z is needed, otherwise it is merged with the
+                # next step
+                self.__splitting.step(self.__dz)
+                if self.__field_needed(n_step):
+                    self.__splitting.synchronize()
 
                 # increase evolutionary coordinate z by current step
                 self.__z += self.__dz
 
-                # update intensity and step along z (if needed)
-                self.__logger.measure_time(self.__beam.update_intensity, [])
+                # update step along z (if needed)
                 if not self.__const_dz:
                     self.__dz = self.__logger.measure_time(self.__update_dz, [self.__beam.medium.k_0,
                                                                               self.__beam.medium.n_0,
@@ -160,6 +322,12 @@ class Propagator:
                                                                               self.__beam.i_max,
                                                                               self.__dz])
 
+            # zoom grid on the collapsing beam (if needed)
+            if self.__zoom_threshold is not None:
+                if not n_step % self.__zoom_check_every:
+                    self.__states_arr[n_step][-1] = self.__logger.measure_time(self.__zoom_grid, [])
+                self.__states_arr[n_step][-2] = self.__zoom_factor ** self.__n_zooms
+
             # flush current state
             self.__logger.measure_time(self.__flush_current_state, [self.__states_arr, n_step, self.__z, self.__dz,
                                                                     self.__beam.i_max, self.beam.i_0])
@@ -172,39 +340,100 @@ class Propagator:
 
             # plot beam
             if self.__plot_beam_every and not (n_step % self.__plot_beam_every):
-                self.__logger.measure_time(self.__visualizer.plot_beam, [self.__beam, self.__z, n_step])
+                plot_data = self.__logger.measure_time(self.__visualizer.get_plot_data, [self.__beam])
+                self.__execute_io(self.__visualizer.plot_beam_data, [plot_data, self.__z, n_step])
 
             # plot spectrum
             if self.__plot_spectrum_every and not (n_step % self.__plot_spectrum_every):
                 self.__logger.measure_time(self.__spectrum.update, [self.__beam])
                 # self.__logger.measure_time(self.__spectrum_visualizer.plot, [self.__spectrum, self.__z, n_step])
-                self.__logger.measure_time(self.__spectrum_visualizer.plot_dissertation,
-                                           [self.__spectrum, self.__z, n_step])
+                plot_data = self.__logger.measure_time(self.__spectrum_visualizer.get_plot_data, [self.__spectrum])
+                plot_spectrum = self.__spectrum_visualizer.plot_raster_data if self.__spectrum_visualizer.raster \
+                    else self.__spectrum_visualizer.plot_dissertation_data
+                self.__execute_io(plot_spectrum, [plot_data, self.__z, n_step])
                 # self.__logger.measure_time(self.__spectrum_visualizer.plot_dissertation_diffraction,
                 #                            [self.__spectrum, self.__z, n_step])
 
             # save field
-            if self.__save_field:
-                path = self.__manager.field_dir + '/%04d' % n_step
-                self.__beam.save_field(path)
+            if self.__field_store is not None:
+                self.__logger.measure_time(self.__field_store.append, [self.__beam.field_to_save(), self.__z,
+                                                                       self.__dz, n_step])
+            elif self.__save_field:
+                path = self.__manager.field_dir + '/%06d' % n_step
+                self.__execute_io(save, [path, self.__beam.field_to_save()])
 
             if self.__save_spectrum:
-                path = self.__manager.spectrum_dir + '/%04d' % n_step
-                self.__spectrum_visualizer.spectrum.save_spectrum(path)
+                path = self.__manager.spectrum_dir + '/%06d' % n_step
+                self.__execute_io(save, [path, self.__spectrum_visualizer.spectrum.spectrum_to_save()])
 
-            # check if calculations must be stopped
-            if self.__beam.i_max > self.__max_intensity_to_stop:
-                break
+            # check if calculations must be stopped (only when the field corresponds to current z)
+            if self.__splitting.synchronized:
+                stop_condition = self.__check_stop_conditions()
+                if stop_condition is not None:
+                    self.__stop_reason = stop_condition.reason
+                    break
+
+    def __finish_io(self):
+        """
+        Waits for writing of all fields and for all plotting and saving tasks, workers of background worker are stopped
+        (they are started again, if the background worker is used once more)
 
-        # cropped states arr and log track
+        :return: None
+        """
+        try:
+            if self.__field_store is not None:
+                self.__logger.measure_time(self.__field_store.close, [])
+        finally:
+            if self.__background_worker is not None:
+                self.__logger.measure_time(self.__background_worker.close, [])
+
+    def propagate(self):
+        """
+        The main function of class Propagator. Realizes the propagation process of the beam.
+
+        :return: None
+        """
+        # initial preparations
+        if self.__write_results:
+            self.__manager.create_dirs()
+            self.__logger.save_initial_parameters(self.__beam, self.__n_z, self.__dz, self.__max_intensity_to_stop)
+            if self.__beam.info == 'beam_xy' and self.__beam.noise_percent:
+                plot_noise(self.__beam, self.__manager.results_dir)
+                if self.__save_field:
+                    print(type(self.__beam.noise.noise_field))
+                    print(self.__beam.noise.noise_field.shape)
+                    save('{}/noise.npy'.format(self.__manager.results_dir), self.__beam.noise.noise_field)
+
+        if self.__save_field and self.__field_format == 'hdf5':
+            self.__field_store = FieldStore(path=self.__manager.field_dir + '/field.h5',
+                                            attrs={'beam': self.__beam.info,
+                                                   'lmbda': self.__beam.lmbda,
+                                                   'z_diff': self.__beam.z_diff,
+                                                   'i_0': self.__beam.i_0})
+
+        for stop_condition in self.__stop_conditions:
+            stop_condition.initialize(self.__beam)
+        self.__stop_reason = 'n_z steps are made'
+
+        # main cycle, the field store and the background worker are finished even if it fails
+        try:
+            self.__main_cycle()
+        finally:
+            self.__finish_io()
+
+        # cropped states arr
         self.__logger.measure_time(self.__crop_states_arr, [])
-        self.__logger.measure_time(self.__logger.log_track, [self.__states_arr, self.__states_columns])
 
-        # print track
-        if self.__flag_print_track:
-            parameter_index = self.__states_columns.index('i_max / i_0')
-            self.__logger.measure_time(plot_track, [self.__states_arr, parameter_index,
-                                                    self.__manager.track_dir])
+        if self.__write_results:
+            # log track
+            self.__logger.measure_time(self.__logger.log_track, [self.__states_arr, self.__states_columns,
+                                                                 self.__stop_reason])
+
+            # print track
+            if self.__flag_print_track:
+                parameter_index = self.__states_columns.index('i_max / i_0')
+                self.__logger.measure_time(plot_track, [self.__states_arr, parameter_index,
+                                                        self.__manager.track_dir])
 
-        # log time of all functions
-        self.__logger.log_times()
+            # log time of all functions
+            self.__logger.log_times()
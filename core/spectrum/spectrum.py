@@ -1,11 +1,26 @@
 from abc import ABCMeta, abstractmethod
-from numpy.fft import fft2, fftshift
+from multiprocessing import cpu_count
+from numpy.fft import fftshift
+from pyfftw.builders import fft2
 
 
 class Spectrum(metaclass=ABCMeta):
+    """
+    Abstract class for spatial spectrum of the beam.
+    Spectrum is calculated with pyfftw. The plan is built once for the shape and data type of the transformed array,
+    FFTW wisdom is imported from the on-disk storage (if it is given) before planning and exported after it.
+    """
+
     def __init__(self, **kwargs):
         self._beam = kwargs['beam']
 
+        # fft
+        self.__n_jobs = kwargs.get('n_jobs', cpu_count())  # number of threads for parallelization
+        self.__planner_effort = kwargs.get('planner_effort', 'FFTW_MEASURE')  # effort of FFTW planner
+        # on-disk storage of FFTW wisdom (for example, FFTWWisdom()), wisdom is not stored by default
+        self.__wisdom = kwargs.get('wisdom', None)
+        self.__fft = None  # forward fast Fourier transform plan
+
         # field
         self._kerr_phase_xy = None
         self._phase_xy = None
@@ -16,8 +31,30 @@ class Spectrum(metaclass=ABCMeta):
         self._spectrum_xy = None
         self._spectrum_intensity_xy = None
 
+    def __getstate__(self):
+        """FFTW plan is not picklable, so it is dropped and built again when needed"""
+
+        state = self.__dict__.copy()
+        state['_Spectrum__fft'] = None
+
+        return state
+
+    def __plan_fft(self, arr):
+        """Builds forward fast Fourier transform plan for arrays with the same shape and data type as arr"""
+
+        if self.__wisdom is not None:
+            self.__wisdom.load(arr.shape, arr.dtype, self.__n_jobs)
+
+        self.__fft = fft2(arr, planner_effort=self.__planner_effort, threads=self.__n_jobs)
+
+        if self.__wisdom is not None:
+            self.__wisdom.save(arr.shape, arr.dtype, self.__n_jobs)
+
     def _make_fft(self, arr):
-        self._spectrum_xy = fft2(arr)
+        if self.__fft is None or self.__fft.input_shape != arr.shape or self.__fft.input_dtype != arr.dtype:
+            self.__plan_fft(arr)
+
+        self._spectrum_xy = self.__fft(arr)
         self._spectrum_xy = fftshift(self._spectrum_xy, axes=(0, 1))
 
     @abstractmethod
@@ -28,6 +65,17 @@ class Spectrum(metaclass=ABCMeta):
     def beam(self):
         return self._beam
 
+    @property
+    def n_jobs(self):
+        return self.__n_jobs
+
+    @n_jobs.setter
+    def n_jobs(self, n_jobs):
+        """The plan is built again with the new number of threads"""
+        if n_jobs != self.__n_jobs:
+            self.__n_jobs = n_jobs
+            self.__fft = None
+
     @property
     def intensity_xy(self):
         return self._intensity_xy
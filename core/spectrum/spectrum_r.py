@@ -9,10 +9,8 @@ class SpectrumR(Spectrum):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self.__vortex_phase = self.__initialize_vortex_phase(self._beam.m,
-                                                             2 * self._beam.r_max,
-                                                             2 * self._beam.n_r,
-                                                             self._beam.dr)
+        self.__uniform_dr = None  # step of the uniform grid, for which the vortex phase is calculated
+        self.__vortex_phase = None
 
     @staticmethod
     @jit(nopython=True)
@@ -25,12 +23,23 @@ class SpectrumR(Spectrum):
 
         return vortex_phase
 
+    def __update_vortex_phase(self, beam):
+        """
+        Calculates the vortex phase for the current grid of the beam, it is calculated again if the grid is rescaled.
+        The field is interpolated to the uniform grid before transform, so the phase is calculated for its step.
+        """
+        if self.__uniform_dr != beam.uniform_dr:
+            self.__uniform_dr = beam.uniform_dr
+            self.__vortex_phase = self.__initialize_vortex_phase(beam.m, 2 * beam.r_max, 2 * beam.n_r, beam.uniform_dr)
+
     def update(self, beam):
+        self.__update_vortex_phase(beam)
+
         # intensity
-        self._intensity_xy = r_to_xy_real(beam.intensity)
+        self._intensity_xy = r_to_xy_real(beam.interpolate_to_uniform_grid(beam.intensity))
 
         # field
-        field_xy = r_to_xy_complex(beam._field)
+        field_xy = r_to_xy_complex(beam.interpolate_to_uniform_grid(beam._field))
 
         # kerr phase
         self._kerr_phase_xy = angle(field_xy)
@@ -44,7 +53,9 @@ class SpectrumR(Spectrum):
         self._make_fft(field_xy)
         self._spectrum_intensity_xy = beam._field_to_intensity(self._spectrum_xy)
 
-    def save_spectrum(self, path, only_center=True):
+    def spectrum_to_save(self, only_center=True):
+        """Returns the spectrum array in the form, in which it is saved"""
+
         if only_center:
             percent = 15
             center = self.beam.n_r
@@ -55,4 +66,8 @@ class SpectrumR(Spectrum):
             # print(spectrum_xy.shape)
         else:
             spectrum_xy = self._spectrum_xy
-        save(path, spectrum_xy)
+
+        return spectrum_xy
+
+    def save_spectrum(self, path, only_center=True):
+        save(path, self.spectrum_to_save(only_center))
@@ -0,0 +1,151 @@
+from abc import ABCMeta, abstractmethod
+
+
+class SplittingScheme(metaclass=ABCMeta):
+    """
+    Abstract class for splitting scheme object.
+    The class takes on the input in the constructor beam, diffraction and Kerr effect objects and makes one step along
+    evolutionary coordinate z as a sequence of diffraction and Kerr effect substeps:
+
+        D(a_0 dz) K(b_0 dz) D(a_1 dz) K(b_1 dz) ... K(b_{n-1} dz) D(a_n dz)
+
+    The last diffraction substep of the step is not made immediately, but is postponed and merged with the first
+    diffraction substep of the next step, so symmetric schemes need the same number of diffraction executions per step
+    as the first-order one. The postponed substep is made in the method synchronize, which must be called every time
+    the field is needed at the current value of z. Between synchronizations peak intensity of the beam corresponds to
+    the last Kerr effect substep, not to any real value of z. Class Propagator synchronizes every synchronize_every
+    steps, at steps with plotting, saving and checks of zoom and stop conditions, between them substeps are merged and
+    peak intensity of the last Kerr effect substep is recorded to the track. Class AdaptiveStepper merges substeps
+    between its two half-steps.
+    """
+
+    DIFFRACTION_COEFFS = None  # coefficients a_0, ..., a_n of diffraction substeps
+    KERR_EFFECT_COEFFS = None  # coefficients b_0, ..., b_{n-1} of Kerr effect substeps
+
+    def __init__(self, **kwargs):
+        self._beam = kwargs['beam']  # beam object
+        self._diffraction = kwargs.get('diffraction', None)  # diffraction object
+        self._kerr_effect = kwargs.get('kerr_effect', None)  # kerr effect object
+        self._logger = kwargs.get('logger', None)  # logger object for measurement of substeps operation time
+
+        self.__postponed_dz = 0.0  # diffraction substep postponed to be merged with the next step
+
+    @abstractmethod
+    def info(self):
+        """SplittingScheme type"""
+
+    @property
+    @abstractmethod
+    def order(self):
+        """Order of accuracy of the scheme along z"""
+
+    @property
+    def synchronized(self):
+        return self.__postponed_dz == 0.0
+
+    def __execute(self, function, args):
+        if self._logger is not None:
+            return self._logger.measure_time(function, args)
+        return function(*args)
+
+    def __process_diffraction(self, dz):
+        if dz != 0.0:
+            self.__execute(self._diffraction.process_diffraction, [dz])
+
+    def step(self, dz):
+        """
+        Makes step along evolutionary coordinate z and updates intensity of the beam
+
+        :param dz: current step along evolutionary coordinate z
+
+        :return: None
+        """
+        if self._kerr_effect is None:
+            if self._diffraction is not None:
+                self.__process_diffraction(self.__postponed_dz + dz)
+            self.__postponed_dz = 0.0
+            self.__execute(self._beam.update_intensity, [])
+        elif self._diffraction is None:
+            self.__execute(self._kerr_effect.process_kerr_effect, [dz])
+        else:
+            a, b = self.DIFFRACTION_COEFFS, self.KERR_EFFECT_COEFFS
+            self.__process_diffraction(self.__postponed_dz + a[0] * dz)
+            for i in range(len(b)):
+                self.__execute(self._kerr_effect.process_kerr_effect, [b[i] * dz])
+                if i < len(b) - 1:
+                    self.__process_diffraction(a[i + 1] * dz)
+            self.__postponed_dz = a[-1] * dz
+
+    def synchronize(self):
+        """
+        Makes postponed diffraction substep, so the field corresponds to the current value of z
+
+        :return: None
+        """
+        if not self.synchronized:
+            self.__process_diffraction(self.__postponed_dz)
+            self.__postponed_dz = 0.0
+            self.__execute(self._beam.update_intensity, [])
+
+
+class LieSplitting(SplittingScheme):
+    """
+    Class for first-order Lie splitting: D(dz) K(dz)
+    """
+
+    DIFFRACTION_COEFFS = (1.0, 0.0)
+    KERR_EFFECT_COEFFS = (1.0,)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    @property
+    def info(self):
+        return 'lie_splitting'
+
+    @property
+    def order(self):
+        return 1
+
+
+class StrangSplitting(SplittingScheme):
+    """
+    Class for second-order symmetric Strang splitting: D(dz/2) K(dz) D(dz/2)
+    """
+
+    DIFFRACTION_COEFFS = (0.5, 0.5)
+    KERR_EFFECT_COEFFS = (1.0,)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    @property
+    def info(self):
+        return 'strang_splitting'
+
+    @property
+    def order(self):
+        return 2
+
+
+class ForestRuthSplitting(SplittingScheme):
+    """
+    Class for fourth-order symmetric Forest-Ruth (Yoshida) splitting:
+    D(theta dz/2) K(theta dz) D((1-theta) dz/2) K((1-2theta) dz) D((1-theta) dz/2) K(theta dz) D(theta dz/2),
+    where theta = 1 / (2 - 2^(1/3))
+    """
+
+    THETA = 1.0 / (2.0 - 2.0 ** (1.0 / 3.0))
+    DIFFRACTION_COEFFS = (0.5 * THETA, 0.5 * (1.0 - THETA), 0.5 * (1.0 - THETA), 0.5 * THETA)
+    KERR_EFFECT_COEFFS = (THETA, 1.0 - 2.0 * THETA, THETA)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    @property
+    def info(self):
+        return 'forest_ruth_splitting'
+
+    @property
+    def order(self):
+        return 4
@@ -0,0 +1,128 @@
+from numpy import empty_like, copyto, sqrt, inf, isfinite
+from numba import jit
+
+
+class AdaptiveStepper:
+    """
+    Class for error-controlled adaptive step along evolutionary coordinate z.
+    Local error is estimated by step doubling: the field after one step dz is compared with the field after two steps
+    dz/2 made by the same splitting scheme. If the error exceeds the tolerance, the step is rejected and repeated with
+    reduced dz, otherwise the solution with two half-steps is accepted. In both cases the next dz is predicted from the
+    order of the splitting scheme, so dz is both reduced near the collapse and increased after it.
+
+    The step is never reduced below dz_min (by default dz_min_ratio of the first trial step), such step is accepted
+    whatever the error is. If the error is not finite (the field is blown up) or the step is rejected max_rejections
+    times in a row, the exception is raised.
+    """
+
+    def __init__(self, **kwargs):
+        self.__tolerance = kwargs.get('tolerance', 10**-3)  # maximum relative local error of the field
+        self.__dz_min = kwargs.get('dz_min', None)  # minimum step along z, such step is always accepted
+        self.__dz_min_ratio = kwargs.get('dz_min_ratio', 10**-6)  # default dz_min relative to the first trial step
+        self.__dz_max = kwargs.get('dz_max', inf)  # maximum step along z
+        self.__safety = kwargs.get('safety', 0.9)  # safety factor for predicted step
+        self.__max_growth = kwargs.get('max_growth', 2.0)  # maximum factor of step increase
+        self.__max_reduction = kwargs.get('max_reduction', 0.2)  # minimum factor of step decrease
+        self.__max_rejections = kwargs.get('max_rejections', 50)  # maximum number of rejected trials of one step
+
+        self.__backup = None  # array for the field at the beginning of the step
+        self.__coarse = None  # array for the field after one full step
+
+    @property
+    def tolerance(self):
+        return self.__tolerance
+
+    @property
+    def dz_min(self):
+        return self.__dz_min
+
+    @property
+    def dz_max(self):
+        return self.__dz_max
+
+    @property
+    def max_rejections(self):
+        return self.__max_rejections
+
+    @staticmethod
+    @jit(nopython=True)
+    def __calculate_error(coarse, fine):
+        """
+        :param coarse: flattened field after one full step
+        :param fine: flattened field after two half-steps
+
+        :return: relative L2-norm of the difference between fields
+        """
+        diff, norm = 0.0, 0.0
+        for k in range(fine.shape[0]):
+            diff += abs(fine[k] - coarse[k]) ** 2
+            norm += abs(fine[k]) ** 2
+
+        return sqrt(diff / norm) if norm else 0.0
+
+    def __calculate_factor(self, error, order):
+        """Calculates factor for the next step from the local error and the order of the scheme"""
+
+        if error == 0.0:
+            return self.__max_growth
+
+        factor = self.__safety * (self.__tolerance / error) ** (1.0 / (order + 1))
+
+        return min(max(factor, self.__max_reduction), self.__max_growth)
+
+    def __clip(self, dz):
+        return min(max(dz, self.__dz_min), self.__dz_max)
+
+    def step(self, beam, splitting, dz):
+        """
+        Makes one accepted step along evolutionary coordinate z
+
+        :param beam: beam object
+        :param splitting: splitting scheme object
+        :param dz: trial step along evolutionary coordinate z
+
+        :return: accepted step, predicted next step and number of rejected trials
+        """
+        splitting.synchronize()
+
+        if self.__dz_min is None:
+            self.__dz_min = self.__dz_min_ratio * dz
+        if not self.__dz_min > 0.0:
+            raise Exception('Wrong minimum step!')
+
+        if self.__backup is None or self.__backup.shape != beam._field.shape or \
+                self.__backup.dtype != beam._field.dtype:
+            self.__backup = empty_like(beam._field)
+            self.__coarse = empty_like(beam._field)
+        copyto(self.__backup, beam._field)
+
+        dz = self.__clip(dz)
+        n_rejected = 0
+        while True:
+            # one full step
+            splitting.step(dz)
+            splitting.synchronize()
+            copyto(self.__coarse, beam._field)
+
+            # two half-steps from the same initial field
+            copyto(beam._field, self.__backup)
+            splitting.step(0.5 * dz)
+            splitting.step(0.5 * dz)
+            splitting.synchronize()
+
+            # local error of the solution with two half-steps
+            error = self.__calculate_error(self.__coarse.reshape(-1), beam._field.reshape(-1)) / \
+                    (2 ** splitting.order - 1)
+            if not isfinite(error):
+                raise Exception('Local error is not finite, the field is blown up!')
+            factor = self.__calculate_factor(error, splitting.order)
+
+            if error <= self.__tolerance or dz <= self.__dz_min:
+                return dz, self.__clip(dz * factor), n_rejected
+
+            # step is rejected
+            n_rejected += 1
+            if n_rejected >= self.__max_rejections:
+                raise Exception('Maximum number of rejected steps is exceeded!')
+            dz = self.__clip(dz * min(factor, self.__safety))
+            copyto(beam._field, self.__backup)
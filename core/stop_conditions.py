@@ -0,0 +1,170 @@
+from abc import ABCMeta, abstractmethod
+
+
+class StopCondition(metaclass=ABCMeta):
+    """
+    Abstract class for stop condition object.
+    The condition is initialized by the beam at the beginning of the propagation and is checked after every step along
+    z. When the condition is fulfilled, the propagation stops and the reason of the stop is recorded by the propagator.
+    """
+
+    def __init__(self, **kwargs):
+        pass
+
+    @abstractmethod
+    def info(self):
+        """StopCondition type"""
+
+    @property
+    @abstractmethod
+    def reason(self):
+        """Description of the reason of the stop"""
+
+    def initialize(self, beam):
+        """
+        Saves the initial state of the beam
+
+        :param beam: beam object
+
+        :return: None
+        """
+
+    @abstractmethod
+    def check(self, beam, z):
+        """
+        :param beam: beam object
+        :param z: current value of evolutionary coordinate z
+
+        :return: True if the propagation must be stopped
+        """
+
+
+class MaxIntensityStopCondition(StopCondition):
+    """
+    Class for stop of the propagation when peak intensity of the beam exceeds the given value (collapse)
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.__max_intensity = kwargs['max_intensity']  # peak intensity at which the calculations stop, [W/m^2]
+
+    @property
+    def info(self):
+        return 'max_intensity_stop_condition'
+
+    @property
+    def reason(self):
+        return 'i_max > %e W / m^2' % self.__max_intensity
+
+    def check(self, beam, z):
+        return beam.i_max > self.__max_intensity
+
+
+class MinIntensityStopCondition(StopCondition):
+    """
+    Class for stop of the propagation when peak intensity of the beam falls below the given value (diffraction). The
+    condition is checked only after the beam has propagated the distance z_min, so that the beam, peak intensity of
+    which falls at first and grows later, is not stopped.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.__min_intensity = kwargs['min_intensity']  # peak intensity at which the calculations stop, [W/m^2]
+        self.__z_min = kwargs.get('z_min', 0.0)  # distance before which the condition is not checked, [m]
+
+    @property
+    def info(self):
+        return 'min_intensity_stop_condition'
+
+    @property
+    def reason(self):
+        return 'i_max < %e W / m^2' % self.__min_intensity
+
+    def check(self, beam, z):
+        return z >= self.__z_min and beam.i_max < self.__min_intensity
+
+
+class IntensityDecayStopCondition(StopCondition):
+    """
+    Class for stop of the propagation when peak intensity of the beam monotonically decreases during the given number
+    of steps and is less than the given part of its maximum value reached during the propagation
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.__window = kwargs.get('window', 100)  # number of steps with monotonic decay of peak intensity
+        self.__max_ratio = kwargs.get('max_ratio', 0.9)  # maximum ratio of peak intensity to its maximum value
+
+        self.__i_max_prev, self.__i_max_max, self.__n_decay = None, None, 0
+
+    @property
+    def info(self):
+        return 'intensity_decay_stop_condition'
+
+    @property
+    def reason(self):
+        return 'i_max decays during %d steps' % self.__window
+
+    def initialize(self, beam):
+        self.__i_max_prev, self.__i_max_max, self.__n_decay = beam.i_max, beam.i_max, 0
+
+    def check(self, beam, z):
+        self.__n_decay = self.__n_decay + 1 if beam.i_max < self.__i_max_prev else 0
+        self.__i_max_prev = beam.i_max
+        self.__i_max_max = max(self.__i_max_max, beam.i_max)
+
+        return self.__n_decay >= self.__window and beam.i_max < self.__max_ratio * self.__i_max_max
+
+
+class WidthStopCondition(StopCondition):
+    """
+    Class for stop of the propagation when root mean square radius of the beam exceeds the given number of its initial
+    values
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.__max_ratio = kwargs.get('max_ratio', 3.0)  # maximum ratio of beam width to its initial value
+        self.__width_0 = None
+
+    @property
+    def info(self):
+        return 'width_stop_condition'
+
+    @property
+    def reason(self):
+        return 'width > %.2f initial widths' % self.__max_ratio
+
+    def initialize(self, beam):
+        self.__width_0 = beam.calculate_width()
+
+    def check(self, beam, z):
+        return beam.calculate_width() > self.__max_ratio * self.__width_0
+
+
+class BoundaryEnergyStopCondition(StopCondition):
+    """
+    Class for stop of the propagation when the fraction of beam power in the layer near the grid boundary exceeds
+    the given value, so the energy leaves the grid (or is reflected back by the boundary)
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.__max_fraction = kwargs.get('max_fraction', 0.01)  # maximum fraction of energy near the boundary
+        self.__layer = kwargs.get('layer', 0.1)  # width of the layer in units of distance from axis to boundary
+
+    @property
+    def info(self):
+        return 'boundary_energy_stop_condition'
+
+    @property
+    def reason(self):
+        return 'energy near boundary > %.2f %%' % (100 * self.__max_fraction)
+
+    def check(self, beam, z):
+        return beam.calculate_boundary_energy_fraction(self.__layer) > self.__max_fraction
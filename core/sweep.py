@@ -0,0 +1,180 @@
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import cpu_count, get_context
+
+import numba
+import pandas as pd
+
+from .functions import create_multidir
+from .propagation import Propagator
+
+_job_config = None  # sweep configuration of the current worker process
+
+
+def _initialize_worker(config, n_threads):
+    """
+    Initializer of worker process: limits the number of numba threads to avoid oversubscription and keeps the sweep
+    configuration for the jobs
+    """
+
+    global _job_config
+
+    numba.set_num_threads(min(n_threads, numba.config.NUMBA_NUM_THREADS))
+
+    _job_config = config
+
+
+def _limit_threads(n_threads, noise=None, spectrum=None):
+    """
+    Limits the number of FFTW threads of noise and spectrum objects in worker process, because by default they use
+    all cores of the machine
+    """
+
+    for e in (noise, spectrum):
+        if e is not None:
+            e.n_jobs = n_threads
+
+
+def _run_job(job_idx):
+    """Runs the propagation for one point of the grid in worker process"""
+
+    return _job_config.run_job(job_idx)
+
+
+class SweepRunner:
+    """
+    Class for running a series of independent calculations over a grid of parameters in a pool of processes.
+
+    The grid is declarative: beam_grid and propagator_grid are dictionaries of parameter names and lists of their
+    values, the calculations are made for all combinations of values. Fixed parameters are given in beam_params and
+    propagator_params, any value of propagator parameters can be a function of the beam object (for example,
+    dz_0=calculate_dz_0, where calculate_dz_0(beam) returns beam.z_diff / 1000).
+
+    Every job creates beam, diffraction and Kerr effect objects and calls Propagator.propagate in worker process. The
+    number of threads for numba and FFTW in every worker (in diffraction executor, noise of the beam and spectrum) is
+    limited to n_threads, so that n_workers * n_threads does not exceed the number of cores. The configuration is
+    passed to the workers once at their start, only indices of jobs are sent to them and only the tracks are sent back
+    to be collected in one table.
+
+    Worker processes are spawned, not forked, because forking of a process, in which numba has already started its
+    threads, is not safe. So the functions in parameters must be picklable (defined at module level, not lambdas), and
+    the script using the class must be protected with if __name__ == '__main__'.
+    """
+
+    def __init__(self, **kwargs):
+        self.__args = kwargs['args']  # command line arguments
+        self.__beam_class = kwargs['beam_class']  # class of beam, for example BeamR
+        self.__diffraction_class = kwargs.get('diffraction_class', None)  # class of diffraction executor
+        self.__kerr_effect_class = kwargs.get('kerr_effect_class', None)  # class of kerr effect executor
+
+        self.__beam_params = kwargs.get('beam_params', {})  # fixed parameters of beam
+        self.__propagator_params = kwargs.get('propagator_params', {})  # fixed parameters of propagator
+        self.__beam_grid = kwargs.get('beam_grid', {})  # grid of beam parameters
+        self.__propagator_grid = kwargs.get('propagator_grid', {})  # grid of propagator parameters
+
+        self.__n_workers = kwargs.get('n_workers', cpu_count())  # number of worker processes
+        self.__n_threads = kwargs.get('n_threads', max(1, cpu_count() // self.__n_workers))  # threads per worker
+
+        self.__grid_names = list(self.__beam_grid) + list(self.__propagator_grid)
+        self.__jobs = list(product(*self.__beam_grid.values(), *self.__propagator_grid.values()))
+
+        self.__results_dir, self.__results_dir_name = None, None
+        self.__df = None
+
+    @property
+    def info(self):
+        return 'sweep_runner'
+
+    @property
+    def jobs(self):
+        """List of dictionaries with parameters of the grid for every job"""
+        return [dict(zip(self.__grid_names, job)) for job in self.__jobs]
+
+    @property
+    def n_workers(self):
+        return self.__n_workers
+
+    @property
+    def n_threads(self):
+        return self.__n_threads
+
+    @property
+    def results_dir(self):
+        return self.__results_dir
+
+    @property
+    def df(self):
+        return self.__df
+
+    @staticmethod
+    def __make_prefix(params):
+        """Makes name of results directory of the job from its parameters"""
+
+        return '_'.join('%s=%s' % (name, value) for name, value in params.items())
+
+    def run_job(self, job_idx):
+        """
+        Runs the propagation for one point of the grid
+
+        :param job_idx: index of job
+
+        :return: dictionary of grid parameters and states array of the propagation
+        """
+        params = self.jobs[job_idx]
+
+        beam_params = dict(self.__beam_params)
+        beam_params.update({name: params[name] for name in self.__beam_grid})
+        _limit_threads(self.__n_threads, noise=beam_params.get('noise', None))
+        beam = self.__beam_class(**beam_params)
+
+        propagator_params = dict(self.__propagator_params)
+        propagator_params.update({name: params[name] for name in self.__propagator_grid})
+        for name, value in propagator_params.items():
+            if callable(value):
+                propagator_params[name] = value(beam)
+        _limit_threads(self.__n_threads, spectrum=propagator_params.get('spectrum', None))
+
+        if self.__diffraction_class is not None:
+            propagator_params['diffraction'] = self.__diffraction_class(beam=beam, n_jobs=self.__n_threads)
+        if self.__kerr_effect_class is not None:
+            propagator_params['kerr_effect'] = self.__kerr_effect_class(beam=beam)
+
+        args = Namespace(global_root_dir=self.__args.global_root_dir,
+                         global_results_dir_name=self.__args.global_results_dir_name + '/' + self.__results_dir_name,
+                         prefix=self.__make_prefix(params),
+                         insert_datetime=False)
+
+        propagator = Propagator(args=args, beam=beam, **propagator_params)
+        propagator.propagate()
+
+        return params, propagator.states_arr, propagator.states_columns
+
+    def run(self):
+        """
+        Runs all jobs in the pool of processes and collects their tracks in one dataframe, in which every row is
+        the state of one job at one step along z
+
+        :return: dataframe
+        """
+        self.__results_dir, self.__results_dir_name = create_multidir(self.__args.global_root_dir,
+                                                                      self.__args.global_results_dir_name,
+                                                                      self.__args.prefix)
+
+        with ProcessPoolExecutor(max_workers=self.__n_workers,
+                                 mp_context=get_context('spawn'),
+                                 initializer=_initialize_worker,
+                                 initargs=(self, self.__n_threads)) as executor:
+            results = list(executor.map(_run_job, range(len(self.__jobs))))
+
+        dfs = []
+        for job_idx, (params, states_arr, states_columns) in enumerate(results):
+            df = pd.DataFrame(states_arr, columns=states_columns)
+            for name, value in reversed(list(params.items())):
+                df.insert(0, name, value)
+            df.insert(0, 'job', job_idx)
+            dfs.append(df)
+
+        self.__df = pd.concat(dfs, ignore_index=True)
+
+        return self.__df
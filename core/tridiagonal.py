@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from numpy import zeros, conj, complex64, int64
+from numba import jit, prange
+
+
+@jit(nopython=True)
+def _fast_substitute(field, alpha, gamma, xi, inv_den, rhs_diag, eta, mu_left, kappa_right, mu_right):
+    """
+    Makes forward and backward substitution in-place in field array
+    """
+    n = field.shape[0]
+
+    # forward
+    eta[1] = mu_left
+    for i in range(1, n - 1):
+        delta = alpha[i] * field[i + 1] - rhs_diag[i] * field[i] + gamma[i] * field[i - 1]
+        eta[i + 1] = (delta + gamma[i] * eta[i]) * inv_den[i]
+
+    # right boundary condition
+    field[n - 1] = (mu_right + kappa_right * eta[n - 1]) / (1.0 - kappa_right * xi[n - 1])
+
+    # backward
+    for j in range(n - 1, 0, -1):
+        field[j - 1] = xi[j] * field[j] + eta[j]
+
+
+class CrankNicolsonSolver:
+    """
+    Class for solving of tridiagonal systems of Crank-Nicolson scheme for diffraction operator along one transverse
+    coordinate by sweep (Thomas algorithm). One step along z for inner nodes i = 1, ..., n - 2 reads as
+
+        -gamma_i f_{i-1} + (sigma_i + c / dz) f_i - alpha_i f_{i+1} =
+            = gamma_i g_{i-1} - (rho_i + conj(c) / dz) g_i + alpha_i g_{i+1},
+
+    where g and f are the fields before and after the step. Boundary conditions are f_0 = kappa_left f_1 + mu_left and
+    f_{n-1} = kappa_right f_{n-2} + mu_right.
+
+    Sweep coefficients xi and inverse denominators of the forward sweep depend only on dz and left boundary condition,
+    so they (together with the diagonal of the right-hand side) are calculated once for every dz and kept in the cache
+    of bounded size with the least recently used eviction. The step itself is one compiled forward and backward
+    substitution in preallocated buffer, in which right boundary condition can be changed on every step. The batch of
+    fields with the same coefficients (for example, beams differing only in power) is solved by the same substitution
+    applied to the rows of the batch array in parallel.
+    """
+
+    def __init__(self, **kwargs):
+        self.__dtype = kwargs.get('dtype', complex64)  # data type of field
+
+        # coefficients and sweep buffers are kept in double precision, because the right-hand side is a small
+        # difference of large terms, only the field has data type dtype
+        self.__alpha = kwargs['alpha'].astype(complex)  # coefficients before f_{i+1}
+        self.__gamma = kwargs['gamma'].astype(complex)  # coefficients before f_{i-1}
+        self.__sigma = kwargs['sigma'].astype(complex)  # diagonal of implicit part of operator
+        self.__rho = kwargs.get('rho', kwargs['sigma']).astype(complex)  # diagonal of explicit part of operator
+        self.__c = kwargs['c']  # coefficient before derivative along z
+
+        self.__kappa_left = kwargs.get('kappa_left', 0.0)  # left boundary condition
+        self.__mu_left = kwargs.get('mu_left', 0.0)  #
+
+        self.__n = self.__alpha.shape[0]
+
+        # cache of factorizations for different steps along z
+        self.__cache_size = kwargs.get('cache_size', 4)  # maximum number of factorizations in cache
+        self.__factorizations = OrderedDict()
+
+        self.__eta = zeros(shape=(self.__n,), dtype=complex)  # buffer for sweep coefficients eta
+        self.__batch_eta = None  # buffer for sweep coefficients eta of the batch of fields
+
+    @property
+    def dtype(self):
+        return self.__dtype
+
+    @property
+    def cache_size(self):
+        return self.__cache_size
+
+    @staticmethod
+    @jit(nopython=True)
+    def __fast_factorize(n, dz, c, alpha, gamma, sigma, rho, kappa_left, xi, inv_den, rhs_diag):
+        """
+        Calculates sweep coefficients xi, inverse denominators of the forward sweep and diagonal of the right-hand side
+        """
+        xi[1] = kappa_left
+        for i in range(1, n - 1):
+            inv_den[i] = 1.0 / (sigma[i] + c / dz - gamma[i] * xi[i])
+            xi[i + 1] = alpha[i] * inv_den[i]
+            rhs_diag[i] = rho[i] + conj(c) / dz
+
+    def __calculate_factorization(self, dz, kappa_left):
+        """
+        :param dz: step along evolutionary coordinate z
+        :param kappa_left: left boundary condition
+
+        :return: arrays xi, inverse denominators and diagonal of the right-hand side
+        """
+        xi = zeros(shape=(self.__n,), dtype=complex)
+        inv_den = zeros(shape=(self.__n,), dtype=complex)
+        rhs_diag = zeros(shape=(self.__n,), dtype=complex)
+        self.__fast_factorize(self.__n, dz, self.__c, self.__alpha, self.__gamma, self.__sigma, self.__rho,
+                              kappa_left, xi, inv_den, rhs_diag)
+
+        return xi, inv_den, rhs_diag
+
+    def __get_factorization(self, dz):
+        """
+        Returns factorization for dz from the cache, calculating it if necessary.
+        The least recently used factorization is removed if the cache is full.
+        """
+        if dz in self.__factorizations:
+            self.__factorizations.move_to_end(dz)
+        else:
+            self.__factorizations[dz] = self.__calculate_factorization(dz, self.__kappa_left)
+            if len(self.__factorizations) > self.__cache_size:
+                self.__factorizations.popitem(last=False)
+
+        return self.__factorizations[dz]
+
+    def clear_cache(self):
+        self.__factorizations.clear()
+
+    @staticmethod
+    @jit(nopython=True, parallel=True)
+    def __fast_substitute_batch(fields, active, index, alpha, gamma, xi, inv_den, rhs_diag, eta, mu_left, kappa_right,
+                                mu_right):
+        """
+        Makes forward and backward substitution in-place in every active row of fields array in parallel, row b uses
+        factorization index[b]
+        """
+        for b in prange(fields.shape[0]):
+            if active[b]:
+                k = index[b]
+                _fast_substitute(fields[b], alpha, gamma, xi[k], inv_den[k], rhs_diag[k], eta[b], mu_left,
+                                 kappa_right[b], mu_right[b])
+
+    def solve(self, field, dz, kappa_right=0.0, mu_right=0.0, kappa_left=None):
+        """
+        Makes one step along z in-place in the field array
+
+        :param field: array for complex light field of data type dtype
+        :param dz: step along evolutionary coordinate z
+        :param kappa_right: right boundary condition
+        :param mu_right: right boundary condition
+        :param kappa_left: left boundary condition changing from step to step, if it is given, the factorization is
+                           calculated without the cache
+
+        :return: None
+        """
+        if kappa_left is None:
+            xi, inv_den, rhs_diag = self.__get_factorization(dz)
+        else:
+            xi, inv_den, rhs_diag = self.__calculate_factorization(dz, kappa_left)
+        _fast_substitute(field, self.__alpha, self.__gamma, xi, inv_den, rhs_diag, self.__eta, self.__mu_left,
+                         kappa_right, mu_right)
+
+    def solve_batch(self, fields, dzs, active, kappa_right, mu_right):
+        """
+        Makes one step along z in-place for the batch of fields with the same coefficients, the fields are processed in
+        parallel. Every field has its own step along z and right boundary condition, factorizations for all different
+        steps are taken from the cache.
+
+        :param fields: array of shape (n_fields, n) for complex light fields of data type dtype
+        :param dzs: steps along evolutionary coordinate z for every field
+        :param active: mask of fields, which are processed
+        :param kappa_right: right boundary conditions for every field
+        :param mu_right: right boundary conditions for every field
+
+        :return: None
+        """
+        n_fields = fields.shape[0]
+        if self.__batch_eta is None or self.__batch_eta.shape[0] != n_fields:
+            self.__batch_eta = zeros(shape=(n_fields, self.__n), dtype=complex)
+
+        # every active field refers to the factorization for its step
+        positions, index = OrderedDict(), zeros(shape=(n_fields,), dtype=int64)
+        for b in range(n_fields):
+            if active[b]:
+                index[b] = positions.setdefault(float(dzs[b]), len(positions))
+        if not positions:
+            return
+
+        xi = zeros(shape=(len(positions), self.__n), dtype=complex)
+        inv_den = zeros(shape=(len(positions), self.__n), dtype=complex)
+        rhs_diag = zeros(shape=(len(positions), self.__n), dtype=complex)
+        for dz, k in positions.items():
+            xi[k], inv_den[k], rhs_diag[k] = self.__get_factorization(dz)
+
+        self.__fast_substitute_batch(fields, active, index, self.__alpha, self.__gamma, xi, inv_den, rhs_diag,
+                                     self.__batch_eta, self.__mu_left, kappa_right, mu_right)
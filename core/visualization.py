@@ -1,4 +1,4 @@
-from numpy import transpose, meshgrid, zeros, log10, where, pi
+from numpy import array, transpose, meshgrid, zeros, log10, where, pi
 import numpy as np
 from matplotlib import pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
@@ -7,6 +7,9 @@ from pylab import contourf
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 from matplotlib import rc, cm
 import matplotlib.ticker as ticker
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from io import BytesIO
+import cv2
 
 rc('font', **{'family': 'serif', 'serif': ['Computer Modern Roman']})
 rc('text', usetex=True)
@@ -16,14 +19,148 @@ rc('text.latex', preamble=r'\usepackage[russian]{babel}')
 from .functions import r_to_xy_real, crop_x, calc_ticks_x
 
 
+class RasterRenderer:
+    """
+    Class for fast rendering of 2-dimensional arrays to RGB images without contour plots.
+
+    Values of the array are mapped to 256 colors of the colormap by the lookup table, the image is enlarged by integer
+    factor scale without interpolation. Optionally the image is put into the overlay: the picture with axes, ticks,
+    labels and colorbar rendered by matplotlib once and cached, and the text of the title is drawn over it by OpenCV.
+    Thus the frame is produced in milliseconds even for 1024 x 1024 arrays. Overlays are cached also in the process
+    by colormap and key, so renderers unpickled in worker of class BackgroundWorker for every frame reuse the overlay
+    built for the first frame.
+    """
+
+    N_COLORS = 256  # size of lookup table
+    MAX_CACHED_OVERLAYS = 16  # maximum number of overlays cached in the process
+
+    _overlays = {}  # overlays cached in the process: (overlay, image box, title position, title height) by key
+
+    def __init__(self, **kwargs):
+        self.__cmap = plt.get_cmap(kwargs.get('cmap', 'jet'))  # colormap
+        self.__scale = kwargs.get('scale', 1)  # integer factor of image enlargement
+
+        # lookup table of colors in RGB
+        self.__lut = (self.__cmap(np.linspace(0.0, 1.0, self.N_COLORS))[:, :3] * 255).astype(np.uint8)
+
+        self.__overlay = None  # RGB picture with axes and colorbar
+        self.__overlay_key = None  # parameters of cached overlay
+        self.__image_box = None  # pixel box of image in overlay: (top, bottom, left, right)
+        self.__title_position = None  # pixel position of the center of title bottom in overlay
+        self.__title_height = None  # height of the title line in pixels
+
+    @property
+    def scale(self):
+        return self.__scale
+
+    def render(self, arr, v_min, v_max):
+        """
+        :param arr: 2-dimensional array, the first index is the row of image from top to bottom
+        :param v_min: value mapped to the first color
+        :param v_max: value mapped to the last color
+
+        :return: RGB image as uint8 array
+        """
+        idx = (arr - v_min) * ((self.N_COLORS - 1) / (v_max - v_min) if v_max > v_min else 0.0)
+        image = self.__lut[np.clip(idx, 0, self.N_COLORS - 1).astype(np.uint8)]
+
+        if self.__scale > 1:
+            image = image.repeat(self.__scale, axis=0).repeat(self.__scale, axis=1)
+
+        return image
+
+    def build_overlay(self, key, plot_overlay, dpi=50, font_size=20):
+        """
+        Renders the overlay by matplotlib and caches it until the key changes
+
+        :param key: hashable parameters of the overlay (for example, ticks of colorbar)
+        :param plot_overlay: function of figure and axes of image, which draws everything except the image and
+        leaves empty title of the axes as the place for the text of the title
+        :param dpi: resolution of the overlay
+        :param font_size: font size of the title
+
+        :return: None
+        """
+        if self.__overlay is not None and key == self.__overlay_key:
+            return
+
+        cache_key = (self.__cmap.name, key, dpi, font_size)
+        if cache_key in self._overlays:
+            self.__overlay, self.__image_box, self.__title_position, self.__title_height = self._overlays[cache_key]
+            self.__overlay_key = key
+            return
+
+        fig, ax = plt.subplots(figsize=(9, 7), dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        plot_overlay(fig, ax)
+        canvas.draw()
+
+        # the picture is saved as with bbox_inches='tight', so the labels outside the figure are not lost
+        bbox = fig.get_tightbbox(canvas.get_renderer()).padded(0.1)
+        buffer = BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches=bbox)
+        self.__overlay = cv2.imdecode(np.frombuffer(buffer.getvalue(), dtype=np.uint8), cv2.IMREAD_COLOR)[:, :, ::-1]
+        height = self.__overlay.shape[0]
+
+        x_0, y_0, x_1, y_1 = ax.get_window_extent().extents - np.tile(bbox.p0 * dpi, 2)
+        self.__image_box = (int(round(height - y_1)), int(round(height - y_0)), int(round(x_0)), int(round(x_1)))
+        self.__title_position = (int(round(0.5 * (x_0 + x_1))), int(round(height - y_1)))
+        self.__title_height = font_size * dpi / 72  # height of the title line in pixels
+        self.__overlay_key = key
+
+        plt.close(fig)
+
+        if len(self._overlays) >= self.MAX_CACHED_OVERLAYS:
+            self._overlays.clear()
+        self._overlays[cache_key] = (self.__overlay, self.__image_box, self.__title_position, self.__title_height)
+
+    def compose(self, image, title=None):
+        """
+        Puts the image into the cached overlay
+
+        :param image: RGB image
+        :param title: text of the title (lines are separated by newline)
+
+        :return: RGB frame
+        """
+        frame = self.__overlay.copy()
+        top, bottom, left, right = self.__image_box
+        frame[top:bottom, left:right] = cv2.resize(image, (right - left, bottom - top),
+                                                   interpolation=cv2.INTER_NEAREST)
+
+        if title:
+            x, y = self.__title_position
+            font_scale = self.__title_height / 30
+            thickness = max(int(round(font_scale)), 1)
+            for i, line in enumerate(reversed(title.strip('\n').split('\n'))):
+                width = cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)[0][0]
+                cv2.putText(frame, line, (x - width // 2, int(y - (i + 0.7) * 1.5 * self.__title_height)),
+                            cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), thickness, cv2.LINE_AA)
+
+        return frame
+
+    @staticmethod
+    def save(path, frame):
+        """Writes RGB frame to PNG file"""
+
+        cv2.imwrite(path, frame[:, :, ::-1], [cv2.IMWRITE_PNG_COMPRESSION, 1])
+
+
 class BeamVisualizer:
-    """Class for plotting beams in profile, flat and volume styles."""
+    """
+    Class for plotting beams in profile, flat and volume styles.
+
+    Plotting is made in two stages: method get_plot_data copies intensity and grid nodes from the beam, and method
+    plot_beam_data makes 2D array of intensity (for beam_r), crops it and plots. The visualizer does not keep the beam,
+    so the plot data together with the visualizer are small to be pickled and the second stage can be made in
+    background worker.
+    """
 
     def __init__(self, **kwargs):
-        self.__beam = kwargs['beam']
+        self.__i_0 = kwargs['beam'].i_0  # peak intensity of the initial beam
         self.__maximum_intensity = kwargs['maximum_intensity']
         self._normalize_intensity_to = kwargs['normalize_intensity_to']
-        if self._normalize_intensity_to not in (self.__beam.i_0, 1):
+        if self._normalize_intensity_to not in (self.__i_0, 1):
             raise Exception('Wrong normalize_to arg!')
         self.__plot_type = kwargs['plot_type']
         self.__language = kwargs.get('language', 'english')
@@ -57,6 +194,11 @@ class BeamVisualizer:
         # picture
         self.__dpi = kwargs.get('dpi', 50)
 
+        # raster rendering
+        self.__raster = RasterRenderer(cmap='jet', scale=kwargs.get('raster_scale', 1)) \
+            if self.__plot_type == 'raster' else None
+        self.__raster_overlay = kwargs.get('raster_overlay', True)  # put image into picture with axes and colorbar
+
     @staticmethod
     def __cm2inch(*tupl):
         inch = 2.54
@@ -81,20 +223,20 @@ class BeamVisualizer:
 
         return x_label, y_label
 
-    def _initialize_arr(self):
+    def _initialize_arr(self, data):
         arr, xs, ys = None, None, None
-        if self.__beam.info == 'beam_x':
-            n = self.__beam.intensity.shape[0]
+        if data['info'] == 'beam_x':
+            n = data['intensity'].shape[0]
             arr = zeros(shape=(n, n))
-            arr[:] = self.__beam.intensity[:]
-            xs, ys = self.__beam.xs, self.__beam.xs
-        elif self.__beam.info == 'beam_r':
-            arr = r_to_xy_real(self.__beam.intensity)
-            xs = [-e for e in self.__beam.rs][::-1][:-1] + self.__beam.rs
+            arr[:] = data['intensity'][:]
+            xs, ys = data['xs'], data['xs']
+        elif data['info'] == 'beam_r':
+            arr = r_to_xy_real(data['intensity'])
+            xs = [-e for e in data['xs']][::-1][:-1] + data['xs']
             ys = xs
-        elif self.__beam.info == 'beam_xy':
-            arr = self.__beam.intensity
-            xs, ys = self.__beam.xs, self.__beam.ys
+        elif data['info'] == 'beam_xy':
+            arr = data['intensity']
+            xs, ys = data['xs'], data['ys']
 
         x_left, x_right = -self.__x_max, self.__x_max
         y_left, y_right = -self.__y_max, self.__y_max
@@ -102,27 +244,27 @@ class BeamVisualizer:
         arr, x_idx_left, x_idx_right = crop_x(arr, xs, x_left, x_right, mode='x')
         arr, y_idx_left, y_idx_right = crop_x(arr, ys, y_left, y_right, mode='y')
 
-        if self.__plot_type != 'flat':
+        if self.__plot_type not in ('flat', 'raster'):
             arr = transpose(arr)
 
         if self._normalize_intensity_to == 1:
-            arr *= self.__beam.i_0 / 10**16
+            arr *= self.__i_0 / 10**16
 
         xs = xs[x_idx_left:x_idx_right]
         ys = ys[y_idx_left:y_idx_right]
 
         return arr, xs, ys
 
-    def _initialize_levels_plot(self, n_plot_levels=100):
+    def _initialize_levels_plot(self, i_max, n_plot_levels=100):
         max_intensity = None
 
         if isinstance(self.__maximum_intensity, int) or isinstance(self.__maximum_intensity, float):
             max_intensity = self.__maximum_intensity
         elif self.__maximum_intensity == 'local':
-            max_intensity = self.__beam.i_max
+            max_intensity = i_max
 
-        if self._normalize_intensity_to == self.__beam.i_0:
-            max_intensity /= self.__beam.i_0
+        if self._normalize_intensity_to == self.__i_0:
+            max_intensity /= self.__i_0
         else:
             max_intensity /= 10**16
 
@@ -131,19 +273,65 @@ class BeamVisualizer:
 
         return levels_plot, max_intensity
 
-    def plot_beam(self, beam, z, step):
+    @staticmethod
+    def __margin_slice(xs, x_max):
+        """Returns slice of grid nodes, which cover the plotted range from -x_max to x_max with the margin"""
+
+        indices = [i for i, x in enumerate(xs) if abs(x) < 2 * x_max]
+
+        return slice(indices[0], indices[-1] + 1)
+
+    def get_plot_data(self, beam):
+        """
+        Prepares the data for plotting of the beam: copy of intensity (radial profile on the uniform grid for beam_r)
+        cut with the margin beyond the plotted range and its grid nodes. The data do not refer to the beam, so they
+        can be plotted after the field of the beam is changed or in another process.
+
+        :param beam: beam object
+
+        :return: dictionary with type of the beam, intensity, grid nodes and peak intensity of the beam
+        """
+        if beam.info == 'beam_r':
+            nodes = self.__margin_slice(beam.uniform_rs, self.__x_max)
+            intensity = beam.interpolate_to_uniform_grid(beam.intensity)[nodes]
+            xs = ys = beam.uniform_rs[nodes]
+        elif beam.info == 'beam_xy':
+            x_nodes, y_nodes = self.__margin_slice(beam.xs, self.__x_max), self.__margin_slice(beam.ys, self.__y_max)
+            intensity = array(beam.intensity[x_nodes, y_nodes])
+            xs, ys = beam.xs[x_nodes], beam.ys[y_nodes]
+        else:
+            intensity = array(beam.intensity)
+            xs = ys = beam.xs
+
+        return {'info': beam.info, 'intensity': intensity, 'xs': xs, 'ys': ys, 'i_max': beam.i_max}
+
+    def plot_beam_data(self, data, z, step):
+        """
+        Plots the beam from the data returned by get_plot_data, intensity array is cropped to the plotted range here
+
+        :param data: dictionary of plot data
+        :param z: evolutionary coordinate z
+        :param step: number of step
+
+        :return: None
+        """
         if self.__plot_type == 'profile':
-            return self.__plot_beam_profile(beam, z, step)
+            return self.__plot_beam_profile(data, z, step)
         elif self.__plot_type == 'flat':
-            return self.__plot_beam_flat(beam, z, step)
-            # return self.__plot_beam_flat_dissertation(beam, z, step)
-            # return self.__plot_beam_flat_dissertation_vortex_sf(beam, z, step)
+            return self.__plot_beam_flat(data, z, step)
+            # return self.__plot_beam_flat_dissertation(data, z, step)
+            # return self.__plot_beam_flat_dissertation_vortex_sf(data, z, step)
         elif self.__plot_type == 'volume':
-            return self.__plot_beam_volume(beam, z, step)
+            return self.__plot_beam_volume(data, z, step)
+        elif self.__plot_type == 'raster':
+            return self.__plot_beam_raster(data, z, step)
         else:
             raise Exception('Wrong "plot_beam_func"!')
 
-    def __plot_beam_profile(self, beam, z, step):
+    def plot_beam(self, beam, z, step):
+        return self.plot_beam_data(self.get_plot_data(beam), z, step)
+
+    def __plot_beam_profile(self, data, z, step):
         """Plots intensity distribution in 1D beam with plot"""
 
         # FLAGS
@@ -153,8 +341,8 @@ class BeamVisualizer:
 
         fig, ax = plt.subplots(figsize=(10, 8))
 
-        _, max_intensity = self._initialize_levels_plot()
-        arr, xs, ys = self._initialize_arr()
+        _, max_intensity = self._initialize_levels_plot(data['i_max'])
+        arr, xs, ys = self._initialize_arr(data)
         section = arr[:, arr.shape[1]//2]
 
         plt.plot(section, color='black', linewidth=5, linestyle='solid')
@@ -177,7 +365,7 @@ class BeamVisualizer:
 
         if labels:
             plt.xlabel(self._x_label, fontsize=self._font_size['labels'], fontweight=self._font_weight['labels'])
-            if self._normalize_intensity_to == beam.i_0:
+            if self._normalize_intensity_to == self.__i_0:
                 y_label = 'I/I$\mathbf{_0}$'
                 ax.text(-0.25 * len(xs), 1.2 * max_intensity, y_label,
                         fontsize=self._font_size['labels'], fontweight=self._font_weight['labels'])
@@ -189,7 +377,7 @@ class BeamVisualizer:
         if title:
             if self.__title_string == self.__default_title_string:
                 plt.title(self.__title_string %
-                          (round(z * 10 ** 2, 3), beam.i_max / 10 ** 16), fontsize=self._font_size['title'])
+                          (round(z * 10 ** 2, 3), data['i_max'] / 10 ** 16), fontsize=self._font_size['title'])
             else:
                 plt.title(self.__title_string, fontsize=self._font_size['title'])
 
@@ -202,7 +390,7 @@ class BeamVisualizer:
 
         del arr
 
-    def __plot_beam_flat(self, beam, z, step):
+    def __plot_beam_flat(self, data, z, step):
         """Plots intensity distribution in 2D beam with contour_plot"""
 
         # FLAGS
@@ -213,8 +401,8 @@ class BeamVisualizer:
 
         fig, ax = plt.subplots(figsize=(9, 7))
 
-        levels_plot, max_intensity = self._initialize_levels_plot(n_plot_levels=500)
-        arr, xs, ys = self._initialize_arr()
+        levels_plot, max_intensity = self._initialize_levels_plot(data['i_max'], n_plot_levels=500)
+        arr, xs, ys = self._initialize_arr(data)
 
         plot = contourf(arr, cmap=self._cmap, levels=levels_plot)
 
@@ -235,7 +423,7 @@ class BeamVisualizer:
         if title:
             if self.__title_string == self.__default_title_string:
                 plt.title((self.__title_string + '\n') %
-                          (round(z * 10 ** 2, 3), beam.i_max / 10 ** 16), fontsize=self._font_size['title'])
+                          (round(z * 10 ** 2, 3), data['i_max'] / 10 ** 16), fontsize=self._font_size['title'])
             else:
                 plt.title(self.__title_string, fontsize=self._font_size['title'])
 
@@ -247,7 +435,7 @@ class BeamVisualizer:
             dcb = max_intensity / n_ticks_colorbar_levels
             levels_ticks_colorbar = [i * dcb for i in range(n_ticks_colorbar_levels + 1)]
             colorbar = fig.colorbar(plot, ticks=levels_ticks_colorbar, orientation='vertical', aspect=10, pad=0.05)
-            if self._normalize_intensity_to == beam.i_0:
+            if self._normalize_intensity_to == self.__i_0:
                 colorbar_label = 'I/I$\mathbf{_0}$'
                 colorbar.set_label(colorbar_label, labelpad=-60, y=1.25, rotation=0,
                                    fontsize=self._font_size['colorbar_label'],
@@ -270,6 +458,76 @@ class BeamVisualizer:
 
         del arr
 
+    def __plot_raster_overlay(self, fig, ax, xs, ys, max_intensity):
+        """Plots axes, labels and colorbar of flat picture around empty image for raster rendering"""
+
+        plot = ax.imshow(zeros(shape=(len(ys), len(xs))), cmap=self._cmap, vmin=0.0, vmax=max_intensity,
+                         origin='lower')
+
+        x_ticks = calc_ticks_x(self._x_ticklabels, xs)
+        y_ticks = calc_ticks_x(self._y_ticklabels, ys)
+        ax.set_xticks(x_ticks)
+        ax.set_xticklabels(self._y_ticklabels, fontsize=self._font_size['ticks'])
+        ax.set_yticks(y_ticks)
+        ax.set_yticklabels(self._x_ticklabels, fontsize=self._font_size['ticks'])
+
+        ax.set_xlabel(self._x_label, fontsize=self._font_size['labels'], fontweight=self._font_weight['labels'])
+        ax.set_ylabel(self._y_label, fontsize=self._font_size['labels'], fontweight=self._font_weight['labels'],
+                      labelpad=-30)
+        ax.set_title('\n\n\n', fontsize=self._font_size['title'])
+
+        n_ticks_colorbar_levels = 4
+        dcb = max_intensity / n_ticks_colorbar_levels
+        levels_ticks_colorbar = [i * dcb for i in range(n_ticks_colorbar_levels + 1)]
+        colorbar = fig.colorbar(plot, ticks=levels_ticks_colorbar, orientation='vertical', aspect=10, pad=0.05)
+        if self.__maximum_intensity == 'local':
+            colorbar_label = 'I/I$\mathbf{_{max}}$'
+            ticks_cbar = ['%04.2f' % (e / max_intensity) for e in levels_ticks_colorbar]
+        elif self._normalize_intensity_to == self.__i_0:
+            colorbar_label = 'I/I$\mathbf{_0}$'
+            ticks_cbar = ['%05.2f' % e for e in levels_ticks_colorbar]
+        else:
+            colorbar_label = 'I,\nTW/cm$\mathbf{^2}$'
+            ticks_cbar = ['%05.2f' % e for e in levels_ticks_colorbar]
+        colorbar.set_label(colorbar_label, labelpad=-60, y=1.25, rotation=0,
+                           fontsize=self._font_size['colorbar_label'], fontweight=self._font_weight['colorbar_label'])
+        colorbar.ax.set_yticklabels(ticks_cbar)
+        colorbar.ax.tick_params(labelsize=self._font_size['colorbar_ticks'])
+
+    def __plot_beam_raster(self, data, z, step):
+        """
+        Plots intensity distribution in 2D beam as raster image with colormap lookup table, the picture with axes and
+        colorbar is rendered by matplotlib only once (for every maximum of colorbar if it is not local)
+        """
+
+        _, max_intensity = self._initialize_levels_plot(data['i_max'])
+        arr, xs, ys = self._initialize_arr(data)
+
+        image = self.__raster.render(arr[::-1], 0.0, max_intensity)
+
+        if self.__raster_overlay:
+            # the key contains everything drawn in the overlay, as overlays are cached in the process
+            key = (len(xs), len(ys), tuple(self._x_ticklabels), tuple(self._y_ticklabels), self._x_label,
+                   self._y_label, self.__maximum_intensity == 'local', self._normalize_intensity_to == self.__i_0)
+            if self.__maximum_intensity == 'local':
+                overlay_max_intensity = 1.0
+            else:
+                key += (max_intensity,)
+                overlay_max_intensity = max_intensity
+            self.__raster.build_overlay(key, lambda fig, ax: self.__plot_raster_overlay(fig, ax, xs, ys,
+                                                                                       overlay_max_intensity),
+                                        dpi=self.__dpi, font_size=self._font_size['title'])
+
+            if self.__title_string == self.__default_title_string:
+                title = 'z = %05.2f cm\nI_max = %05.2f TW/cm^2' % (round(z * 10 ** 2, 3), data['i_max'] / 10 ** 16)
+            else:
+                title = self.__title_string
+            image = self.__raster.compose(image, title)
+
+        self.__raster.save(self._path_to_save + '/%04d.png' % step, image)
+
+        del arr
+
     @staticmethod
     def __calc_ticks_x(labels, xs):
         ticks = []
@@ -282,13 +540,13 @@ class BeamVisualizer:
                     break
         return ticks
 
-    def __plot_beam_flat_dissertation_vortex_sf(self, beam, z, step, legend=True):
+    def __plot_beam_flat_dissertation_vortex_sf(self, data, z, step, legend=True):
         """Plots intensity distribution in 2D beam with contour_plot"""
 
         fig, ax = plt.subplots(figsize=self.__cm2inch(6.5, 5))
         fig.patch.set_facecolor('white')
 
-        arr, xs, ys = self._initialize_arr()
+        arr, xs, ys = self._initialize_arr(data)
 
         contour_plot = contourf(arr, cmap=plt.get_cmap('jet'), levels=500)
 
@@ -318,7 +576,7 @@ class BeamVisualizer:
 
         del arr
 
-    def __plot_beam_flat_dissertation(self, beam, z, step, legend=True):
+    def __plot_beam_flat_dissertation(self, data, z, step, legend=True):
         """Plots intensity distribution in 2D beam with contour_plot"""
 
         w, h = (8.5, 7) if legend else (5, 5)
@@ -326,7 +584,7 @@ class BeamVisualizer:
         fig, ax = plt.subplots(figsize=self.__cm2inch(w, h))
         fig.patch.set_facecolor('white')
 
-        arr, xs, ys = self._initialize_arr()
+        arr, xs, ys = self._initialize_arr(data)
 
         # print(np.max(arr) * self.__beam.i_0, self.__maximum_intensity)
 
@@ -398,7 +656,7 @@ class BeamVisualizer:
 
         del arr
 
-    def __plot_beam_volume(self, beam, z, step):
+    def __plot_beam_volume(self, data, z, step):
         """Plots intensity distribution in 2D beam with contour_plot"""
 
         # FLAGS
@@ -409,8 +667,8 @@ class BeamVisualizer:
         fig = plt.figure(figsize=self._fig_size)
         ax = fig.add_subplot(111, projection='3d')
 
-        levels_plot, _ = self._initialize_levels_plot()
-        arr, xs, ys = self._initialize_arr()
+        levels_plot, _ = self._initialize_levels_plot(data['i_max'])
+        arr, xs, ys = self._initialize_arr(data)
 
         xs, ys = [e * 10**6 for e in xs], [e * 10**6 for e in ys]
         xx, yy = meshgrid(xs, ys)
@@ -419,7 +677,7 @@ class BeamVisualizer:
 
         ax.view_init(elev=50, azim=345)
 
-        if beam.info == 'beam_r':
+        if data['info'] == 'beam_r':
             offset_x = -1.1 * self.__x_max * 10**6
             offset_y = 1.1 * self.__y_max * 10**6
             ax.contour(xx, yy, arr, 1, zdir='x', colors='black', linestyles='solid', linewidths=3, offset=offset_x,
@@ -455,7 +713,7 @@ class BeamVisualizer:
                        fontweight=self._font_weight['labels'])
             plt.ylabel('\n\n' + self._x_label, fontsize=self._font_size['labels'],
                        fontweight=self._font_weight['labels'])
-            if self._normalize_intensity_to == beam.i_0:
+            if self._normalize_intensity_to == self.__i_0:
                 z_label = '$\qquad\qquad\quad$ I/I$\mathbf{_0}$'
             else:
                 z_label = '$\qquad\qquad\qquad\mathbf{I}$\n$\qquad\qquad\quad$TW/\n$\quad\qquad\qquad$cm$\mathbf{^2}$'
@@ -465,7 +723,7 @@ class BeamVisualizer:
         if title:
             if self.__title_string == self.__default_title_string:
                 plt.title(self.__title_string %
-                          (round(z * 10 ** 2, 3), beam.i_max / 10 ** 16), fontsize=self._font_size['title'])
+                          (round(z * 10 ** 2, 3), data['i_max'] / 10 ** 16), fontsize=self._font_size['title'])
             else:
                 plt.title(self.__title_string, fontsize=self._font_size['title'])
 
@@ -478,7 +736,15 @@ class BeamVisualizer:
 
 
 def plot_noise(beam, path):
-    """Plots picture with information about generated complex noise"""
+    """
+    Plots picture with information about generated complex noise. If the noise is cached on disk, the picture is
+    plotted only once and is copied from the cache after that.
+    """
+
+    noise = beam.noise
+    filename, key = path + '/gaussian_noise.png', noise.cache_key
+    if key is not None and noise.cache.load_figure(key, 'gaussian_noise.png', filename):
+        return
 
     xx_s = [(i * beam.dx - 0.5 * beam.x_max) * 10**6 for i in range(beam.n_x)]
     yy_s = [(i * beam.dy - 0.5 * beam.y_max) * 10**6 for i in range(beam.n_y)]
@@ -487,7 +753,7 @@ def plot_noise(beam, path):
     variance_expected = beam.noise.variance_expected
     autocorr_real_x, autocorr_real_y, autocorr_imag_x, autocorr_imag_y = beam.noise.autocorrs
 
-    field_real, field_imag = beam.noise._noise_field_real, beam.noise._noise_field_imag
+    field_real, field_imag = beam.noise.noise_field_real, beam.noise.noise_field_imag
 
     font_size = 20
     font_weight = 'bold'
@@ -613,11 +879,14 @@ def plot_noise(beam, path):
     # fig.suptitle('Complex Gaussian gaussian_noise $\mathbf{\\xi(x,y) = \\xi_{real}(x,y) + i \\xi_{imag}(x,y)}$\n$\mathbf{\sigma^2_{expected}}$ = %.2f\n$\mathbf{r_{corr} = %d}$ $\mathbf{\mu m}$' %
     #              (variance_expected, round(r_corr)), fontsize=font_size, fontweight=font_weight)
 
-    plt.savefig(path + '/gaussian_noise.png', bbox_inches='tight')
+    plt.savefig(filename, bbox_inches='tight')
     plt.close()
 
     del field_real, field_imag
 
+    if key is not None:
+        noise.cache.save_figure(key, 'gaussian_noise.png', filename)
+
 
 def plot_track(states_arr, parameter_index, path):
     """Plots parameter dependence on evolutionary coordinate z"""
@@ -642,13 +911,37 @@ def plot_track(states_arr, parameter_index, path):
 
 
 class SpectrumVisualizer:
+    """
+    Class for plotting intensity, phase and spatial spectrum of the beam.
+
+    As in class BeamVisualizer, method get_plot_data prepares small cropped arrays from the spectrum and methods
+    plot_raster_data and plot_dissertation_data plot them, so plotting can be made in background worker without the
+    spectrum and the beam.
+    """
+
     def __init__(self, **kwargs):
         self.__spectrum = kwargs['spectrum']
+        self.__i_0 = self.__spectrum.beam.i_0  # peak intensity of the initial beam
 
         self.__log_scale_of_spectrum = kwargs.get('log_scale_of_spectrum', False)
         self._remaining_central_part_coeff_field = kwargs['remaining_central_part_coeff_field']
         self._remaining_central_part_coeff_spectrum = kwargs['remaining_central_part_coeff_spectrum']
 
+        # raster rendering of intensity, phase and spectrum
+        self.__raster = kwargs.get('raster', False)  # use plot_raster instead of plot_dissertation in propagation
+        raster_scale = kwargs.get('raster_scale', 1)
+        self.__raster_intensity = RasterRenderer(cmap='jet', scale=raster_scale)
+        self.__raster_phase = RasterRenderer(cmap='hot', scale=raster_scale)
+        self.__raster_spectrum = RasterRenderer(cmap='gray', scale=raster_scale)
+
+    def __getstate__(self):
+        """Spectrum is not needed to plot the data returned by get_plot_data, so it is dropped"""
+
+        state = self.__dict__.copy()
+        state['_SpectrumVisualizer__spectrum'] = None
+
+        return state
+
     def __crop_arr_field(self, arr):
         """
         :param remaining_central_part_coeff:
@@ -671,6 +964,10 @@ class SpectrumVisualizer:
     def spectrum(self):
         return self.__spectrum
 
+    @property
+    def raster(self):
+        return self.__raster
+
     def __crop_arr_spectrum(self, arr):
         """
         :param remaining_central_part_coeff:
@@ -703,19 +1000,61 @@ class SpectrumVisualizer:
         return log10(arr / MAX)
 
     def __normalize_intensity(self, arr):
-        for i in range(arr.shape[0]):
-            for j in range(arr.shape[1]):
-                arr[i, j] *= self.__spectrum.beam.i_0 / 5e16
+        arr *= self.__i_0 / 5e16
 
         return arr
 
     def __normalize_intensity_synthetic_example(self, arr):
-        for i in range(arr.shape[0]):
-            for j in range(arr.shape[1]):
-                arr[i, j] *= self.__spectrum.beam.i_0 / 1e16
+        arr *= self.__i_0 / 1e16
 
         return arr
 
+    def get_plot_data(self, spectrum):
+        """
+        Prepares the data for plotting of the spectrum. The arrays are copied, so they do not change with the spectrum
+        and are not changed by plotting.
+
+        :param spectrum: spectrum object
+
+        :return: dictionary with cropped arrays of intensity, phase and spectrum intensity
+        """
+        return {'intensity_xy': self.__crop_arr_field(spectrum.intensity_xy).copy(),
+                'phase_xy': self.__crop_arr_field(spectrum.phase_xy).copy(),
+                'spectrum_intensity_xy': self.__crop_arr_spectrum(spectrum.spectrum_intensity_xy).copy()}
+
+    def plot_raster(self, spectrum, z, step):
+        return self.plot_raster_data(self.get_plot_data(spectrum), z, step)
+
+    def plot_raster_data(self, data, z, step):
+        """
+        Plots intensity, phase and spectrum side by side as raster images without axes (fast alternative of
+        plot_dissertation for long propagations)
+        """
+
+        intensity_for_plot = self.__normalize_intensity(data['intensity_xy'])
+        phase_for_plot = data['phase_xy']
+        if self.__log_scale_of_spectrum:
+            spectrum_for_plot = self.__log_spectrum(data['spectrum_intensity_xy'])
+        else:
+            spectrum_for_plot = data['spectrum_intensity_xy']
+
+        # rows of arrays are reversed to keep orientation of contour plots
+        images = [self.__raster_intensity.render(intensity_for_plot[::-1], 0.0, 1.0),
+                  self.__raster_phase.render(phase_for_plot[::-1], np.min(phase_for_plot), np.max(phase_for_plot)),
+                  self.__raster_spectrum.render(spectrum_for_plot[::-1], np.min(spectrum_for_plot),
+                                                np.max(spectrum_for_plot))]
+
+        height = max(image.shape[0] for image in images)
+        separator = np.full(shape=(height, max(height // 50, 1), 3), fill_value=255, dtype=np.uint8)
+        panels = []
+        for image in images:
+            if image.shape[0] != height:
+                image = cv2.resize(image, (height * image.shape[1] // image.shape[0], height),
+                                   interpolation=cv2.INTER_NEAREST)
+            panels += [image, separator]
+
+        RasterRenderer.save(self._path_to_save + '/%04d.png' % step, np.hstack(panels[:-1]))
+
     def plot_dissertation_diffraction(self, spectrum, z, step):
         legend = False
         x_axis = True
@@ -813,6 +1152,9 @@ class SpectrumVisualizer:
         plt.close()
 
     def plot_dissertation(self, spectrum, z, step):
+        return self.plot_dissertation_data(self.get_plot_data(spectrum), z, step)
+
+    def plot_dissertation_data(self, data, z, step):
         legend = True
         x_axis = True
         is_synthetic_example = False
@@ -831,7 +1173,7 @@ class SpectrumVisualizer:
 
         ax1 = fig.add_subplot(grid[0, 0])
         ax1.set_aspect('equal')
-        intensity_for_plot = self.__crop_arr_field(spectrum.intensity_xy)
+        intensity_for_plot = data['intensity_xy']
         if is_synthetic_example:
             intensity_for_plot = self.__normalize_intensity_synthetic_example(intensity_for_plot)
         else:
@@ -893,7 +1235,7 @@ class SpectrumVisualizer:
 
         ax2 = fig.add_subplot(grid[0, 1])
         ax2.set_aspect('equal')
-        phase_for_plot = self.__crop_arr_field(spectrum.phase_xy)
+        phase_for_plot = data['phase_xy']
         im2 = ax2.contourf(phase_for_plot, cmap=plt.get_cmap('hot'), levels=500)
         if is_synthetic_example:
             length = intensity_for_plot.shape[0]
@@ -955,9 +1297,9 @@ class SpectrumVisualizer:
         ax3.set_aspect('equal')
         # nonvortex_phase_xy = self.__crop_arr_field(spectrum.nonvortex_phase_xy)
         if self.__log_scale_of_spectrum:
-            spectrum_for_plot = self.__log_spectrum(self.__crop_arr_spectrum(spectrum.spectrum_intensity_xy))
+            spectrum_for_plot = self.__log_spectrum(data['spectrum_intensity_xy'])
         else:
-            spectrum_for_plot = self.__crop_arr_spectrum(spectrum.spectrum_intensity_xy)
+            spectrum_for_plot = data['spectrum_intensity_xy']
         if is_nonvortex_phase:
             im3 = ax3.contourf(nonvortex_phase_xy, cmap=plt.get_cmap('hot'), levels=500)
         else:
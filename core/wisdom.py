@@ -0,0 +1,111 @@
+import os
+import platform
+import struct
+from hashlib import sha1
+from multiprocessing import cpu_count
+from pyfftw import export_wisdom, import_wisdom, __version__ as pyfftw_version
+
+from .functions import create_cache_dir
+
+
+class FFTWWisdom:
+    """
+    Сlass for on-disk storage of FFTW wisdom.
+    Wisdom accumulated by FFTW planner is saved to the file, which name is formed from the grid shape, data type,
+    number of threads and signature of the processor. Thus expensive planning (for example, with FFTW_PATIENT) for
+    a given grid is made only once per machine, and all subsequent calculations (also in other processes) import it.
+    The file contains raw wisdom strings of FFTW for double, single and long double precision, each of them preceded
+    by its length.
+
+    The storage is not limited in size and is not cleaned, so it is used only if it is given to the diffraction
+    executor or spectrum explicitly (wisdom=FFTWWisdom()).
+    """
+
+    LENGTH_FORMAT = '<Q'  # format of length of wisdom string in file
+
+    def __init__(self, **kwargs):
+        self.__path = kwargs.get('path', None)  # directory with wisdom files
+        if self.__path is None:
+            self.__path = create_cache_dir('fftw_wisdom')
+        else:
+            os.makedirs(self.__path, exist_ok=True)
+
+        self.__cpu_signature = self.__calculate_cpu_signature()  # short hash of the processor description
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def cpu_signature(self):
+        return self.__cpu_signature
+
+    @staticmethod
+    def __calculate_cpu_signature():
+        """Calculates short hash of the processor model, architecture, number of cores and pyfftw version"""
+
+        model_name = platform.processor()
+        try:
+            with open('/proc/cpuinfo', 'r') as f:
+                for line in f:
+                    if line.startswith('model name'):
+                        model_name = line.split(':', 1)[1].strip()
+                        break
+        except OSError:
+            pass
+
+        description = '|'.join([model_name, platform.machine(), str(cpu_count()), pyfftw_version])
+
+        return sha1(description.encode()).hexdigest()[:12]
+
+    def filename(self, shape, dtype, n_jobs):
+        """
+        :param shape: shape of transformed array
+        :param dtype: data type of transformed array
+        :param n_jobs: number of threads used by plans
+
+        :return: full path of the wisdom file
+        """
+        name = '%s_%s_threads=%d_cpu=%s.wisdom' % ('x'.join(str(e) for e in shape), str(dtype), n_jobs,
+                                                   self.__cpu_signature)
+
+        return os.path.join(self.__path, name)
+
+    def load(self, shape, dtype, n_jobs):
+        """
+        Imports wisdom to FFTW planner if it was saved before for the same key
+
+        :return: True if wisdom was imported, False otherwise
+        """
+        filename = self.filename(shape, dtype, n_jobs)
+        if not os.path.exists(filename):
+            return False
+
+        try:
+            with open(filename, 'rb') as f:
+                wisdom = []
+                for _ in range(3):
+                    length, = struct.unpack(self.LENGTH_FORMAT, f.read(struct.calcsize(self.LENGTH_FORMAT)))
+                    wisdom.append(f.read(length))
+                    if len(wisdom[-1]) != length:
+                        return False
+            import_wisdom(tuple(wisdom))
+        except (OSError, struct.error):
+            return False
+
+        return True
+
+    def save(self, shape, dtype, n_jobs):
+        """
+        Exports current wisdom of FFTW planner to the file. The file is written atomically, because several
+        calculations of the sweep could save the same wisdom simultaneously.
+
+        :return: None
+        """
+        filename = self.filename(shape, dtype, n_jobs)
+        tmp_filename = '%s.%d.tmp' % (filename, os.getpid())
+        with open(tmp_filename, 'wb') as f:
+            for wisdom in export_wisdom():
+                f.write(struct.pack(self.LENGTH_FORMAT, len(wisdom)))
+                f.write(wisdom)
+        os.replace(tmp_filename, filename)
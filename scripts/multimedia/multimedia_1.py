@@ -62,5 +62,6 @@ class Multimedia1(BaseMultimedia):
         return all_files, indices, n_pictures_max
 
 
-multimedia = Multimedia1()
-multimedia.process_multimedia()
+if __name__ == '__main__':
+    multimedia = Multimedia1()
+    multimedia.process_multimedia()
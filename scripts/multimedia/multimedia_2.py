@@ -54,5 +54,6 @@ class Multimedia2(BaseMultimedia):
         return all_files, indices, n_pictures_max
 
 
-multimedia = Multimedia2()
-multimedia.process_multimedia()
+if __name__ == '__main__':
+    multimedia = Multimedia2()
+    multimedia.process_multimedia()
@@ -58,5 +58,6 @@ class Multimedia3(BaseMultimedia):
         return all_files, indices, n_pictures_max
 
 
-multimedia = Multimedia3()
-multimedia.process_multimedia()
+if __name__ == '__main__':
+    multimedia = Multimedia3()
+    multimedia.process_multimedia()
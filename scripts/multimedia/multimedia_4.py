@@ -65,5 +65,6 @@ class Multimedia4(BaseMultimedia):
         return all_files, indices, n_pictures_max
 
 
-multimedia = Multimedia4()
-multimedia.process_multimedia()
+if __name__ == '__main__':
+    multimedia = Multimedia4()
+    multimedia.process_multimedia()
@@ -65,5 +65,6 @@ class Multimedia5(BaseMultimedia):
         return all_files, indices, n_pictures_max
 
 
-multimedia = Multimedia5()
-multimedia.process_multimedia()
+if __name__ == '__main__':
+    multimedia = Multimedia5()
+    multimedia.process_multimedia()
@@ -54,5 +54,6 @@ class Multimedia6(BaseMultimedia):
         return all_files, indices, n_pictures_max
 
 
-multimedia = Multimedia6()
-multimedia.process_multimedia()
+if __name__ == '__main__':
+    multimedia = Multimedia6()
+    multimedia.process_multimedia()
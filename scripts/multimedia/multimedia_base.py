@@ -1,9 +1,49 @@
 from abc import ABCMeta, abstractmethod
-from PIL import Image
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count, get_context
 from glob import glob
+import shutil
+from numpy import zeros, uint8
+import cv2
 
 
-from core import parse_args, create_dir, create_multidir, make_animation, make_video
+from core import parse_args, create_dir, create_multidir, encode_frames
+
+
+_tiles = {}  # last decoded picture in every position of composed frame in worker process: (path, RGB array)
+
+
+def _compose_frames(frames, indices, tile_size, total_size, results_dir):
+    """
+    Composes frames from pictures and saves them in worker process. The picture is decoded only if it differs from
+    the previous picture in the same position.
+
+    :param frames: list of numbers of frames and paths to pictures for them
+    :param indices: positions of pictures in composed frame
+    :param tile_size: width and height of one picture
+    :param total_size: width and height of composed frame
+    :param results_dir: directory for composed frames
+
+    :return: list of composed RGB frames
+    """
+    (width, height), (total_width, total_height) = tile_size, total_size
+
+    composed_frames = []
+    for n_frame, paths in frames:
+        composed = zeros(shape=(total_height, total_width, 3), dtype=uint8)
+        for j, path in enumerate(paths):
+            if j not in _tiles or _tiles[j][0] != path:
+                _tiles[j] = (path, cv2.imread(path)[:, :, ::-1])
+            i1, i2 = indices[j]
+            x, y = i1 * width, i2 * height
+            tile = _tiles[j][1][:total_height - y, :total_width - x]
+            composed[y:y + tile.shape[0], x:x + tile.shape[1]] = tile
+
+        cv2.imwrite(results_dir + '/%04d.png' % n_frame, composed[:, :, ::-1], [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        composed_frames.append(composed)
+
+    return composed_frames
 
 
 class BaseMultimedia(metaclass=ABCMeta):
@@ -11,6 +51,10 @@ class BaseMultimedia(metaclass=ABCMeta):
     Abstract class containing the necessary methods to implement multimedia mode.
     It is assumed that to create the next multimedia the derived class is created, which is inherited from this.
     Methods _get_data, process_multimedia and plot_beam_func are defined in the derived class.
+
+    Frames are composed in the pool of n_workers processes and are streamed to gif-animation and video. Worker
+    processes are spawned, as in class SweepRunner, so the script using the class must be protected with
+    if __name__ == '__main__'.
     """
 
     def __init__(self, **kwargs):
@@ -18,6 +62,7 @@ class BaseMultimedia(metaclass=ABCMeta):
         self._results_dir, self._results_dir_name = create_multidir(self._args.global_root_dir,
                                                                     self._args.global_results_dir_name,
                                                                     self._args.prefix)
+        self._n_workers = kwargs.get('n_workers', cpu_count())  # number of processes composing frames
 
     @abstractmethod
     def _get_data(self):
@@ -29,10 +74,10 @@ class BaseMultimedia(metaclass=ABCMeta):
 
         all_files = []
         n_pictures_max = 0
-        for path in glob(path + '/*'):
+        for path in sorted(glob(path + '/*')):
             files = []
             n_pictures = 0
-            for file in glob(path + '/beam/*'):
+            for file in sorted(glob(path + '/beam/*')):
                 files.append(file.replace('\\', '/'))
                 n_pictures += 1
 
@@ -41,50 +86,59 @@ class BaseMultimedia(metaclass=ABCMeta):
 
         return all_files, n_pictures_max
 
-    def __compose(self, all_files, indices, n_pictures_max, fps=10, n_seconds_pause=2, animation=True, video=True):
-        all_files_upd = []
-        for idx in range(len(all_files)):
-            files = []
-            for file in all_files[idx]:
-                files.append(file)
-
-            # append last picture if n_pictures < n_pictures_max
-            delta = n_pictures_max - len(files)
-            for i in range(delta):
-                files.append(all_files[idx][-1])
-
-            # 1 second pause at the beginning
-            for i in range(n_seconds_pause * fps):
-                files = [all_files[idx][0]] + files
-
-            # 1 second pause at the end
-            for i in range(n_seconds_pause * fps):
-                files.append(all_files[idx][-1])
+    @staticmethod
+    def __make_runs(all_files, n_pictures_max, n_frames_pause):
+        """
+        Makes the list of runs of equal frames: number of the first frame, number of frames and paths to pictures.
+        Frames begin and end with the pause, shorter series of pictures are continued by their last picture.
+        """
+
+        runs = []
+        for n_frame in range(n_pictures_max + 2 * n_frames_pause):
+            idx = n_frame - n_frames_pause
+            paths = tuple(files[min(max(idx, 0), len(files) - 1)] for files in all_files)
+            if runs and runs[-1][2] == paths:
+                runs[-1][1] += 1
+            else:
+                runs.append([n_frame, 1, paths])
+
+        return runs
+
+    def __compose_frames(self, runs, indices, tile_size, total_size, results_dir, chunk_size=8):
+        """Yields composed frames in order, every run of equal frames is composed only once"""
+
+        with ProcessPoolExecutor(max_workers=self._n_workers, mp_context=get_context('spawn')) as executor:
+            pending = deque()
+            for i in range(0, len(runs), chunk_size):
+                chunk = runs[i:i + chunk_size]
+                future = executor.submit(_compose_frames, [(n_frame, paths) for n_frame, _, paths in chunk], indices,
+                                         tile_size, total_size, results_dir)
+                pending.append((chunk, future))
+
+                # not more than 2 * n_workers chunks are composed ahead of encoding
+                while len(pending) > 2 * self._n_workers or (pending and i + chunk_size >= len(runs)):
+                    chunk, future = pending.popleft()
+                    for (n_frame, n_frames, _), composed in zip(chunk, future.result()):
+                        for n in range(n_frame + 1, n_frame + n_frames):
+                            shutil.copyfile(results_dir + '/%04d.png' % n_frame, results_dir + '/%04d.png' % n)
+                        for _ in range(n_frames):
+                            yield composed
 
-            all_files_upd.append(files)
+    def __compose(self, all_files, indices, n_pictures_max, fps=10, n_seconds_pause=2, animation=True, video=True):
+        runs = self.__make_runs(all_files, n_pictures_max, n_seconds_pause * fps)
 
-        # save composed images to dir
+        # save composed images to dir and encode them
         results_dir = create_dir(path=self._results_dir)
-        width, height = Image.open(all_files_upd[0][0]).size
+        height, width = cv2.imread(all_files[0][0]).shape[:2]
         i1_max, i2_max = indices[-1]
         total_width, total_height = (i1_max + 1) * width, (i2_max + 1) * height
-        for i in range(len(all_files_upd[0])):
-            composed_im = Image.new('RGB', (total_width, total_height))
-            for j in range(len(all_files_upd)):
-                im = Image.open(all_files_upd[j][i])
-                i1, i2 = indices[j]
-                composed_im.paste(im, (i1 * width, i2 * height))
-            composed_im.save(results_dir + '/%04d.png' % i, 'PNG')
-
-        if animation:
-            make_animation(root_dir=self._results_dir,
-                           name=self._args.prefix,
-                           fps=fps)
-
-        if video:
-            make_video(root_dir=self._results_dir,
-                       name=self._args.prefix,
-                       fps=fps)
+        frames = self.__compose_frames(runs, indices, (width, height), (total_width, total_height), results_dir)
+
+        if animation or video:
+            encode_frames(self._results_dir, self._args.prefix, frames, fps=fps, animation=animation, video=video)
+        else:
+            for _ in frames:
+                pass
 
     def process_multimedia(self):
         all_files, indices, n_pictures_max = self._get_data()
@@ -6,7 +6,7 @@ from matplotlib import cm
 from mpl_toolkits.mplot3d import Axes3D
 from skimage import measure
 
-from core import create_dir, make_paths, parse_args
+from core import create_dir, make_paths, parse_args, load_fields
 
 
 class PhaseSurface:
@@ -22,10 +22,13 @@ class PhaseSurface:
         self.__plot()
 
     @staticmethod
-    def __load_field(path_to_npy):
-        field = []
-        for file in glob(path.join(path_to_npy, '*.npy')):
-            field.append(load(file))
+    def __load_field(path_to_field):
+        if path_to_field.endswith('.h5'):
+            field = load_fields(path_to_field)['field']
+        else:
+            field = []
+            for file in sorted(glob(path.join(path_to_field, '*.npy'))):
+                field.append(load(file))
 
         return array(angle(array(field, dtype=complex64)) + pi, dtype=float64)
 
@@ -2,7 +2,7 @@ from tqdm import tqdm
 from argparse import Namespace
 from os import mkdir
 
-from core import BeamR, Propagator, SweepDiffractionExecutorR, KerrExecutorR, BeamVisualizer, create_multidir, xlsx_to_df
+from core import BeamR, BatchPropagatorR, create_multidir
 from scripts.ring_critical_power.ring_critical_power import RingCriticalPower
 
 NAME = 'ring_critical_power_r'
@@ -28,59 +28,49 @@ class RingCriticalPowerR(RingCriticalPower):
             M_dir = self.__results_dir + '/' + M_dir_name
             mkdir(M_dir)
 
-            dfs = []
+            beams = [
+                BeamR(medium=self._medium.info,
+                      M=M,
+                      m=0,
+                      p_0_to_p_gauss=p_g_normalized,
+                      lmbda=self._lmbda,
+                      r_0=self._radius,
+                      n_r=2048,
+                      radii_in_grid=40)
+                for p_g_normalized in self._p_gs]
+
+            # every beam has its own results directory as in the calculation with class Propagator
+            global_results_dir_name = M_dir.split(self._args.global_root_dir)[1][1:]
+            args = [Namespace(global_root_dir=self._args.global_root_dir,
+                              global_results_dir_name=global_results_dir_name,
+                              prefix='p_0_to_p_g=%2.2f' % p_g_normalized,
+                              insert_datetime=False)
+                    for p_g_normalized in self._p_gs]
+
+            i_max_to_stop = [self._n_i_max_to_stop * beam.i_max for beam in beams]
+            propagator = BatchPropagatorR(beams=beams,
+                                          n_z=self._n_z_diff * self._n_z,
+                                          dz_0=beams[0].z_diff / self._n_z,
+                                          const_dz=True,
+                                          max_intensity_to_stop=i_max_to_stop,
+                                          args=args)
+
+            propagator.propagate()
+
             p_g_pred = None
-            flag_critical_found = False
-
-            for p_g_normalized in self._p_gs:
-
-                beam = BeamR(medium=self._medium.info,
-                             M=M,
-                             m=0,
-                             p_0_to_p_gauss=p_g_normalized,
-                             lmbda=self._lmbda,
-                             r_0=self._radius,
-                             n_r=2048,
-                             radii_in_grid=40)
-
-                visualizer = BeamVisualizer(beam=beam,
-                                            maximum_intensity='local',
-                                            normalize_intensity_to=beam.i_0,
-                                            plot_type='profile')
-
-                global_results_dir_name = M_dir.split(self._args.global_root_dir)[1][1:]
-                args = Namespace(global_root_dir=self._args.global_root_dir,
-                                 global_results_dir_name=global_results_dir_name,
-                                 prefix='p_0_to_p_g=%2.2f' % p_g_normalized,
-                                 insert_datetime=False)
-
-                i_max_to_stop = self._n_i_max_to_stop * beam.i_max
-                propagator = Propagator(args=args,
-                                        beam=beam,
-                                        diffraction=SweepDiffractionExecutorR(beam=beam),
-                                        kerr_effect=KerrExecutorR(beam=beam),
-                                        n_z=self._n_z_diff * self._n_z,
-                                        dz_0= beam.z_diff / self._n_z,
-                                        const_dz=True,
-                                        print_current_state_every=0,
-                                        plot_beam_every=0,
-                                        max_intensity_to_stop=i_max_to_stop,
-                                        visualizer=visualizer)
-
-                propagator.propagate()
-
-                if not flag_critical_found and propagator.beam.i_max > i_max_to_stop:
+            for p_g_normalized, beam, i_max in zip(self._p_gs, beams, i_max_to_stop):
+                if beam.i_max > i_max:
                     p_g_pred = p_g_normalized
-                    flag_critical_found = True
+                    break
 
-                df = xlsx_to_df(propagator.logger.track_filename,
-                                normalize_z_to=1,
-                                normalize_i_to=i_max_to_stop / self._n_i_max_to_stop)
-                df['z_normalized'] /= propagator.beam.z_diff
-                dfs.append((p_g_normalized, df))
+            dfs = propagator.tracks_to_dfs(normalize_z_to=1,
+                                           normalize_i_to=[i_max / self._n_i_max_to_stop for i_max in i_max_to_stop])
+            for df in dfs:
+                df['z_normalized'] /= beams[0].z_diff
+            dfs = list(zip(self._p_gs, dfs))
 
-                del beam
-                del propagator
+            del beams
+            del propagator
 
             self._p_g_rel_pred[idx] = p_g_pred
 
@@ -2,3 +2,17 @@ from .diffraction.all_tests_diffraction import *
 from .marburger.all_tests_marburger import *
 from .vortex_critical_power.all_tests_vortex_critical_power import *
 from .gaussian_noise.gaussian_noise import *
+from .critical_power.all_tests_critical_power import *
+from .splitting.all_tests_splitting import *
+from .stepper.all_tests_stepper import *
+from .batch.all_tests_batch import *
+from .sweep.all_tests_sweep import *
+from .zoom.all_tests_zoom import *
+from .field_store.all_tests_field_store import *
+from .background.all_tests_background import *
+from .ensemble.all_tests_ensemble import *
+from .wisdom.all_tests_wisdom import *
+from .kerr_effect.all_tests_kerr_effect import *
+from .stop_conditions.all_tests_stop_conditions import *
+from .tridiagonal.all_tests_tridiagonal import *
+from .stretched_grid.all_tests_stretched_grid import *
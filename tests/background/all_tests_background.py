@@ -0,0 +1 @@
+from .test_background_worker import TestBackgroundWorker
@@ -0,0 +1,111 @@
+import pickle
+from unittest import TestCase
+from argparse import Namespace
+from glob import glob
+from tempfile import TemporaryDirectory
+from numpy import zeros, argmax, unravel_index
+
+from core import BeamR, BeamXY, Propagator, SweepDiffractionExecutorR, KerrExecutorR, BeamVisualizer, \
+    RasterRenderer, BackgroundWorker
+
+
+class TestBackgroundWorker(TestCase):
+    """
+    Class for testing of plotting in background worker: only the plot data of the beam are submitted, not the beam
+    itself, and the worker is closed at the end of propagation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_z = 20
+        self.__plot_beam_every = 5
+
+    @staticmethod
+    def __create_beam():
+        return BeamR(medium='SiO2',
+                     M=0,
+                     m=0,
+                     p_0_to_p_gauss=1.0,
+                     lmbda=1800 * 10**-9,
+                     r_0=100 * 10**-6,
+                     n_r=4096,
+                     radii_in_grid=10)
+
+    @staticmethod
+    def __create_visualizer(beam):
+        # raster rendering without overlay does not need matplotlib
+        return BeamVisualizer(beam=beam,
+                              maximum_intensity='local',
+                              normalize_intensity_to=1,
+                              plot_type='raster',
+                              raster_overlay=False)
+
+    def test_background_worker_payload(self):
+        beam = self.__create_beam()
+        visualizer = self.__create_visualizer(beam)
+
+        payload = pickle.dumps((visualizer.plot_beam_data, [visualizer.get_plot_data(beam), 0.0, 0]),
+                               protocol=pickle.HIGHEST_PROTOCOL)
+        self.assertLess(len(payload), len(pickle.dumps(beam._field, protocol=pickle.HIGHEST_PROTOCOL)))
+        self.assertNotIn(b'BeamR', payload)
+
+    def test_background_worker_propagation(self):
+        beam = self.__create_beam()
+        background_worker = BackgroundWorker(mode='thread')
+
+        with TemporaryDirectory() as tmp_dir:
+            args = Namespace(global_root_dir=tmp_dir, global_results_dir_name='results', prefix='background',
+                             insert_datetime=False)
+            propagator = Propagator(args=args,
+                                    beam=beam,
+                                    diffraction=SweepDiffractionExecutorR(beam=beam),
+                                    kerr_effect=KerrExecutorR(beam=beam),
+                                    n_z=self.__n_z,
+                                    dz_0=beam.z_diff / 1000,
+                                    const_dz=True,
+                                    print_current_state_every=0,
+                                    plot_beam_every=self.__plot_beam_every,
+                                    visualizer=self.__create_visualizer(beam),
+                                    background_worker=background_worker,
+                                    print_track=False)
+            propagator.propagate()
+
+            n_pictures = len(glob(propagator.manager.beam_dir + '/*.png'))
+            self.assertEqual(n_pictures, self.__n_z // self.__plot_beam_every + 1)
+            self.assertEqual(background_worker.n_pending, 0)
+
+    def test_plot_data_beam_xy(self):
+        # intensity of 2D beam is stored with indices [x, y], the plot data keep this order on non-square grid
+        beam = BeamXY(medium='SiO2',
+                      M=0,
+                      m=0,
+                      p_0_to_p_gauss=1.0,
+                      lmbda=1800 * 10**-9,
+                      x_0=50 * 10**-6,
+                      y_0=100 * 10**-6,
+                      n_x=256,
+                      n_y=128)
+        data = self.__create_visualizer(beam).get_plot_data(beam)
+
+        self.assertEqual(data['intensity'].shape, (len(data['xs']), len(data['ys'])))
+        i, j = unravel_index(argmax(beam.intensity), beam.intensity.shape)
+        self.assertIn(beam.xs[i], data['xs'])
+        self.assertIn(beam.ys[j], data['ys'])
+        self.assertEqual(data['intensity'].max(), beam.intensity.max())
+
+    def test_raster_overlay_cache(self):
+        # renderer unpickled in worker for every frame builds the overlay only once in the process
+        calls = []
+
+        def plot_overlay(fig, ax):
+            calls.append(1)
+            ax.set_axis_off()
+
+        key = ('test_raster_overlay_cache',)
+        for _ in range(3):
+            renderer = pickle.loads(pickle.dumps(RasterRenderer(cmap='jet'), protocol=pickle.HIGHEST_PROTOCOL))
+            renderer.build_overlay(key, plot_overlay)
+            frame = renderer.compose(renderer.render(zeros(shape=(16, 16)), 0.0, 1.0))
+            self.assertEqual(frame.ndim, 3)
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1 @@
+from .test_batch_propagator_r import TestBatchPropagatorR
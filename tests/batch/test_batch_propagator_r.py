@@ -0,0 +1,78 @@
+from unittest import TestCase
+from argparse import Namespace
+from tempfile import TemporaryDirectory
+from os.path import exists
+
+from core import BeamR, BatchPropagatorR, Propagator, SweepDiffractionExecutorR, KerrExecutorR
+
+
+class TestBatchPropagatorR(TestCase):
+    """
+    Class for testing of the batch propagation of vortex beams with different powers: the track and the field of every
+    beam in the batch must coincide with the ones calculated by class Propagator with the same diffraction and Kerr
+    effect executors, and every beam must have its own results directory with the propagation file.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__p_vs = [1.0, 3.0, 6.0]
+        self.__n_r = 1024
+        self.__n_z = 600
+        self.__n_i_max_to_stop = 5
+
+    def __create_beam(self, p_v):
+        return BeamR(medium='SiO2',
+                     M=1,
+                     m=1,
+                     p_0_to_p_vortex=p_v,
+                     lmbda=1800 * 10**-9,
+                     r_0=100 * 10**-6,
+                     n_r=self.__n_r,
+                     radii_in_grid=10)
+
+    @staticmethod
+    def __create_args(path, global_results_dir_name, p_v):
+        return Namespace(global_root_dir=path, global_results_dir_name=global_results_dir_name,
+                         prefix='p_v=%2.2f' % p_v, insert_datetime=False)
+
+    def test_batch_propagator_r(self):
+        beams = [self.__create_beam(p_v) for p_v in self.__p_vs]
+        i_max_to_stop = [self.__n_i_max_to_stop * beam.i_max for beam in beams]
+
+        with TemporaryDirectory() as tmp_dir:
+            propagator = BatchPropagatorR(beams=beams,
+                                          n_z=self.__n_z,
+                                          dz_0=beams[0].z_diff / 1000,
+                                          const_dz=False,
+                                          max_intensity_to_stop=i_max_to_stop,
+                                          args=[self.__create_args(tmp_dir, 'batch', p_v) for p_v in self.__p_vs],
+                                          print_track=False)
+            propagator.propagate()
+
+            for logger in propagator.loggers:
+                self.assertTrue(exists(logger.track_filename))
+
+            for b, p_v in enumerate(self.__p_vs):
+                beam = self.__create_beam(p_v)
+                single = Propagator(args=self.__create_args(tmp_dir, 'single', p_v),
+                                    beam=beam,
+                                    diffraction=SweepDiffractionExecutorR(beam=beam),
+                                    kerr_effect=KerrExecutorR(beam=beam),
+                                    n_z=self.__n_z,
+                                    dz_0=beam.z_diff / 1000,
+                                    const_dz=False,
+                                    print_current_state_every=0,
+                                    plot_beam_every=0,
+                                    max_intensity_to_stop=i_max_to_stop[b],
+                                    print_track=False)
+                single.propagate()
+
+                self.assertEqual(propagator.stop_reasons[b], single.stop_reason)
+                self.assertEqual(propagator.states_arrs[b].shape, single.states_arr.shape)
+                self.assertLess(abs(propagator.states_arrs[b] - single.states_arr).max(), 10**-6 * beam.i_0)
+                self.assertLess(abs(propagator.beams[b].field - beam.field).max(), 10**-6)
+
+        # the weakest beam diffracts, the most powerful one collapses
+        self.assertEqual(propagator.stop_reasons[0], 'n_z steps are made')
+        self.assertNotEqual(propagator.stop_reasons[-1], 'n_z steps are made')
@@ -0,0 +1 @@
+from .test_critical_power_search import TestCriticalPowerSearch
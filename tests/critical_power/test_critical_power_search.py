@@ -0,0 +1,78 @@
+from unittest import TestCase
+from argparse import Namespace
+from tempfile import TemporaryDirectory
+from numpy.random import random
+from tqdm import trange
+
+from core import BeamR, SweepDiffractionExecutorR, KerrExecutorR, CriticalPowerSearch, PropagationTrial
+
+
+def calculate_dz_0(beam):
+    return beam.z_diff / 1000
+
+
+class TestCriticalPowerSearch(TestCase):
+    """
+    Class for testing of the search of critical power of self-focusing with synthetic trial function
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__tolerance = 0.005
+        self.__max_trials = 16
+
+    def test_critical_power_search(self, n_epochs=50):
+
+        for _ in trange(n_epochs, desc='critical_power_search'):
+            p_cr_expected = 0.5 + 1.5 * random()
+
+            search = CriticalPowerSearch(trial=lambda p_rel: p_rel >= p_cr_expected,
+                                         p_0=1.0,
+                                         step=0.1,
+                                         tolerance=self.__tolerance,
+                                         max_trials=self.__max_trials)
+            p_cr_generated = search.search()
+
+            p_low, p_high = search.bracket
+            self.assertLess(p_low, p_cr_expected)
+            self.assertGreaterEqual(p_high, p_cr_expected)
+            self.assertLessEqual(p_high - p_low, self.__tolerance)
+            self.assertLess(abs(p_cr_generated - p_cr_expected), self.__tolerance)
+            self.assertLessEqual(search.n_trials, self.__max_trials)
+
+
+class TestPropagationTrial(TestCase):
+    """
+    Class for testing of trials of the search of critical power with propagation of Gaussian beam: the beam far below
+    critical power diffracts and the beam far above it collapses
+    """
+
+    @staticmethod
+    def __create_trial(tmp_dir, z_diff_to_abort):
+        return PropagationTrial(args=Namespace(global_root_dir=tmp_dir, global_results_dir_name='results'),
+                                beam_class=BeamR,
+                                diffraction_class=SweepDiffractionExecutorR,
+                                kerr_effect_class=KerrExecutorR,
+                                beam_params={'medium': 'SiO2',
+                                             'M': 0,
+                                             'm': 0,
+                                             'lmbda': 1800 * 10**-9,
+                                             'r_0': 100 * 10**-6,
+                                             'n_r': 512,
+                                             'radii_in_grid': 10},
+                                propagator_params={'n_z': 3000,
+                                                   'dz_0': calculate_dz_0,
+                                                   'const_dz': False,
+                                                   'print_current_state_every': 0,
+                                                   'plot_beam_every': 0,
+                                                   'print_track': False},
+                                power_param='p_0_to_p_gauss',
+                                z_diff_to_abort=z_diff_to_abort)
+
+    def test_propagation_trial(self):
+        with TemporaryDirectory() as tmp_dir:
+            for z_diff_to_abort in (0.0, 0.1):
+                trial = self.__create_trial(tmp_dir, z_diff_to_abort)
+                self.assertFalse(trial(0.3))
+                self.assertTrue(trial(3.0))
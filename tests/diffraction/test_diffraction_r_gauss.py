@@ -1,4 +1,4 @@
-from core import BeamR, Propagator, SweepDiffractionExecutorR, BeamVisualizer, xlsx_to_df
+from core import BeamR, Propagator, SweepDiffractionExecutorR, BeamVisualizer, track_to_df
 from tests.diffraction.test_diffraction import TestDiffraction
 
 NAME = 'diffraction_r_gauss'
@@ -46,7 +46,7 @@ class TestDiffractionRGauss(TestDiffraction):
 
     def test_diffraction_r_gauss(self):
         track_filename, path_to_save_plot, z_diff = self.process()
-        df = xlsx_to_df(track_filename, normalize_z_to=1)
+        df = track_to_df(track_filename, normalize_z_to=1)
 
         self._add_analytics_to_df(df)
         self._check(df)
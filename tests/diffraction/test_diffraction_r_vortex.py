@@ -1,6 +1,6 @@
 from numpy.random import randint
 
-from core import BeamR, Propagator, SweepDiffractionExecutorR, BeamVisualizer, xlsx_to_df
+from core import BeamR, Propagator, SweepDiffractionExecutorR, BeamVisualizer, track_to_df
 from tests.diffraction.test_diffraction import TestDiffraction
 
 NAME = 'diffraction_r_vortex'
@@ -51,7 +51,7 @@ class TestDiffractionRVortex(TestDiffraction):
 
     def test_diffraction_r_vortex(self):
         track_filename, path_to_save_plot, z_diff = self.process()
-        df = xlsx_to_df(track_filename, normalize_z_to=1)
+        df = track_to_df(track_filename, normalize_z_to=1)
 
         df['i_max / i_0'] /= df['i_max / i_0'][0]
 
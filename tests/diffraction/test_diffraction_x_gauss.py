@@ -1,6 +1,6 @@
 from numpy import sqrt
 
-from core import BeamX, Propagator, SweepDiffractionExecutorX, BeamVisualizer, xlsx_to_df
+from core import BeamX, Propagator, SweepDiffractionExecutorX, BeamVisualizer, track_to_df
 from tests.diffraction.test_diffraction import TestDiffraction
 
 NAME = 'diffraction_x_gauss'
@@ -47,7 +47,7 @@ class TestDiffractionXGauss(TestDiffraction):
 
     def test_diffraction_x_gauss(self):
         track_filename, path_to_save_plot, z_diff = self.process()
-        df = xlsx_to_df(track_filename, normalize_z_to=1)
+        df = track_to_df(track_filename, normalize_z_to=1)
         self._add_analytics_to_df(df)
         self._check(df)
 
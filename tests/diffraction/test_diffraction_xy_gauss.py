@@ -1,4 +1,4 @@
-from core import BeamXY, Propagator, FourierDiffractionExecutorXY, BeamVisualizer, xlsx_to_df
+from core import BeamXY, Propagator, FourierDiffractionExecutorXY, BeamVisualizer, track_to_df
 from tests.diffraction.test_diffraction import TestDiffraction
 
 NAME = 'diffraction_xy_gauss'
@@ -48,7 +48,7 @@ class TestDiffractionXYGauss(TestDiffraction):
 
     def test_diffraction_xy_gauss(self):
         track_filename, path_to_save_plot, z_diff = self.process()
-        df = xlsx_to_df(track_filename, normalize_z_to=1)
+        df = track_to_df(track_filename, normalize_z_to=1)
 
         self._add_analytics_to_df(df)
         self._check(df)
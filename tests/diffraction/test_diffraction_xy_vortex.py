@@ -1,6 +1,6 @@
 from numpy.random import randint
 
-from core import BeamXY, Propagator, FourierDiffractionExecutorXY, BeamVisualizer, xlsx_to_df
+from core import BeamXY, Propagator, FourierDiffractionExecutorXY, BeamVisualizer, track_to_df
 from tests.diffraction.test_diffraction import TestDiffraction
 
 NAME = 'diffraction_xy_vortex'
@@ -53,7 +53,7 @@ class TestDiffractionXYVortex(TestDiffraction):
 
     def test_diffraction_xy_vortex(self):
         track_filename, path_to_save_plot, z_diff = self.process()
-        df = xlsx_to_df(track_filename, normalize_z_to=1)
+        df = track_to_df(track_filename, normalize_z_to=1)
 
         df['i_max / i_0'] /= df['i_max / i_0'][0]
 
@@ -0,0 +1 @@
+from .test_ensemble import TestRunningStatistics, TestEnsembleRunner
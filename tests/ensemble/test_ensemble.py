@@ -0,0 +1,93 @@
+from unittest import TestCase
+
+from numpy import nan, isnan, nanmean, nanvar, nanmax, allclose, isfinite
+from numpy.random import default_rng
+
+from core import GaussianNoise, FourierDiffractionExecutorXY, EnsembleRunner, RunningStatistics
+
+
+def calculate_dz_0(beam):
+    return beam.z_diff / 100
+
+
+def calculate_max_intensity_to_stop(beam):
+    return 2 * beam.i_0
+
+
+class TestRunningStatistics(TestCase):
+    """
+    Class for testing of mean and variance accumulated by Welford's algorithm against numpy, NaN values are skipped
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_realizations = 20
+        self.__shape = (8, 5)
+
+    def test_running_statistics(self):
+        rng = default_rng(0)
+        values = 10 + rng.standard_normal(size=(self.__n_realizations,) + self.__shape)
+        values[rng.random(size=values.shape) < 0.2] = nan
+        values[:, 0, 0] = nan  # no values
+        values[1:, 0, 1] = nan  # one value
+
+        statistics = RunningStatistics(shape=self.__shape)
+        for arr in values:
+            statistics.update(arr)
+
+        count = (~isnan(values)).sum(axis=0)
+        self.assertTrue((statistics.count == count).all())
+
+        mask = count > 1
+        self.assertTrue(allclose(statistics.mean[count > 0], nanmean(values[:, count > 0], axis=0)))
+        self.assertTrue(allclose(statistics.variance[mask], nanvar(values[:, mask], axis=0, ddof=1)))
+        self.assertTrue(isnan(statistics.mean[0, 0]))
+        self.assertTrue(isnan(statistics.variance[0, 0]) and isnan(statistics.variance[0, 1]))
+
+
+class TestEnsembleRunner(TestCase):
+    """
+    Smoke test of the ensemble of two noise realizations of the self-focusing Gaussian beam in spawned worker process:
+    both realizations must collapse, so their distances of collapse are finite and statistics include both of them,
+    and different realizations of noise must give different tracks.
+    Realizations do not write results, so nothing is created on disk.
+    Functions in parameters are defined at module level, because they are pickled to the worker.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_realizations = 2
+        self.__n_z = 100
+
+    def test_ensemble_runner(self):
+        runner = EnsembleRunner(beam_params={'medium': 'SiO2',
+                                             'M': 0,
+                                             'm': 0,
+                                             'p_0_to_p_gauss': 5.0,
+                                             'noise_percent': 1,
+                                             'lmbda': 1800 * 10**-9,
+                                             'x_0': 100 * 10**-6,
+                                             'y_0': 100 * 10**-6,
+                                             'n_x': 128,
+                                             'n_y': 128},
+                                noise=GaussianNoise(r_corr_in_meters=20 * 10**-6, variance=1, seed=1),
+                                n_realizations=self.__n_realizations,
+                                diffraction_class=FourierDiffractionExecutorXY,
+                                propagator_params={'n_z': self.__n_z,
+                                                   'dz_0': calculate_dz_0,
+                                                   'const_dz': True,
+                                                   'max_intensity_to_stop': calculate_max_intensity_to_stop,
+                                                   'print_current_state_every': 0},
+                                n_workers=1,
+                                n_threads=1)
+        df = runner.run()
+
+        self.assertEqual(len(runner.collapse_distances), self.__n_realizations)
+        self.assertTrue(isfinite(runner.collapse_distances).all())
+        self.assertEqual(df['realizations'].iloc[0], self.__n_realizations)
+        self.assertLess(df['realizations'].iloc[-1], self.__n_realizations)
+
+        # realizations of noise give different tracks
+        self.assertGreater(nanmax(df['i_max / i_0 variance']), 0.0)
@@ -0,0 +1 @@
+from .test_field_store import TestFieldStore
@@ -0,0 +1,77 @@
+from unittest import TestCase
+from argparse import Namespace
+from tempfile import TemporaryDirectory
+
+from core import BeamR, Propagator, SweepDiffractionExecutorR, KerrExecutorR, BackgroundWorker, StopCondition, \
+    load_fields
+
+
+class FailingStopCondition(StopCondition):
+    """Stop condition raising exception at the given step to simulate the failure of calculations"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.__n_fail = kwargs['n_fail']  # number of check at which exception is raised
+        self.__n_checks = 0
+
+    @property
+    def info(self):
+        return 'failing_stop_condition'
+
+    @property
+    def reason(self):
+        return 'failure'
+
+    def check(self, beam, z):
+        if self.__n_checks == self.__n_fail:
+            raise RuntimeError('failure of calculations')
+        self.__n_checks += 1
+
+        return False
+
+
+class TestFieldStore(TestCase):
+    """
+    Class for testing that the field store and the background worker are finished when the propagation fails: all
+    the fields appended before the failure are written and the file is closed, so it can be read.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_fail = 5
+
+    def test_field_store_on_failure(self):
+        beam = BeamR(medium='SiO2',
+                     M=0,
+                     m=0,
+                     p_0_to_p_gauss=1.0,
+                     lmbda=1800 * 10**-9,
+                     r_0=100 * 10**-6,
+                     n_r=256,
+                     radii_in_grid=10)
+
+        with TemporaryDirectory() as tmp_dir, BackgroundWorker(mode='thread') as background_worker:
+            args = Namespace(global_root_dir=tmp_dir, global_results_dir_name='results', prefix='failure',
+                             insert_datetime=False)
+            propagator = Propagator(args=args,
+                                    beam=beam,
+                                    diffraction=SweepDiffractionExecutorR(beam=beam),
+                                    kerr_effect=KerrExecutorR(beam=beam),
+                                    n_z=100,
+                                    dz_0=beam.z_diff / 1000,
+                                    const_dz=True,
+                                    print_current_state_every=0,
+                                    plot_beam_every=0,
+                                    save_field=True,
+                                    stop_conditions=[FailingStopCondition(n_fail=self.__n_fail)],
+                                    background_worker=background_worker,
+                                    print_track=False)
+
+            with self.assertRaises(RuntimeError):
+                propagator.propagate()
+
+            data = load_fields(propagator.manager.field_dir + '/field.h5')
+            self.assertEqual(list(data['n_step']), list(range(self.__n_fail + 1)))
+            self.assertEqual(background_worker.n_pending, 0)
@@ -1,9 +1,12 @@
 from unittest import TestCase
-from numpy import mean
+from unittest.mock import patch
+from os.path import exists
+from tempfile import TemporaryDirectory
+from numpy import mean, array_equal, correlate, allclose
 from numpy.random import random, randint
 from tqdm import trange
 
-from core import GaussianNoise
+from core import GaussianNoise, NoiseCache
 
 
 class TestGaussianNoise(TestCase):
@@ -46,3 +49,73 @@ class TestGaussianNoise(TestCase):
             self.assertLess(abs(r_corr_expected - r_corr_generated) / r_corr_expected, self.__eps_r_corr)
 
             del gaussian_noise
+
+    def test_gaussian_noise_reproducibility(self, n_realizations=4):
+        gaussian_noise = GaussianNoise(r_corr_in_meters=10 * 10 ** -6,
+                                       variance=1)
+        gaussian_noise.initialize(n_x=self.__n_x,
+                                  n_y=self.__n_y,
+                                  dx=self.__dx,
+                                  dy=self.__dy)
+        noise_fields = gaussian_noise.generate(n_realizations)
+
+        # the same seed gives the same realizations in any order and in any batches
+        gaussian_noise_reproduced = GaussianNoise(r_corr_in_meters=10 * 10 ** -6,
+                                                  variance=1,
+                                                  seed=gaussian_noise.seed,
+                                                  realization=n_realizations - 1)
+        gaussian_noise_reproduced.initialize(n_x=self.__n_x,
+                                             n_y=self.__n_y,
+                                             dx=self.__dx,
+                                             dy=self.__dy)
+        gaussian_noise_reproduced.process()
+        self.assertTrue(array_equal(noise_fields[-1], gaussian_noise_reproduced.noise_field))
+        self.assertTrue(array_equal(noise_fields[1:3], gaussian_noise_reproduced.generate(2, 1)))
+
+        # different realizations are independent
+        self.assertFalse(array_equal(noise_fields[0], noise_fields[1]))
+
+    def test_gaussian_noise_cache(self):
+        # seeded noise is not cached unless the cache is given
+        self.assertIsNone(GaussianNoise(r_corr_in_meters=10 * 10 ** -6, variance=1, seed=1).cache)
+
+        with TemporaryDirectory() as tmp_dir:
+            noise_fields = []
+            for i in range(2):
+                gaussian_noise = GaussianNoise(r_corr_in_meters=10 * 10 ** -6,
+                                               variance=1,
+                                               seed=1,
+                                               cache=NoiseCache(path=tmp_dir))
+                gaussian_noise.initialize(n_x=self.__n_x,
+                                          n_y=self.__n_y,
+                                          dx=self.__dx,
+                                          dy=self.__dy)
+                with patch.object(GaussianNoise, 'generate', wraps=gaussian_noise.generate) as generate:
+                    gaussian_noise.process()
+                noise_fields.append(gaussian_noise.noise_field.copy())
+
+                if not i:
+                    # the first noise is generated and saved to the cache
+                    self.assertEqual(generate.call_count, 1)
+                    self.assertTrue(exists(gaussian_noise.cache.filename(gaussian_noise.cache_key, 'field.npy')))
+                else:
+                    # the second noise is loaded from the cache without generation
+                    generate.assert_not_called()
+                del gaussian_noise
+
+            self.assertTrue(array_equal(noise_fields[0], noise_fields[1]))
+
+    def test_gaussian_noise_autocorrelation(self, n_x=64, n_y=47):
+        # autocorrelation functions calculated by FFT are the same as averaged numpy.correlate in mode 'same'
+        gaussian_noise = GaussianNoise(r_corr_in_meters=10 * 10 ** -6, variance=1, seed=1)
+        gaussian_noise.initialize(n_x=n_x, n_y=n_y, dx=self.__dx, dy=self.__dy)
+        gaussian_noise.process()
+
+        autocorrs_expected = []
+        for noise in (gaussian_noise.noise_field_real, gaussian_noise.noise_field_imag):
+            for layers in (noise, noise.T):
+                autocorrs_expected.append(mean([correlate(e, e, mode='same') for e in layers], axis=0))
+
+        for autocorr, autocorr_expected in zip(gaussian_noise.autocorrs, autocorrs_expected):
+            self.assertEqual(autocorr.shape, autocorr_expected.shape)
+            self.assertTrue(allclose(autocorr, autocorr_expected, rtol=1e-6, atol=1e-6 * abs(autocorr_expected).max()))
@@ -0,0 +1 @@
+from .test_kerr_effect import TestKerrEffect
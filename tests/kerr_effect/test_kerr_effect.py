@@ -0,0 +1,54 @@
+from unittest import TestCase
+from numpy import exp, array, allclose
+
+from core import BeamR, BeamXY, KerrExecutorR, KerrExecutorXY
+
+
+class TestKerrEffect(TestCase):
+    """
+    Class for testing of the fused Kerr effect kernel: the in-place Kerr phase shift with the update of intensity and
+    its maximum in one pass must be the same as the separate Kerr phase shift followed by the update of intensity
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_dz = 3  # number of Kerr effect steps
+
+    def __check_kerr_effect(self, beam, kerr_effect):
+        dz = 0.01 * beam.z_diff
+        field = beam.field
+        for _ in range(self.__n_dz):
+            field_ref = array(beam.field) * exp(-0.5j * beam.r_kerr / beam.z_diff * dz * abs(array(beam.field)) ** 2)
+
+            kerr_effect.process_kerr_effect(dz)
+            self.assertIs(beam.field, field)
+            self.assertTrue(allclose(beam.field, field_ref, rtol=1e-5, atol=1e-6))
+
+            # intensity and its maximum are the same as after separate update of intensity
+            intensity, i_max = array(beam.intensity), beam.i_max
+            beam.update_intensity()
+            self.assertTrue(allclose(intensity, beam.intensity, rtol=1e-5, atol=1e-6))
+            self.assertAlmostEqual(i_max / beam.i_max, 1.0, places=5)
+
+    def test_kerr_effect_r(self):
+        beam = BeamR(medium='SiO2',
+                     M=1,
+                     m=1,
+                     p_0_to_p_vortex=3,
+                     lmbda=1800 * 10**-9,
+                     r_0=100 * 10**-6,
+                     n_r=1024)
+        self.__check_kerr_effect(beam, KerrExecutorR(beam=beam))
+
+    def test_kerr_effect_xy(self):
+        beam = BeamXY(medium='SiO2',
+                      M=1,
+                      m=1,
+                      p_0_to_p_vortex=3,
+                      lmbda=1800 * 10**-9,
+                      x_0=100 * 10**-6,
+                      y_0=100 * 10**-6,
+                      n_x=256,
+                      n_y=128)
+        self.__check_kerr_effect(beam, KerrExecutorXY(beam=beam))
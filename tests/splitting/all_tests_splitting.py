@@ -0,0 +1 @@
+from .test_splitting import TestSplitting
@@ -0,0 +1,147 @@
+from unittest import TestCase
+from argparse import Namespace
+from tempfile import TemporaryDirectory
+from numpy import exp, array, newaxis, complex128
+from numpy.linalg import norm
+
+from core import BeamXY, FourierDiffractionExecutorXY, KerrExecutorXY, Propagator, LieSplitting, StrangSplitting, \
+    ForestRuthSplitting
+
+
+class TestSplitting(TestCase):
+    """
+    Class for testing of the order of accuracy of splitting schemes: the Gaussian beam with Kerr effect propagates
+    the distance length_in_z_diff with n_z and 2 n_z steps, and the errors relative to the solution with n_z_ref steps
+    must decrease by about 2^order. Diffraction by FFT is exact for any dz, so the error is only the splitting error.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_x = 128
+        self.__p_0_to_p_vortex = 3
+        self.__length_in_z_diff = 0.1
+
+        self.__n_zs = [8, 16, 32]
+        self.__n_z_ref = 1024
+
+    def __create_beam(self):
+        beam = BeamXY(medium='SiO2',
+                      M=1,
+                      m=1,
+                      p_0_to_p_vortex=self.__p_0_to_p_vortex,
+                      lmbda=1800 * 10**-9,
+                      x_0=100 * 10**-6,
+                      y_0=100 * 10**-6,
+                      n_x=self.__n_x,
+                      n_y=self.__n_x)
+
+        # Gaussian beam in double precision, so the round-off errors are less than the errors of fourth-order scheme
+        xs, ys = array(beam.xs)[:, newaxis], array(beam.ys)[newaxis, :]
+        beam._field = exp(-0.5 * (xs**2 + ys**2) / beam.x_0**2).astype(complex128)
+        beam.update_intensity()
+
+        return beam
+
+    def __propagate(self, splitting_class, n_z):
+        beam = self.__create_beam()
+        splitting = splitting_class(beam=beam,
+                                    diffraction=FourierDiffractionExecutorXY(beam=beam,
+                                                                             planner_effort='FFTW_ESTIMATE',
+                                                                             wisdom=None),
+                                    kerr_effect=KerrExecutorXY(beam=beam))
+
+        dz = self.__length_in_z_diff * beam.z_diff / n_z
+        for _ in range(n_z):
+            splitting.step(dz)
+        splitting.synchronize()
+
+        return beam.field.copy()
+
+    def __check_order(self, splitting_class, order, ratio_min, ratio_max):
+        field_ref = self.__propagate(splitting_class, self.__n_z_ref)
+        errors = [norm(self.__propagate(splitting_class, n_z) - field_ref) / norm(field_ref) for n_z in self.__n_zs]
+
+        for i in range(len(errors) - 1):
+            ratio = errors[i] / errors[i + 1]
+            self.assertGreater(ratio, ratio_min * 2**order)
+            self.assertLess(ratio, ratio_max * 2**order)
+
+    def test_lie_splitting(self):
+        self.__check_order(LieSplitting, 1, 0.9, 1.1)
+
+    def test_strang_splitting(self):
+        self.__check_order(StrangSplitting, 2, 0.85, 1.1)
+
+    def test_forest_ruth_splitting(self):
+        self.__check_order(ForestRuthSplitting, 4, 0.55, 1.1)
+
+    def test_absorbing_layer_negative_substep(self):
+        # negative diffraction substep of Forest-Ruth scheme must damp the field in the absorbing layer too
+        beam = self.__create_beam()
+        diffraction = FourierDiffractionExecutorXY(beam=beam,
+                                                   planner_effort='FFTW_ESTIMATE',
+                                                   wisdom=None,
+                                                   absorbing_layer=0.5)
+
+        dz = min(ForestRuthSplitting.DIFFRACTION_COEFFS) * self.__length_in_z_diff * beam.z_diff
+        self.assertLess(dz, 0.0)
+
+        energy = beam.calculate_energy()
+        diffraction.process_diffraction(dz)
+        beam.update_intensity()
+        self.assertLess(beam.calculate_energy(), energy)
+
+    def test_propagator_track(self, n_z=10):
+        # peak intensity in the track corresponds to the field at recorded z, not to the last Kerr effect substep
+        for splitting in ('strang', 'forest_ruth'):
+            beam = self.__create_beam()
+            with TemporaryDirectory() as tmp_dir:
+                args = Namespace(global_root_dir=tmp_dir, global_results_dir_name='results', prefix=splitting,
+                                 insert_datetime=False)
+                propagator = Propagator(args=args,
+                                        beam=beam,
+                                        diffraction=FourierDiffractionExecutorXY(beam=beam,
+                                                                                 planner_effort='FFTW_ESTIMATE',
+                                                                                 wisdom=None),
+                                        kerr_effect=KerrExecutorXY(beam=beam),
+                                        splitting=splitting,
+                                        n_z=n_z,
+                                        dz_0=self.__length_in_z_diff * beam.z_diff / n_z,
+                                        const_dz=True,
+                                        print_current_state_every=0,
+                                        plot_beam_every=0,
+                                        print_track=False)
+                propagator.propagate()
+
+            self.assertTrue(propagator.splitting.synchronized)
+            i_max_recorded = propagator.states_arr[-1, propagator.states_columns.index('i_max, W / m^2')]
+            i_max_field = (abs(beam.field) ** 2).max() * beam.i_0
+            self.assertAlmostEqual(i_max_recorded / i_max_field, 1.0, places=10)
+
+    def test_propagator_synchronize_every(self, n_z=10):
+        # without synchronizations between steps Propagator merges diffraction substeps as the splitting scheme alone
+        for splitting, splitting_class in (('strang', StrangSplitting), ('forest_ruth', ForestRuthSplitting)):
+            beam = self.__create_beam()
+            diffraction = FourierDiffractionExecutorXY(beam=beam, planner_effort='FFTW_ESTIMATE', wisdom=None)
+            dzs = []
+            process_diffraction = diffraction.process_diffraction
+            diffraction.process_diffraction = lambda dz: (dzs.append(dz), process_diffraction(dz))
+            propagator = Propagator(beam=beam,
+                                    diffraction=diffraction,
+                                    kerr_effect=KerrExecutorXY(beam=beam),
+                                    splitting=splitting,
+                                    synchronize_every=n_z,
+                                    write_results=False,
+                                    n_z=n_z,
+                                    dz_0=self.__length_in_z_diff * beam.z_diff / n_z,
+                                    const_dz=True,
+                                    print_current_state_every=0,
+                                    plot_beam_every=0,
+                                    print_track=False)
+            propagator.propagate()
+
+            self.assertTrue(propagator.splitting.synchronized)
+            self.assertEqual(len(dzs), n_z * (len(splitting_class.DIFFRACTION_COEFFS) - 1) + 1)
+            field_ref = self.__propagate(splitting_class, n_z)
+            self.assertLess(norm(beam.field - field_ref) / norm(field_ref), 1e-12)
@@ -0,0 +1 @@
+from .test_adaptive_stepper import TestAdaptiveStepper
@@ -0,0 +1,82 @@
+from unittest import TestCase
+from numpy import nan
+
+from core import BeamR, SweepDiffractionExecutorR, StrangSplitting, AdaptiveStepper
+
+
+class TestAdaptiveStepper(TestCase):
+    """
+    Class for testing of error-controlled adaptive step along z in the linear case: the Gaussian beam diffracts and its
+    peak intensity i_max / i_0 = 1 / (1 + (z / z_diff)^2) is known analytically. The beam broadens, so the step must
+    grow, and the solution must stay close to the analytical one and to the solution with small constant step.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_r = 1024
+        self.__length_in_z_diff = 1.0
+        self.__n_z_fixed = 2000
+
+        self.__tolerance = 10**-4
+        self.__eps = 10**-3
+
+    def __create(self):
+        beam = BeamR(medium='SiO2',
+                     M=0,
+                     m=0,
+                     p_0_to_p_gauss=1.0,
+                     lmbda=1800 * 10**-9,
+                     r_0=100 * 10**-6,
+                     n_r=self.__n_r,
+                     radii_in_grid=10)
+
+        # Crank-Nicolson scheme is of the second order along z, as Strang splitting
+        splitting = StrangSplitting(beam=beam, diffraction=SweepDiffractionExecutorR(beam=beam), kerr_effect=None)
+
+        return beam, splitting
+
+    def __propagate_fixed(self):
+        beam, splitting = self.__create()
+        dz = self.__length_in_z_diff * beam.z_diff / self.__n_z_fixed
+        for _ in range(self.__n_z_fixed):
+            splitting.step(dz)
+        splitting.synchronize()
+
+        return beam
+
+    def test_adaptive_stepper_diffraction(self):
+        beam, splitting = self.__create()
+        stepper = AdaptiveStepper(tolerance=self.__tolerance)
+
+        length = self.__length_in_z_diff * beam.z_diff
+        z, dz, dzs = 0.0, beam.z_diff / 1000, []
+        while z < length:
+            dz_accepted, dz, _ = stepper.step(beam, splitting, min(dz, length - z))
+            z += dz_accepted
+            dzs.append(dz_accepted)
+
+        # step grows on the broadening beam (the last step is cut to reach the end)
+        self.assertGreater(max(dzs[:-1]), 10 * dzs[0])
+        self.assertLess(len(dzs), self.__n_z_fixed // 10)
+
+        i_max_expected = 1.0 / (1.0 + self.__length_in_z_diff ** 2)
+        self.assertLess(abs(beam.i_max / beam.i_0 - i_max_expected) / i_max_expected, self.__eps)
+
+        beam_fixed = self.__propagate_fixed()
+        self.assertLess(abs(beam.i_max - beam_fixed.i_max) / beam_fixed.i_max, self.__eps)
+
+    def test_adaptive_stepper_non_finite_error(self):
+        beam, splitting = self.__create()
+        beam._field[0] = nan
+
+        stepper = AdaptiveStepper(tolerance=self.__tolerance)
+        with self.assertRaises(Exception):
+            stepper.step(beam, splitting, beam.z_diff / 1000)
+
+    def test_adaptive_stepper_max_rejections(self):
+        beam, splitting = self.__create()
+
+        stepper = AdaptiveStepper(tolerance=10**-30, dz_min_ratio=10**-30, max_rejections=3)
+        with self.assertRaises(Exception):
+            stepper.step(beam, splitting, beam.z_diff / 10)
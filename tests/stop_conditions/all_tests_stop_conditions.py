@@ -0,0 +1 @@
+from .test_stop_conditions import TestStopConditions
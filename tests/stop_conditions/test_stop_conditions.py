@@ -0,0 +1,108 @@
+from unittest import TestCase
+
+from core import BeamR, Propagator, SweepDiffractionExecutorR, KerrExecutorR, MaxIntensityStopCondition, \
+    MinIntensityStopCondition, IntensityDecayStopCondition, WidthStopCondition, BoundaryEnergyStopCondition
+
+
+class TestStopConditions(TestCase):
+    """
+    Class for testing of stop conditions: every condition stops the propagation of the beam, for which it is fulfilled,
+    before n_z steps are made, and the propagator records its reason
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_z = 2000
+
+    @staticmethod
+    def __create_beam(p_0_to_p_gauss, radii_in_grid=10):
+        return BeamR(medium='SiO2',
+                     M=0,
+                     m=0,
+                     p_0_to_p_gauss=p_0_to_p_gauss,
+                     lmbda=1800 * 10**-9,
+                     r_0=100 * 10**-6,
+                     n_r=512,
+                     radii_in_grid=radii_in_grid)
+
+    def __propagate(self, beam, stop_conditions=(), **kwargs):
+        propagator = Propagator(beam=beam,
+                                diffraction=SweepDiffractionExecutorR(beam=beam),
+                                kerr_effect=KerrExecutorR(beam=beam),
+                                write_results=False,
+                                n_z=self.__n_z,
+                                dz_0=beam.z_diff / 200,
+                                const_dz=False,
+                                print_current_state_every=0,
+                                plot_beam_every=0,
+                                print_track=False,
+                                stop_conditions=list(stop_conditions),
+                                **kwargs)
+        propagator.propagate()
+
+        # the propagation is stopped before n_z steps are made
+        self.assertLess(propagator.states_arr.shape[0], self.__n_z + 1)
+
+        return propagator
+
+    def test_max_intensity_stop_condition(self):
+        beam = self.__create_beam(4.0)
+        max_intensity = 10 * beam.i_0
+        propagator = self.__propagate(beam, max_intensity_to_stop=max_intensity)
+
+        self.assertEqual(propagator.stop_reason, MaxIntensityStopCondition(max_intensity=max_intensity).reason)
+        self.assertGreater(beam.i_max, max_intensity)
+
+    def test_min_intensity_stop_condition(self):
+        for z_diff_min in (0.0, 1.0):
+            beam = self.__create_beam(0.1)
+            stop_condition = MinIntensityStopCondition(min_intensity=0.5 * beam.i_0, z_min=z_diff_min * beam.z_diff)
+            propagator = self.__propagate(beam, [stop_condition])
+
+            self.assertEqual(propagator.stop_reason, stop_condition.reason)
+            self.assertLess(beam.i_max, 0.5 * beam.i_0)
+            self.assertGreaterEqual(propagator.z, z_diff_min * beam.z_diff)
+
+    def test_intensity_decay_stop_condition(self):
+        beam = self.__create_beam(0.1)
+        stop_condition = IntensityDecayStopCondition(window=50, max_ratio=0.9)
+        propagator = self.__propagate(beam, [stop_condition])
+
+        self.assertEqual(propagator.stop_reason, stop_condition.reason)
+        self.assertGreaterEqual(propagator.states_arr.shape[0], 50 + 1)
+        self.assertLess(beam.i_max, 0.9 * beam.i_0)
+
+    def test_width_stop_condition(self):
+        beam = self.__create_beam(0.1)
+        width_0 = beam.calculate_width()
+        stop_condition = WidthStopCondition(max_ratio=1.5)
+        propagator = self.__propagate(beam, [stop_condition])
+
+        self.assertEqual(propagator.stop_reason, stop_condition.reason)
+        self.assertGreater(beam.calculate_width(), 1.5 * width_0)
+
+    def test_boundary_energy_stop_condition(self):
+        beam = self.__create_beam(0.1, radii_in_grid=4)
+        stop_condition = BoundaryEnergyStopCondition(max_fraction=0.01, layer=0.1)
+        propagator = self.__propagate(beam, [stop_condition])
+
+        self.assertEqual(propagator.stop_reason, stop_condition.reason)
+        self.assertGreater(beam.calculate_boundary_energy_fraction(0.1), 0.01)
+
+    def test_no_stop_condition(self):
+        beam = self.__create_beam(0.1)
+        propagator = Propagator(beam=beam,
+                                diffraction=SweepDiffractionExecutorR(beam=beam),
+                                kerr_effect=KerrExecutorR(beam=beam),
+                                write_results=False,
+                                n_z=10,
+                                dz_0=beam.z_diff / 200,
+                                const_dz=True,
+                                print_current_state_every=0,
+                                plot_beam_every=0,
+                                print_track=False)
+        propagator.propagate()
+
+        self.assertEqual(propagator.stop_reason, 'n_z steps are made')
+        self.assertEqual(propagator.states_arr.shape[0], 10 + 1)
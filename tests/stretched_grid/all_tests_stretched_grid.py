@@ -0,0 +1 @@
+from .test_stretched_grid import TestStretchedGrid
@@ -0,0 +1,62 @@
+from unittest import TestCase
+from numpy import array, exp, interp
+from numpy.linalg import norm
+
+from core import BeamR, SweepDiffractionExecutorR
+
+
+class TestStretchedGrid(TestCase):
+    """
+    Class for testing of stretched grid along r: the diffraction of Gaussian beam on the stretched grid must reproduce
+    the diffraction on the uniform grid and the analytical decrease of its peak intensity, and the interpolation of
+    arrays to the uniform grid must be reversible for smooth profiles
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__n_r = 512
+        self.__length_in_z_diff = 0.5
+        self.__n_z = 100
+
+    def __create_beam(self, grid):
+        return BeamR(medium='SiO2',
+                     M=0,
+                     m=0,
+                     p_0_to_p_gauss=1.0,
+                     lmbda=1800 * 10**-9,
+                     r_0=100 * 10**-6,
+                     n_r=self.__n_r,
+                     radii_in_grid=10,
+                     grid=grid)
+
+    def test_stretched_grid_diffraction(self):
+        fields = {}
+        for grid in ('uniform', 'stretched'):
+            beam = self.__create_beam(grid)
+            diffraction = SweepDiffractionExecutorR(beam=beam)
+            for _ in range(self.__n_z):
+                diffraction.process_diffraction(self.__length_in_z_diff * beam.z_diff / self.__n_z)
+            beam.update_intensity()
+            fields[grid] = beam.interpolate_to_uniform_grid(beam.field)
+
+            # peak intensity of Gaussian beam decreases as 1 / (1 + (z / z_diff)^2)
+            self.assertAlmostEqual(beam.i_max / beam.i_0 * (1.0 + self.__length_in_z_diff ** 2), 1.0, places=2)
+
+        self.assertLess(norm(fields['stretched'] - fields['uniform']) / norm(fields['uniform']), 10**-3)
+
+    def test_interpolate_to_uniform_grid(self):
+        beam = self.__create_beam('stretched')
+        rs, uniform_rs = array(beam.rs), array(beam.uniform_rs)
+        self.assertGreater(beam.dr_max / beam.dr_min, 2.0)
+
+        # Gaussian profile is interpolated to the uniform grid and back to the grid nodes
+        arr = exp(-(rs / beam.r_0) ** 2)
+        uniform_arr = beam.interpolate_to_uniform_grid(arr)
+        self.assertLess(norm(uniform_arr - exp(-(uniform_rs / beam.r_0) ** 2)) / norm(uniform_arr), 10**-4)
+        self.assertLess(norm(interp(rs, uniform_rs, uniform_arr) - arr) / norm(arr), 10**-4)
+
+        # arrays on the uniform grid are not interpolated
+        beam = self.__create_beam('uniform')
+        arr = exp(-(array(beam.rs) / beam.r_0) ** 2)
+        self.assertIs(beam.interpolate_to_uniform_grid(arr), arr)
@@ -0,0 +1 @@
+from .test_sweep_runner import TestSweepRunner
@@ -0,0 +1,68 @@
+from unittest import TestCase
+from argparse import Namespace
+from tempfile import TemporaryDirectory
+from os.path import exists
+
+from core import BeamR, SweepDiffractionExecutorR, KerrExecutorR, SpectrumR, SweepRunner
+
+
+def calculate_dz_0(beam):
+    return beam.z_diff / 1000
+
+
+def create_spectrum(beam):
+    return SpectrumR(beam=beam, planner_effort='FFTW_ESTIMATE', wisdom=None)
+
+
+class TestSweepRunner(TestCase):
+    """
+    Smoke test of the sweep over power of the Gaussian beam in two spawned worker processes: every job must produce
+    its results directory and its track in the common table. Functions in parameters are defined at module level,
+    because they are pickled to the workers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__p_0_to_p_gauss = [1.0, 2.0]
+        self.__n_z = 20
+
+    def test_sweep_runner(self):
+        with TemporaryDirectory() as tmp_dir:
+            args = Namespace(global_root_dir=tmp_dir, global_results_dir_name='results', prefix='sweep',
+                             insert_datetime=False)
+            runner = SweepRunner(args=args,
+                                 beam_class=BeamR,
+                                 diffraction_class=SweepDiffractionExecutorR,
+                                 kerr_effect_class=KerrExecutorR,
+                                 beam_params={'medium': 'SiO2',
+                                              'M': 0,
+                                              'm': 0,
+                                              'lmbda': 1800 * 10**-9,
+                                              'r_0': 100 * 10**-6,
+                                              'n_r': 256,
+                                              'radii_in_grid': 10},
+                                 propagator_params={'n_z': self.__n_z,
+                                                    'dz_0': calculate_dz_0,
+                                                    'const_dz': True,
+                                                    'spectrum': create_spectrum,
+                                                    'print_current_state_every': 0,
+                                                    'plot_beam_every': 0,
+                                                    'print_track': False,
+                                                    'track_format': 'npz'},
+                                 beam_grid={'p_0_to_p_gauss': self.__p_0_to_p_gauss},
+                                 n_workers=2,
+                                 n_threads=1)
+            df = runner.run()
+
+            for job in runner.jobs:
+                self.assertTrue(exists(runner.results_dir + '/p_0_to_p_gauss=%s/propagation.npz' %
+                                       job['p_0_to_p_gauss']))
+
+        self.assertEqual(list(df['job'].unique()), [0, 1])
+        self.assertEqual(list(df['p_0_to_p_gauss'].unique()), self.__p_0_to_p_gauss)
+        self.assertEqual(len(df), len(self.__p_0_to_p_gauss) * (self.__n_z + 1))
+
+        # the beam with higher power focuses stronger
+        i_max = df.groupby('job')['i_max / i_0'].last()
+        self.assertGreater(i_max[1], i_max[0])
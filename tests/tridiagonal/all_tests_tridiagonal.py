@@ -0,0 +1 @@
+from .test_crank_nicolson import TestCrankNicolsonSolver
@@ -0,0 +1,101 @@
+from unittest import TestCase
+from numpy import array, zeros, conj, full, complex128
+from numpy.linalg import norm
+
+from core import BeamX, BeamR, SweepDiffractionExecutorX, SweepDiffractionExecutorR
+
+
+def sweep(field, dz, c, alpha, gamma, sigma, rho, kappa_left, mu_left, kappa_right, mu_right):
+    """
+    Original sweep without cache: coefficients xi and eta are calculated from scratch on every step
+    """
+    n = field.shape[0]
+    xi, eta = zeros(shape=(n,), dtype=complex), zeros(shape=(n,), dtype=complex)
+
+    # left boundary condition
+    xi[1], eta[1] = kappa_left, mu_left
+
+    # forward
+    for i in range(1, n - 1):
+        beta = sigma[i] + c / dz
+        delta = alpha[i] * field[i + 1] - (rho[i] + conj(c) / dz) * field[i] + gamma[i] * field[i - 1]
+        xi[i + 1] = alpha[i] / (beta - gamma[i] * xi[i])
+        eta[i + 1] = (delta + gamma[i] * eta[i]) / (beta - gamma[i] * xi[i])
+
+    # right boundary condition
+    field[n - 1] = (mu_right + kappa_right * eta[n - 1]) / (1.0 - kappa_right * xi[n - 1])
+
+    # backward
+    for j in range(n - 1, 0, -1):
+        field[j - 1] = xi[j] * field[j] + eta[j]
+
+
+class TestCrankNicolsonSolver(TestCase):
+    """
+    Class for testing of Crank-Nicolson solver with the cache of factorizations: the steps of sweep diffraction
+    executors with changing dz (the cache of one factorization is refilled) must be the same as the steps of the original
+    sweep for uniform and stretched grids along r, for the grid along x and for zero and transparent boundary conditions
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__dzs_in_z_diff = [0.01, 0.02, 0.01, 0.05, 0.05, 0.01]  # steps along z
+        self.__boundary_conditions = ('zero', 'transparent')
+
+    def __check_solver(self, create_beam, diffraction_class, coeffs, kappa_left):
+        for boundary_condition in self.__boundary_conditions:
+            beam = create_beam()
+            diffraction = diffraction_class(beam=beam, dtype=complex128, boundary_condition=boundary_condition,
+                                            factorization_cache_size=1)
+            alpha, gamma, sigma, rho, c = coeffs(beam)
+
+            field = array(beam.field, dtype=complex128)
+            for dz_in_z_diff in self.__dzs_in_z_diff:
+                dz = dz_in_z_diff * beam.z_diff
+
+                kappa_right, kappa_left_step = 0.0, kappa_left
+                if boundary_condition == 'transparent':
+                    kappa_right = diffraction_class._calculate_transparent_kappa(field)
+                    if diffraction_class.TWO_BOUNDARIES:
+                        kappa_left_step = diffraction_class._calculate_transparent_kappa(field[::-1])
+
+                sweep(field, dz, c, alpha, gamma, sigma, rho, kappa_left_step, 0.0, kappa_right, 0.0)
+                diffraction.process_diffraction(dz)
+
+                self.assertLess(norm(beam.field - field) / norm(field), 1e-12)
+
+    def test_crank_nicolson_solver_x(self):
+        def create_beam():
+            return BeamX(medium='SiO2',
+                         M=0,
+                         half=False,
+                         lmbda=1800 * 10**-9,
+                         x_0=100 * 10**-6,
+                         n_x=512,
+                         radii_in_grid=4)
+
+        def coeffs(beam):
+            c1 = 1.0 / (2.0 * beam.dx ** 2)
+            return full(beam.n_x, c1), full(beam.n_x, c1), full(beam.n_x, 2 * c1), full(beam.n_x, 2 * c1), \
+                2j * beam.medium.k_0
+
+        self.__check_solver(create_beam, SweepDiffractionExecutorX, coeffs, 0.0)
+
+    def test_crank_nicolson_solver_r(self):
+        for grid in ('uniform', 'stretched'):
+            def create_beam():
+                return BeamR(medium='SiO2',
+                             M=1,
+                             m=1,
+                             p_0_to_p_vortex=1,
+                             lmbda=1800 * 10**-9,
+                             r_0=100 * 10**-6,
+                             n_r=512,
+                             radii_in_grid=3,
+                             grid=grid)
+
+            def coeffs(beam):
+                return SweepDiffractionExecutorR.calculate_coefficients(beam.rs, beam.m) + (2j * beam.medium.k_0,)
+
+            self.__check_solver(create_beam, SweepDiffractionExecutorR, coeffs, 1.0)
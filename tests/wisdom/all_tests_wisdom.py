@@ -0,0 +1 @@
+from .test_fftw_wisdom import TestFFTWWisdom
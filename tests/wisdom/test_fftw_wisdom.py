@@ -0,0 +1,45 @@
+from unittest import TestCase
+from os.path import exists
+from tempfile import TemporaryDirectory
+from pyfftw import export_wisdom, forget_wisdom
+
+from core import BeamXY, FourierDiffractionExecutorXY, FFTWWisdom
+
+
+class TestFFTWWisdom(TestCase):
+    """
+    Class for testing of on-disk storage of FFTW wisdom: wisdom is stored only if the storage is given, and the raw
+    wisdom strings exported after planning are imported again from the file.
+    """
+
+    @staticmethod
+    def __create_beam():
+        return BeamXY(medium='SiO2',
+                      M=0,
+                      m=0,
+                      p_0_to_p_gauss=1.0,
+                      lmbda=1800 * 10**-9,
+                      x_0=100 * 10**-6,
+                      y_0=100 * 10**-6,
+                      n_x=64,
+                      n_y=64)
+
+    def test_fftw_wisdom(self):
+        with TemporaryDirectory() as tmp_dir:
+            wisdom = FFTWWisdom(path=tmp_dir)
+            beam = self.__create_beam()
+            FourierDiffractionExecutorXY(beam=beam, planner_effort='FFTW_ESTIMATE', wisdom=wisdom, n_jobs=1)
+            filename = wisdom.filename(beam.field.shape, beam.field.dtype, 1)
+            self.assertTrue(exists(filename))
+
+            exported = export_wisdom()
+            forget_wisdom()
+            self.assertTrue(wisdom.load(beam.field.shape, beam.field.dtype, 1))
+            self.assertEqual(export_wisdom(), exported)
+
+    def test_fftw_wisdom_corrupted_file(self):
+        with TemporaryDirectory() as tmp_dir:
+            wisdom = FFTWWisdom(path=tmp_dir)
+            with open(wisdom.filename((64, 64), 'complex64', 1), 'wb') as f:
+                f.write(b'\x10\x00')
+            self.assertFalse(wisdom.load((64, 64), 'complex64', 1))
@@ -0,0 +1 @@
+from .test_zoom import TestZoom
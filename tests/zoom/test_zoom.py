@@ -0,0 +1,69 @@
+from unittest import TestCase
+from argparse import Namespace
+from tempfile import TemporaryDirectory
+
+from core import BeamR, Propagator, SweepDiffractionExecutorR, KerrExecutorR
+
+
+class TestZoom(TestCase):
+    """
+    Class for testing of adaptive zoom of the grid on the collapsing Gaussian beam: the distance of collapse must be
+    the same as without zoom, the lost fraction of power must not exceed zoom_max_energy_loss and the step along z
+    must be reduced by zoom_factor^2 at zoom.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.__p_0_to_p_gauss = 4
+        self.__n_r = 2048
+        self.__n_i_max_to_stop = 300
+        self.__zoom_factor = 2
+
+        self.__eps = 10**-3
+
+    def __propagate(self, **kwargs):
+        beam = BeamR(medium='SiO2',
+                     M=0,
+                     m=0,
+                     p_0_to_p_gauss=self.__p_0_to_p_gauss,
+                     lmbda=1800 * 10**-9,
+                     r_0=100 * 10**-6,
+                     n_r=self.__n_r,
+                     radii_in_grid=10)
+
+        with TemporaryDirectory() as tmp_dir:
+            args = Namespace(global_root_dir=tmp_dir, global_results_dir_name='results', prefix='zoom',
+                             insert_datetime=False)
+            propagator = Propagator(args=args,
+                                    beam=beam,
+                                    diffraction=SweepDiffractionExecutorR(beam=beam),
+                                    kerr_effect=KerrExecutorR(beam=beam),
+                                    n_z=3000,
+                                    dz_0=beam.z_diff / 200,
+                                    const_dz=False,
+                                    print_current_state_every=0,
+                                    plot_beam_every=0,
+                                    max_intensity_to_stop=self.__n_i_max_to_stop * beam.i_0,
+                                    print_track=False,
+                                    **kwargs)
+            propagator.propagate()
+
+        return propagator
+
+    def test_zoom(self):
+        propagator = self.__propagate()
+        propagator_zoom = self.__propagate(zoom_threshold=0.05, zoom_factor=self.__zoom_factor)
+
+        self.assertGreater(propagator_zoom.n_zooms, 0)
+        self.assertLess(abs(propagator_zoom.z - propagator.z) / propagator.z, self.__eps)
+
+        states_arr, columns = propagator_zoom.states_arr, propagator_zoom.states_columns
+        energy_loss = states_arr[:, columns.index('zoom energy loss')]
+        self.assertLessEqual(abs(energy_loss).max(), 10**-3)
+        self.assertLessEqual(abs(propagator_zoom.zoom_energy_loss), 10**-3)
+
+        # step along z is reduced with the diffraction length of the grid step
+        n_step = (states_arr[:, columns.index('grid zoom')] > 1).argmax()
+        dzs = states_arr[n_step - 1:n_step + 1, columns.index('dz, m')]
+        self.assertLess(dzs[1], 1.01 * dzs[0] / self.__zoom_factor ** 2)